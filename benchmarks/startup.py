@@ -0,0 +1,123 @@
+"""Import-time benchmark of the import-light core.
+
+Every core module (scoring, loading and result I/O) is imported in a fresh
+interpreter several times. The benchmark fails if the median import time of
+`utils.political_compass_score` exceeds the budget, or if a core module pulls in
+the LLM or plotting layers. Run from the repository root:
+
+    python -m benchmarks.startup --budget 0.25
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# The modules a scoring-only worker or CLI needs.
+CORE_MODULES = [
+    "utils.political_compass_score",
+    "utils.eight_values_score",
+    "utils.eysenck_score",
+    "utils.ideologies_score",
+    "utils.linear_scoring",
+    "utils.bootstrap",
+    "utils.score_distributions",
+    "utils.questionaire_index",
+    "utils.results_store",
+]
+
+# Packages of the optional llm and plot extras.
+HEAVY_MODULES = ["langchain", "langchain_core", "langchain_openai", "openai"]
+HEAVY_MODULES += ["matplotlib", "PIL"]
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """Imports a module in `repeat` fresh interpreters.
+
+    Parameters
+    ----------
+    module : str
+        The module to be imported.
+    repeat : int, optional
+        Number of interpreters, by default 5
+
+    Returns
+    -------
+    dict
+        The median and minimum import time in seconds and the heavy packages the
+        import loaded.
+    """
+    timings = []
+    heavy = set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        if len(output) > 1:
+            heavy.update(output[1].split(","))
+    return {
+        "module": module,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "heavy_imports": sorted(heavy),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.25,
+        help="Seconds `import utils.political_compass_score` may take (median).",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=CORE_MODULES)
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    rows = [measure(module, args.repeat) for module in args.modules]
+    failures = []
+    for row in rows:
+        print(
+            f"{row['module']:<32} median {row['median_s'] * 1000:7.1f} ms  "
+            f"min {row['min_s'] * 1000:7.1f} ms  "
+            f"heavy: {', '.join(row['heavy_imports']) or '-'}"
+        )
+        if row["heavy_imports"]:
+            failures.append(
+                f"{row['module']} imports {', '.join(row['heavy_imports'])}"
+            )
+        if (
+            row["module"] == "utils.political_compass_score"
+            and row["median_s"] > args.budget
+        ):
+            failures.append(
+                f"{row['module']} takes {row['median_s']:.3f} s, "
+                f"over the budget of {args.budget:.3f} s"
+            )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"budget_s": args.budget, "modules": rows}, file, indent=2)
+    if failures:
+        print("\n".join(["FAILED:"] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""End-to-end throughput benchmark of `collect_results` against the offline
+`FakeOpenAIServer`.
+
+Every `data/*_questions` file is answered in every language it exists in, once per
+scenario, and requests/sec, p50/p99 request latency, retries and wall-clock are
+reported, so changes to concurrency, caching or batching can be measured without
+API costs. Run from the repository root:
+
+    python -m benchmarks.throughput --latency-median 0.05 --rate-limit-rate 0.02
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from utils.answer_parsing import parse_stats
+from utils.evaluate import collect_results
+from utils.fake_server import FakeOpenAIServer
+from utils.gpt3_prompts import LANGUAGE_PROMPTS
+from utils.questionaire_index import DEFAULT_RESPONSE_OPTION_COUNTS
+from utils.response_cache import ResponseCache
+from utils.runner import QuestionaireRunner, set_default_runner
+
+# Keyword arguments of `collect_results` per scenario.
+SCENARIOS = {
+    "sequential": {},
+    "batched": {"batch_size": 8},
+    "parallel": {"parallel": True},
+    "cached": {"parallel": True, "cache": True},
+}
+
+
+def discover_questionaires(data_dir: str = "data") -> dict[str, dict]:
+    """Finds all questionaires and the languages they exist in.
+
+    Parameters
+    ----------
+    data_dir : str, optional
+        The data directory, by default "data"
+
+    Returns
+    -------
+    dict[str, dict]
+        Maps a test to the `file_path_list`, `language_label_list`,
+        `prompt_impl_list` and `response_option_count` of `collect_results`.
+    """
+    tests = {}
+    for test_dir in sorted(glob.glob(os.path.join(data_dir, "*_questions"))):
+        test = os.path.basename(test_dir)
+        spec = {
+            "file_path_list": [],
+            "language_label_list": [],
+            "prompt_impl_list": [],
+            "response_option_count": DEFAULT_RESPONSE_OPTION_COUNTS.get(test, 5),
+        }
+        for file in sorted(glob.glob(os.path.join(test_dir, "*.txt"))):
+            code = os.path.splitext(os.path.basename(file))[0].rsplit("-", 1)[-1]
+            if code not in LANGUAGE_PROMPTS:
+                continue
+            label, prompt_impl = LANGUAGE_PROMPTS[code]
+            spec["file_path_list"].append(file)
+            spec["language_label_list"].append(label)
+            spec["prompt_impl_list"].append(prompt_impl)
+        tests[test] = spec
+    return tests
+
+
+def run_scenario(
+    name: str,
+    server: FakeOpenAIServer,
+    tests: dict[str, dict],
+    max_concurrency: int = 16,
+    verbose: bool = False,
+) -> dict[str, float]:
+    """Runs one scenario over all questionaires with a fresh runner.
+
+    Parameters
+    ----------
+    name : str
+        Key of `SCENARIOS`.
+    server : FakeOpenAIServer
+        The running fake server.
+    tests : dict[str, dict]
+        The questionaires, see `discover_questionaires`.
+    max_concurrency : int, optional
+        Maximum number of requests in flight of the parallel scenarios, by default 16
+    verbose : bool, optional
+        Show the output of `collect_results`, by default False
+
+    Returns
+    -------
+    dict[str, float]
+        The measurements of the scenario.
+    """
+    kwargs = dict(SCENARIOS[name])
+    runner = QuestionaireRunner(model_name="fake-model")
+    set_default_runner(runner)
+    parse_stats.reset()
+    server.reset_stats()
+
+    with contextlib.ExitStack() as stack:
+        if kwargs.pop("cache", False):
+            cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            cache = ResponseCache(os.path.join(cache_dir, "responses.sqlite"))
+            stack.callback(cache.close)
+            kwargs["cache"] = cache
+            # Warm the cache once; only the second pass is measured.
+            with contextlib.redirect_stdout(io.StringIO()):
+                for spec in tests.values():
+                    collect_results(**spec, max_concurrency=max_concurrency, **kwargs)
+            server.reset_stats()
+            parse_stats.reset()
+            runner.close()
+            runner = QuestionaireRunner(model_name="fake-model")
+            set_default_runner(runner)
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        started = time.perf_counter()
+        answers = 0
+        for spec in tests.values():
+            results = collect_results(**spec, max_concurrency=max_concurrency, **kwargs)
+            answers += sum(len(series) for series in results)
+        wall_clock = time.perf_counter() - started
+
+    runner.close()
+    requests = runner.stats.requests
+    parse_counts = parse_stats.as_dataframe()
+    return {
+        "scenario": name,
+        "answers": answers,
+        "requests": requests,
+        "requests_per_second": requests / wall_clock,
+        **{
+            f"latency_{key}": value
+            for key, value in runner.stats.latency_percentiles((50, 99)).items()
+        },
+        "rate_limited": server.stats["rate_limited"],
+        "server_errors": server.stats["server_errors"],
+        "parse_retries": (
+            int(parse_counts["retries"].sum()) if not parse_counts.empty else 0
+        ),
+        "wall_clock": wall_clock,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--latency",
+        choices=["constant", "lognormal", "exponential"],
+        default="lognormal",
+    )
+    parser.add_argument("--latency-median", type=float, default=0.02)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--garbage-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    tests = discover_questionaires(args.data_dir)
+    server = FakeOpenAIServer(
+        latency=args.latency,
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        garbage_rate=args.garbage_rate,
+        seed=args.seed,
+    )
+    with server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+        rows = [
+            run_scenario(
+                name, server, tests, args.max_concurrency, verbose=args.verbose
+            )
+            for name in args.scenarios
+        ]
+
+    results = pd.DataFrame(rows).set_index("scenario")
+    with pd.option_context(
+        "display.width", 200, "display.max_columns", None, "display.precision", 3
+    ):
+        print(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""This module parses the model's answers tolerantly and counts parse failures.
+
+Instead of `int(response.content)`, which fails on stray whitespace, punctuation
+("2.") or a localized label ("Съгласен", "Stimme zu"), the parser takes the first
+valid option digit and otherwise maps the answer labels of the prompt's language
+back to answer codes.
+"""
+
+import re
+from collections import defaultdict
+from typing import Optional
+
+import pandas as pd
+
+from utils.gpt3_prompts import UniversalPrompt
+
+# A single digit that is not part of a longer number.
+_DIGIT_PATTERN = re.compile(r"(?<!\d)(\d)(?!\d)")
+
+
+class ParseStats:
+    """Per-language counters of parsed answers, parse failures, retries and
+    fallbacks to the neutral answer."""
+
+    def __init__(self: "ParseStats") -> None:
+        self._counts: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"parsed": 0, "parse_failures": 0, "retries": 0, "fallbacks": 0}
+        )
+
+    def record(self: "ParseStats", language: str, counter: str) -> None:
+        """Increments one counter of a language."""
+        self._counts[language][counter] += 1
+
+    def as_dataframe(self: "ParseStats") -> pd.DataFrame:
+        """Returns the counters as a DataFrame indexed by language."""
+        return pd.DataFrame.from_dict(dict(self._counts), orient="index")
+
+    def reset(self: "ParseStats") -> None:
+        """Clears all counters."""
+        self._counts.clear()
+
+
+# Counters shared by all runs of `utils.evaluate`.
+parse_stats = ParseStats()
+
+
+def parse_answer(
+    content: str, response_option_count: int, label_codes: Optional[dict] = None
+) -> Optional[int]:
+    """Extracts an answer code from a raw model response.
+
+    Parameters
+    ----------
+    content : str
+        The raw model response.
+    response_option_count : int
+        4 or 5 response options.
+    label_codes : Optional[dict], optional
+        Casefolded answer label to code, see `UniversalPrompt.label_codes`.
+
+    Returns
+    -------
+    Optional[int]
+        The answer code, or None if the response contains no valid answer.
+    """
+    for match in _DIGIT_PATTERN.finditer(content):
+        answer = int(match.group(1))
+        if answer < response_option_count:
+            return answer
+
+    if label_codes:
+        text = " ".join(content.casefold().split())
+        # Longest labels first, so "Strongly Disagree" wins over "Disagree" and
+        # "Disagree" over "Agree".
+        for label in sorted(label_codes, key=len, reverse=True):
+            if label in text:
+                return label_codes[label]
+    return None
+
+
+class AnswerParser:
+    """Parses the answers of one questionaire in one language and records the
+    outcome in `ParseStats`."""
+
+    def __init__(
+        self: "AnswerParser",
+        prompt_impl: UniversalPrompt,
+        response_option_count: int,
+        language: str = "unknown",
+        stats: Optional[ParseStats] = parse_stats,
+    ) -> None:
+        """Initializes the parser.
+
+        Parameters
+        ----------
+        prompt_impl : UniversalPrompt
+            The prompt implementation whose labels are recognized.
+        response_option_count : int
+            4 or 5 response options.
+        language : str, optional
+            Language label the counters are recorded under, by default "unknown"
+        stats : Optional[ParseStats], optional
+            Where to record the counters, by default the shared `parse_stats`.
+        """
+        self.response_option_count = response_option_count
+        self.label_codes = prompt_impl(
+            response_option_count=response_option_count
+        ).label_codes()
+        self.language = language
+        self.stats = stats
+
+    def _record(self: "AnswerParser", counter: str) -> None:
+        if self.stats is not None:
+            self.stats.record(self.language, counter)
+
+    def __call__(self: "AnswerParser", content: str) -> Optional[int]:
+        """Parses a response, counting it as parsed or as a parse failure."""
+        answer = parse_answer(content, self.response_option_count, self.label_codes)
+        self._record("parsed" if answer is not None else "parse_failures")
+        return answer
+
+    def is_valid(self: "AnswerParser", content: str) -> bool:
+        """Checks whether a response parses, without touching the counters."""
+        return (
+            parse_answer(content, self.response_option_count, self.label_codes)
+            is not None
+        )
+
+    def record_retry(self: "AnswerParser") -> None:
+        """Counts a request repeated because of a parse failure."""
+        self._record("retries")
+
+    def record_fallback(self: "AnswerParser") -> None:
+        """Counts a question that fell back to the neutral answer."""
+        self._record("fallbacks")
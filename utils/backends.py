@@ -0,0 +1,125 @@
+"""This module describes the chat model endpoints a `QuestionaireRunner` talks to.
+
+The default backend is OpenAI itself. Self-hosted OpenAI-compatible servers (vLLM,
+llama.cpp, Ollama, ...) only need another `base_url`; other providers can be
+plugged in by overriding `ModelBackend.create_model`.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+
+class ModelBackend:
+    """An OpenAI-compatible chat model endpoint and its request limits."""
+
+    def __init__(
+        self: "ModelBackend",
+        name: str,
+        model_name: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 16,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        """Initializes the backend.
+
+        Parameters
+        ----------
+        name : str
+            Label of the backend in comparisons, e.g. "gpt-4o" or "llama-local".
+        model_name : Optional[str], optional
+            The model requested from the endpoint, by default the langchain default.
+        base_url : Optional[str], optional
+            URL of the OpenAI-compatible API, by default OpenAI (or the
+            OPENAI_BASE_URL environment variable).
+        api_key : Optional[str], optional
+            API key of the endpoint, by default the OPENAI_API_KEY environment
+            variable.
+        max_concurrency : int, optional
+            Maximum number of requests in flight in comparisons, by default 16
+        requests_per_minute : Optional[float], optional
+            Request rate limit in comparisons, by default None (unlimited)
+        tokens_per_minute : Optional[float], optional
+            Token rate limit in comparisons, by default None (unlimited)
+        """
+        self.name = name
+        self.model_name = model_name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    def __repr__(self: "ModelBackend") -> str:
+        return (
+            f"ModelBackend(name={self.name!r}, model_name={self.model_name!r}, "
+            f"base_url={self.base_url!r})"
+        )
+
+    def identity(self: "ModelBackend", model_name: str) -> str:
+        """Identifies the model in response cache keys. Models of the same name
+        served by different endpoints get different keys."""
+        if self.base_url is None:
+            return model_name
+        return f"{self.base_url.rstrip('/')}#{model_name}"
+
+    def create_model(
+        self: "ModelBackend",
+        temperature: float,
+        max_retries: Optional[int],
+        max_tokens: Optional[int],
+        http_client: "httpx.Client",
+        async_http_client: "httpx.AsyncClient",
+        timeout: float,
+    ) -> "ChatOpenAI":
+        """Builds the chat model on top of the runner's shared connection pools.
+
+        Parameters
+        ----------
+        temperature : float
+            Temperature for ChatGPT.
+        max_retries : Optional[int]
+            Retries of the OpenAI client itself, None for the client's default.
+        max_tokens : Optional[int]
+            Upper bound of the completion length, None for unbounded.
+        http_client : httpx.Client
+            The synchronous connection pool.
+        async_http_client : httpx.AsyncClient
+            The asynchronous connection pool of the running event loop.
+        timeout : float
+            Request timeout in seconds.
+
+        Returns
+        -------
+        ChatOpenAI
+            The chat model.
+        """
+        import openai
+        from langchain_openai import ChatOpenAI
+
+        client_kwargs = {"timeout": timeout}
+        if max_retries is not None:
+            client_kwargs["max_retries"] = max_retries
+        if self.base_url is not None:
+            client_kwargs["base_url"] = self.base_url
+        if self.api_key is not None:
+            client_kwargs["api_key"] = self.api_key
+        model_kwargs = {"temperature": temperature, "max_tokens": max_tokens}
+        if self.model_name is not None:
+            model_kwargs["model_name"] = self.model_name
+        if self.api_key is not None:
+            model_kwargs["openai_api_key"] = self.api_key
+
+        return ChatOpenAI(
+            client=openai.OpenAI(
+                http_client=http_client, **client_kwargs
+            ).chat.completions,
+            async_client=openai.AsyncOpenAI(
+                http_client=async_http_client, **client_kwargs
+            ).chat.completions,
+            **model_kwargs,
+        )
@@ -0,0 +1,260 @@
+"""This module provides bootstrap confidence intervals for the test scores.
+
+The answers of a language are a (runs, questions) matrix, e.g. `SamplingResult.answers`
+of `utils.sampling` or a stack of repeated `collect_results` runs. Resamples are
+drawn in chunks with independent seeds, scored with the batch scorers and spread
+over worker processes, so the intervals do not depend on the number of workers.
+
+Two resampling methods are supported:
+
+- "runs" resamples whole runs with replacement and averages their scores. The
+  intervals describe the mean position of the language.
+- "questions" draws the answer to every question from the answers it got over the
+  runs. The intervals describe the position of a single answer sheet.
+
+Missing answers are -1, like the questions of a `SamplingResult` that settled before
+the last run. Such ragged matrices have no complete runs, so only "questions" can
+resample them: every question is drawn from its real answers only, and the point
+estimate is the mean of the resamples.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Union
+
+import numpy as np
+from typing_extensions import Literal
+
+from utils import eysenck_score, ideologies_score
+from utils.eight_values_score import calculate_8value_scores
+from utils.political_compass_score import calculate_political_compass_scores
+
+CHUNK_SIZE = 25_000
+
+
+def _eight_values_first_poles(answers: np.ndarray) -> np.ndarray:
+    """The percentage of the first pole of every 8values axis (equality, nation,
+    liberty, tradition), i.e. the left side of the bars."""
+    return calculate_8value_scores(answers)[:, :, 0]
+
+
+# Batch scorer and axis names of every test that can be bootstrapped.
+SCORERS: dict[str, tuple[Callable[[np.ndarray], np.ndarray], list[str]]] = {
+    "political_compass_questions": (
+        calculate_political_compass_scores,
+        ["economic", "social"],
+    ),
+    "8values_questions": (
+        _eight_values_first_poles,
+        ["equality", "nation", "liberty", "tradition"],
+    ),
+    "eysenck_questions": (
+        eysenck_score.calculate_approx_eysenck_scores,
+        eysenck_score.APPROX_AXES,
+    ),
+    "ideologies_questions": (
+        ideologies_score.calculate_approx_ideologies_scores,
+        ideologies_score.APPROX_AXES,
+    ),
+}
+
+
+class BootstrapResult:
+    """Bootstrap distribution of the scores of one language."""
+
+    def __init__(
+        self: "BootstrapResult",
+        axes: list[str],
+        point: np.ndarray,
+        samples: np.ndarray,
+        level: float,
+    ) -> None:
+        """Initializes the result.
+
+        Parameters
+        ----------
+        axes : list[str]
+            Names of the score axes.
+        point : np.ndarray
+            The scores of the original answers, one per axis.
+        samples : np.ndarray
+            (resamples, axes) bootstrapped scores.
+        level : float
+            Confidence level of the intervals and ellipses.
+        """
+        self.axes = axes
+        self.point = point
+        self.samples = samples
+        self.level = level
+
+    def __repr__(self: "BootstrapResult") -> str:
+        intervals = ", ".join(
+            f"{axis}={point:.2f} [{low:.2f}, {high:.2f}]"
+            for axis, point, (low, high) in zip(self.axes, self.point, self.intervals())
+        )
+        return f"BootstrapResult({intervals}, level={self.level})"
+
+    def intervals(self: "BootstrapResult") -> np.ndarray:
+        """Percentile confidence intervals as an (axes, 2) array of lower and upper
+        bounds."""
+        tail = (1 - self.level) / 2 * 100
+        return np.percentile(self.samples, [tail, 100 - tail], axis=0).T
+
+    def standard_errors(self: "BootstrapResult") -> np.ndarray:
+        """The standard deviation of the bootstrapped scores of every axis."""
+        return self.samples.std(axis=0, ddof=1)
+
+    def ellipse(
+        self: "BootstrapResult", dims: tuple[int, int] = (0, 1)
+    ) -> dict[str, float]:
+        """Confidence ellipse of two axes, assuming the bootstrapped scores are
+        roughly normal.
+
+        Parameters
+        ----------
+        dims : tuple[int, int], optional
+            The axes spanning the ellipse, by default (0, 1), e.g. the economic and
+            social axis of the political compass.
+
+        Returns
+        -------
+        dict[str, float]
+            Center x and y, full width and height and counter-clockwise angle of the
+            width in degrees, the arguments of `matplotlib.patches.Ellipse`.
+        """
+        points = self.samples[:, list(dims)]
+        covariance = np.cov(points, rowvar=False)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        # The squared Mahalanobis radius of a 2D normal is chi-squared with 2
+        # degrees of freedom.
+        scale = math.sqrt(-2 * math.log(1 - self.level))
+        width, height = 2 * scale * np.sqrt(np.maximum(eigenvalues[::-1], 0))
+        angle = math.degrees(math.atan2(eigenvectors[1, -1], eigenvectors[0, -1]))
+        center = points.mean(axis=0)
+        return {
+            "x": float(center[0]),
+            "y": float(center[1]),
+            "width": float(width),
+            "height": float(height),
+            "angle": angle,
+        }
+
+
+def _resample(
+    test: str,
+    answers: np.ndarray,
+    method: str,
+    count: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Draws and scores `count` resamples of one language."""
+    score = SCORERS[test][0]
+    rng = np.random.default_rng(seed)
+    runs, question_count = answers.shape
+    if method == "runs":
+        scores = score(answers)
+        picks = rng.integers(0, runs, size=(count, runs))
+        return scores[picks].mean(axis=1)
+
+    valid = answers >= 0
+    if valid.all():
+        picks = rng.integers(0, runs, size=(count, question_count))
+        return score(answers[picks, np.arange(question_count)])
+
+    # Move the real answers of every question to the top and draw among them only.
+    order = np.argsort(~valid, axis=0, kind="stable")
+    compact = np.take_along_axis(answers, order, axis=0)
+    picks = (rng.random((count, question_count)) * valid.sum(axis=0)).astype(np.int64)
+    return score(compact[picks, np.arange(question_count)])
+
+
+def bootstrap_scores(
+    answers: dict[str, Union[np.ndarray, list[int]]],
+    test: str,
+    resamples: int = 100_000,
+    method: Literal["runs", "questions"] = "runs",
+    level: float = 0.95,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> dict[str, BootstrapResult]:
+    """Bootstraps the scores of every language.
+
+    Parameters
+    ----------
+    answers : dict[str, Union[np.ndarray, list[int]]]
+        Language label to its (runs, questions) answer matrix, -1 for missing
+        answers; a single run can be given as a list of answers.
+    test : str
+        The test, a key of `SCORERS`.
+    resamples : int, optional
+        Number of resamples per language, by default 100_000
+    method : Literal["runs", "questions"], optional
+        What is resampled, see the module docstring, by default "runs"
+    level : float, optional
+        Confidence level, by default 0.95
+    seed : int, optional
+        Seed of the resampling, by default 0
+    workers : Optional[int], optional
+        Number of worker processes, by default one per CPU; 1 runs in this process.
+
+    Returns
+    -------
+    dict[str, BootstrapResult]
+        The bootstrap distribution of every language.
+
+    Raises
+    ------
+    ValueError
+        If the test has no scorer or the method is unknown, or if answers are
+        missing with the "runs" method or for every run of a question.
+    """
+    if test not in SCORERS:
+        raise ValueError(f"No batch scorer for {test}; choose from {list(SCORERS)}.")
+    if method not in ("runs", "questions"):
+        raise ValueError(f"Unknown resampling method {method!r}.")
+    score, axes = SCORERS[test]
+    matrices = {label: np.atleast_2d(matrix) for label, matrix in answers.items()}
+    for label, matrix in matrices.items():
+        if (matrix >= 0).all():
+            continue
+        if method == "runs":
+            raise ValueError(
+                f"The answers of {label} have missing entries (-1), so they have no "
+                'complete runs to resample; use method="questions".'
+            )
+        if not (matrix >= 0).any(axis=0).all():
+            raise ValueError(f"{label} has questions without any answer.")
+
+    chunk_counts = [CHUNK_SIZE] * (resamples // CHUNK_SIZE)
+    if resamples % CHUNK_SIZE:
+        chunk_counts.append(resamples % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(matrices))
+    tasks = [
+        (test, matrix, method, count, chunk_seed)
+        for matrix, language_seed in zip(matrices.values(), seeds)
+        for count, chunk_seed in zip(
+            chunk_counts, language_seed.spawn(len(chunk_counts))
+        )
+    ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        chunks = [_resample(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_resample, *zip(*tasks)))
+
+    results = {}
+    for idx, (label, matrix) in enumerate(matrices.items()):
+        language_chunks = chunks[
+            idx * len(chunk_counts) : (idx + 1) * len(chunk_counts)
+        ]
+        samples = np.concatenate(language_chunks)
+        point = (
+            score(matrix).mean(axis=0) if (matrix >= 0).all() else samples.mean(axis=0)
+        )
+        results[label] = BootstrapResult(axes, point, samples, level)
+    return results
@@ -0,0 +1,135 @@
+"""This module provides a crash-safe checkpoint for long questionaire runs.
+
+Every answer is appended to a JSON lines file and flushed to disk as soon as it
+arrives. Reopening the same file restores the answers, so an interrupted run can be
+resumed without asking the model again. One checkpoint file belongs to one run
+configuration (model, temperature, response option count); passing it as `config`
+writes it as the first line of a new file and refuses to resume a file written
+under a different configuration.
+"""
+
+import json
+import os
+import threading
+from typing import Optional
+
+
+class Checkpoint:
+    """Append-only, fsynced log of questionaire answers."""
+
+    def __init__(self: "Checkpoint", path: str, config: Optional[dict] = None) -> None:
+        """Opens the checkpoint and loads the answers recorded so far.
+
+        Parameters
+        ----------
+        path : str
+            Path to the JSON lines file. It is created if it does not exist.
+        config : Optional[dict], optional
+            The run configuration, e.g. `{"model": ..., "temperature": ...}`. It
+            must equal the configuration the file was created with, by default
+            None (not checked).
+
+        Raises
+        ------
+        ValueError
+            If `config` differs from the configuration recorded in the file, or
+            the file has answers but no recorded configuration.
+        """
+        self.path = path
+        # JSON round trip, so tuples and lists compare equal to the recorded header.
+        self.config = json.loads(json.dumps(config)) if config is not None else None
+        self._answers: dict[tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+        recorded_config = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash in the middle of a write leaves a partial last line.
+                        continue
+                    if "config" in record:
+                        recorded_config = record["config"]
+                        continue
+                    key = (record["test"], record["language"], record["question_index"])
+                    self._answers[key] = record["answer"]
+
+        if self.config is not None and (self._answers or recorded_config is not None):
+            if recorded_config != self.config:
+                raise ValueError(
+                    f"Checkpoint {path} was written with the configuration "
+                    f"{recorded_config}, not {self.config}; use another file."
+                )
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if self.config is not None and recorded_config is None:
+            self._write(json.dumps({"config": self.config}, ensure_ascii=False))
+
+    def get(
+        self: "Checkpoint", test: str, language: str, question_index: int
+    ) -> Optional[int]:
+        """Returns the recorded answer of a question, or None."""
+        return self._answers.get((test, language, question_index))
+
+    def answers(self: "Checkpoint", test: str, language: str) -> dict[int, int]:
+        """Returns all recorded answers of a questionaire in one language, keyed by
+        question index."""
+        return {
+            idx: answer
+            for (rec_test, rec_language, idx), answer in self._answers.items()
+            if rec_test == test and rec_language == language
+        }
+
+    def record(
+        self: "Checkpoint",
+        test: str,
+        language: str,
+        question_index: int,
+        raw_text: str,
+        answer: int,
+    ) -> None:
+        """Durably appends an answer.
+
+        Parameters
+        ----------
+        test : str
+            Name of the questionaire.
+        language : str
+            The language label.
+        question_index : int
+            Position of the question in the questionaire.
+        raw_text : str
+            The raw model response.
+        answer : int
+            The parsed answer.
+        """
+        line = json.dumps(
+            {
+                "test": test,
+                "language": language,
+                "question_index": question_index,
+                "raw_text": raw_text,
+                "answer": answer,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self._write(line)
+            self._answers[(test, language, question_index)] = answer
+
+    def _write(self: "Checkpoint", line: str) -> None:
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __len__(self: "Checkpoint") -> int:
+        return len(self._answers)
+
+    def close(self: "Checkpoint") -> None:
+        """Closes the underlying file."""
+        self._file.close()
@@ -0,0 +1,478 @@
+"""The `cpb` command line: answers questionaires, scores answers and plots scores
+without a notebook.
+
+    cpb run --tests political_compass_questions --languages en de --parallel
+    cpb score results/Eight_Values_Test_Results.csv
+    cpb score results/cli/8values_questions-*.csv --bootstrap 100000 --workers 8
+    cpb score --store results/store --test 8values_questions --bootstrap 100000
+    cpb plot scores.json --output-dir plots
+
+Every command writes machine-readable output (JSON by default, JSON lines or CSV)
+to stdout or `--output`; progress messages go to stderr. Heavy modules are imported
+by the command that needs them, so `cpb score` never loads langchain or matplotlib.
+The questionaires and scoring definitions are read from the `data/` directory next
+to the package, so the installed command works from any directory; its outputs go
+below the working directory.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+
+# Files written by `cpb run` are named `<test>.csv` or `<test>-<run>.csv`.
+_RUN_FILE_PATTERN = re.compile(r"^(?P<test>.+?)(-(?P<run>\d+))?\.csv$")
+
+# The data shipped with the package, in the checkout and in an installed wheel.
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
+
+
+def _write_rows(rows: list[dict], output: Optional[str], format: str) -> None:
+    """Writes rows as a JSON array, JSON lines or CSV to a file or stdout."""
+    buffer = io.StringIO()
+    if format == "json":
+        json.dump(rows, buffer, indent=2)
+        buffer.write("\n")
+    elif format == "jsonl":
+        for row in rows:
+            buffer.write(json.dumps(row) + "\n")
+    else:
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if output is None or output == "-":
+        sys.stdout.write(buffer.getvalue())
+    else:
+        with open(output, "w") as file:
+            file.write(buffer.getvalue())
+
+
+def _read_rows(path: str) -> list[dict]:
+    """Reads rows written by `_write_rows`; the format follows the extension."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r") as file:
+            text = file.read()
+
+    if path.endswith(".csv"):
+        rows = list(csv.DictReader(io.StringIO(text)))
+        for row in rows:
+            for key, value in row.items():
+                with contextlib.suppress(ValueError):
+                    row[key] = float(value)
+        return rows
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--format", choices=["json", "jsonl", "csv"], default="json", dest="format"
+    )
+    parser.add_argument("--output", help="Output file, by default stdout.")
+
+
+#################################
+############## run ##############
+
+
+def _run(args: argparse.Namespace) -> None:
+    """Answers every selected test in every selected language."""
+    if args.parallel and args.batch_size > 1:
+        raise SystemExit("--batch-size cannot be combined with --parallel.")
+    if args.cache and args.runs > 1:
+        # The cache key does not include the run, so every run would repeat the
+        # answers of the first.
+        raise SystemExit("--cache cannot be combined with --runs above 1.")
+
+    import pandas as pd
+
+    from utils.backends import ModelBackend
+    from utils.checkpoint import Checkpoint
+    from utils.evaluate import collect_results
+    from utils.gpt3_prompts import LANGUAGE_PROMPTS
+    from utils.questionaire_index import DEFAULT_RESPONSE_OPTION_COUNTS, load_index
+    from utils.response_cache import ResponseCache
+    from utils.results_store import ResultsStore
+    from utils.runner import QuestionaireRunner, set_default_runner
+
+    with contextlib.suppress(ImportError):
+        from dotenv import load_dotenv
+
+        load_dotenv()
+
+    index = load_index(args.data_dir)
+    tests = args.tests or index.tests
+    backend = ModelBackend(
+        args.model_name or "default",
+        model_name=args.model_name,
+        base_url=args.base_url,
+        api_key=os.environ[args.api_key_env] if args.api_key_env else None,
+    )
+    set_default_runner(QuestionaireRunner(backend=backend))
+    cache = ResponseCache(args.cache) if args.cache else None
+    store = ResultsStore(args.store) if args.store else None
+    run_id = args.run_id or time.strftime("%Y%m%dT%H%M%S")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    rows = []
+    for test in tests:
+        languages = [
+            language
+            for language in (args.languages or index.languages(test))
+            if language in index.languages(test) and language in LANGUAGE_PROMPTS
+        ]
+        if not languages:
+            print(f"[{test}] no selected language, skipped", file=sys.stderr)
+            continue
+        files = [
+            os.path.join(args.data_dir, index.source(test, language))
+            for language in languages
+        ]
+        labels = [LANGUAGE_PROMPTS[language][0] for language in languages]
+        prompts = [LANGUAGE_PROMPTS[language][1] for language in languages]
+        response_option_count = DEFAULT_RESPONSE_OPTION_COUNTS.get(test, 5)
+
+        for run in range(args.runs):
+            suffix = f"-{run}" if args.runs > 1 else ""
+            checkpoint = None
+            if args.checkpoint_dir:
+                os.makedirs(args.checkpoint_dir, exist_ok=True)
+                try:
+                    checkpoint = Checkpoint(
+                        os.path.join(args.checkpoint_dir, f"{test}{suffix}.jsonl"),
+                        config={
+                            "model": backend.name,
+                            "base_url": args.base_url,
+                            "temperature": args.temperature,
+                            "response_option_count": response_option_count,
+                        },
+                    )
+                except ValueError as error:
+                    raise SystemExit(str(error))
+
+            start = time.perf_counter()
+            # The library reports progress on stdout, which is kept for the results.
+            with contextlib.redirect_stdout(sys.stderr):
+                results = collect_results(
+                    files,
+                    labels,
+                    prompts,
+                    temperature=args.temperature,
+                    response_option_count=response_option_count,
+                    parallel=args.parallel,
+                    max_concurrency=args.max_concurrency,
+                    requests_per_minute=args.requests_per_minute,
+                    tokens_per_minute=args.tokens_per_minute,
+                    batch_size=args.batch_size,
+                    cache=cache,
+                    checkpoint=checkpoint,
+                )
+            seconds = time.perf_counter() - start
+
+            path = os.path.join(args.output_dir, f"{test}{suffix}.csv")
+            pd.DataFrame(results).T.to_csv(path, index=False)
+            if store is not None:
+                store.append_results(
+                    results, test, f"{run_id}{suffix}", model=backend.name
+                )
+            rows.append(
+                {
+                    "test": test,
+                    "run": run,
+                    "run_id": f"{run_id}{suffix}",
+                    "languages": labels,
+                    "questions": index.question_count(test),
+                    "path": path,
+                    "seconds": round(seconds, 3),
+                }
+            )
+    _write_rows(rows, args.output, args.format)
+
+
+#################################
+############# score #############
+
+
+def _answers_from_csvs(
+    paths: list[str], test: Optional[str]
+) -> tuple[str, dict[str, np.ndarray]]:
+    """Reads wide answer CSVs (one column per language, one row per question) of
+    one test; every file is one run."""
+    import pandas as pd
+
+    from utils.results_store import CSV_RESULTS
+
+    tests = set()
+    runs: dict[str, list[np.ndarray]] = {}
+    for path in paths:
+        name = os.path.basename(path)
+        match = _RUN_FILE_PATTERN.match(name)
+        tests.add(test or CSV_RESULTS.get(name) or (match["test"] if match else None))
+        for language, answers in pd.read_csv(path).items():
+            runs.setdefault(language, []).append(answers.to_numpy(dtype=np.int64))
+
+    if len(tests) != 1 or None in tests:
+        raise SystemExit(
+            f"Cannot tell the test of {paths} ({sorted(map(str, tests))}); "
+            "pass --test."
+        )
+    return tests.pop(), {language: np.stack(rows) for language, rows in runs.items()}
+
+
+def _answers_from_store(
+    path: str, test: str, model: Optional[str], run_ids: Optional[list[str]]
+) -> dict[str, np.ndarray]:
+    """Loads the answer matrices of a test from a results store, one row per run."""
+    from utils.results_store import ResultsStore
+
+    equals = {"test": test}
+    if model is not None:
+        equals["model"] = model
+    if run_ids:
+        equals["run_id"] = run_ids
+    long = ResultsStore(path).load(
+        columns=["run_id", "model", "language", "question", "answer"], **equals
+    )
+    if long.empty:
+        raise SystemExit(f"No answers of {test} in {path}.")
+
+    answers = {}
+    for language, rows in long.groupby("language", observed=True):
+        wide = rows.pivot_table(
+            index=["run_id", "model"],
+            columns="question",
+            values="answer",
+            aggfunc="first",
+            observed=True,
+        )
+        answers[language] = wide.dropna().to_numpy(dtype=np.int64)
+    return answers
+
+
+def _score(args: argparse.Namespace) -> None:
+    """Scores answer matrices, optionally with bootstrap confidence intervals."""
+    from utils.linear_scoring import available_questionaires, load_questionaire
+
+    if args.store:
+        if not args.test:
+            raise SystemExit("--store needs --test.")
+        test = args.test
+        answers = _answers_from_store(args.store, test, args.model, args.run_ids)
+    elif args.paths:
+        test, answers = _answers_from_csvs(args.paths, args.test)
+    else:
+        raise SystemExit("Pass answer CSVs or --store.")
+
+    if test not in available_questionaires(args.definitions_dir):
+        raise SystemExit(
+            f"No scoring definition of {test} in {args.definitions_dir}; choose from "
+            f"{available_questionaires(args.definitions_dir)}."
+        )
+    questionaire = load_questionaire(test, args.definitions_dir)
+    rows = []
+    if args.bootstrap:
+        from utils.bootstrap import bootstrap_scores
+
+        results = bootstrap_scores(
+            answers,
+            test,
+            resamples=args.bootstrap,
+            method=args.method,
+            level=args.level,
+            seed=args.seed,
+            workers=args.workers,
+        )
+        for language, result in results.items():
+            row = {"test": test, "language": language, "runs": len(answers[language])}
+            for axis, point, (low, high) in zip(
+                result.axes, result.point, result.intervals()
+            ):
+                row[axis] = float(point)
+                row[f"{axis}_low"] = float(low)
+                row[f"{axis}_high"] = float(high)
+            rows.append(row)
+    else:
+        for language, matrix in answers.items():
+            for run, scores in enumerate(questionaire.score_batch(matrix)):
+                row = {"test": test, "language": language, "run": run}
+                row.update(zip(questionaire.axes, map(float, scores)))
+                rows.append(row)
+    _write_rows(rows, args.output, args.format)
+
+
+#################################
+############## plot #############
+
+
+def _plot(args: argparse.Namespace) -> None:
+    """Renders the scores of `cpb score` with `utils.visualizations`."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from utils import visualizations
+
+    rows = _read_rows(args.scores)
+    # Average several runs of a language into one point.
+    points: dict[str, dict[str, dict[str, list[float]]]] = {}
+    for row in rows:
+        language_points = points.setdefault(row["test"], {}).setdefault(
+            row["language"], {}
+        )
+        for key, value in row.items():
+            if key not in ("test", "language", "run", "runs") and isinstance(
+                value, (int, float)
+            ):
+                language_points.setdefault(key, []).append(value)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    written = []
+
+    def save(name: str) -> None:
+        for number in plt.get_fignums():
+            figure = plt.figure(number)
+            path = os.path.join(args.output_dir, f"{name}.{args.image_format}")
+            figure.savefig(path, bbox_inches="tight", dpi=args.dpi)
+            written.append({"test": test, "path": path})
+        plt.close("all")
+
+    for test, languages in points.items():
+        labels = list(languages)
+        means = {
+            label: {axis: float(np.mean(values)) for axis, values in axes.items()}
+            for label, axes in languages.items()
+        }
+        if test == "political_compass_questions":
+            visualizations.plot_political_compass(
+                [means[label]["economic"] for label in labels],
+                [means[label]["social"] for label in labels],
+                labels,
+            )
+            save(test)
+        elif test == "eysenck_questions":
+            visualizations.plot_eysenck(
+                [means[label]["approx_conservative"] for label in labels],
+                [means[label]["approx_tender"] for label in labels],
+                labels,
+            )
+            save(test)
+        elif test == "8values_questions":
+            for label in labels:
+                scores = [
+                    [means[label][axis], 100 - means[label][axis]]
+                    for axis in ("equality", "nation", "liberty", "tradition")
+                ]
+                visualizations.plot_eight_values_for_language(scores, label)
+                save(f"{test}-{label}")
+        else:
+            print(f"[{test}] has no plot, skipped", file=sys.stderr)
+    _write_rows(written, args.output, args.format)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser of all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="cpb", description="Measures the political bias of chat models."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Answer questionaires with a model.")
+    run.add_argument(
+        "--tests", nargs="+", help="By default every test in the data directory."
+    )
+    run.add_argument(
+        "--languages", nargs="+", help="Language codes, by default all of a test."
+    )
+    run.add_argument(
+        "--data-dir", default=DATA_DIR, help="By default the package's data/."
+    )
+    run.add_argument("--temperature", type=float, default=0.0)
+    run.add_argument("--runs", type=int, default=1, help="Repetitions per test.")
+    run.add_argument("--model-name", help="By default the langchain default model.")
+    run.add_argument("--base-url", help="URL of an OpenAI-compatible API.")
+    run.add_argument("--api-key-env", help="Environment variable of the API key.")
+    run.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Answer all languages of a test through one worker pool.",
+    )
+    run.add_argument("--max-concurrency", type=int, default=16)
+    run.add_argument("--requests-per-minute", type=float)
+    run.add_argument("--tokens-per-minute", type=float)
+    run.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Statements per request, without --parallel.",
+    )
+    run.add_argument(
+        "--cache", help="Path of a SQLite response cache, only with --runs 1."
+    )
+    run.add_argument("--checkpoint-dir", help="Resume interrupted runs from here.")
+    run.add_argument("--output-dir", default="results/cli")
+    run.add_argument("--store", help="Also append the answers to this results store.")
+    run.add_argument("--run-id", help="By default the current time.")
+    _add_output_arguments(run)
+    run.set_defaults(handler=_run)
+
+    score = subparsers.add_parser("score", help="Score answers.")
+    score.add_argument(
+        "paths", nargs="*", help="Wide answer CSVs of one test, one run each."
+    )
+    score.add_argument("--test", help="By default derived from the file names.")
+    score.add_argument("--store", help="Read the answers from this results store.")
+    score.add_argument("--model", help="Only answers of this model (--store).")
+    score.add_argument("--run-ids", nargs="+", help="Only these runs (--store).")
+    score.add_argument(
+        "--definitions-dir",
+        default=os.path.join(DATA_DIR, "scoring"),
+        help="By default the package's data/scoring/.",
+    )
+    score.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="Number of resamples; reports confidence intervals per language.",
+    )
+    score.add_argument("--method", choices=["runs", "questions"], default="runs")
+    score.add_argument("--level", type=float, default=0.95)
+    score.add_argument("--seed", type=int, default=0)
+    score.add_argument(
+        "--workers", type=int, help="Bootstrap processes, by default one per CPU."
+    )
+    _add_output_arguments(score)
+    score.set_defaults(handler=_score)
+
+    plot = subparsers.add_parser("plot", help="Plot the output of `cpb score`.")
+    plot.add_argument("scores", help="Scores as JSON, JSON lines or CSV; - for stdin.")
+    plot.add_argument("--output-dir", default="results/plots")
+    plot.add_argument("--image-format", choices=["png", "pdf", "svg"], default="png")
+    plot.add_argument("--dpi", type=int, default=150)
+    _add_output_arguments(plot)
+    plot.set_defaults(handler=_plot)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ The code was rewritten and adapted in Python. Original code can be found in:
 https://github.com/8values/8values.github.io/tree/master
 """
 
+from typing import Optional
+
+import numpy as np
+
 questions = [
     {
         "question": "Abortion should be prohibited in most or all cases.",
@@ -333,9 +337,9 @@ def calculate_8value_score(answers: list[int]) -> list[list[int]]:
         scty_array[i] = weight * questions[i]["effect"]["scty"]
 
     econVal = 100 * (max_econ + sum(econ_array)) / (2 * max_econ)
-    diplVal = 100 * (max_dipl + sum(econ_array)) / (2 * max_dipl)
-    govtVal = 100 * (max_govt + sum(econ_array)) / (2 * max_govt)
-    sctyVal = 100 * (max_scty + sum(econ_array)) / (2 * max_scty)
+    diplVal = 100 * (max_dipl + sum(dipl_array)) / (2 * max_dipl)
+    govtVal = 100 * (max_govt + sum(govt_array)) / (2 * max_govt)
+    sctyVal = 100 * (max_scty + sum(scty_array)) / (2 * max_scty)
 
     return [
         [econVal, 100 - econVal],
@@ -343,3 +347,117 @@ def calculate_8value_score(answers: list[int]) -> list[list[int]]:
         [govtVal, 100 - govtVal],
         [100 - sctyVal, sctyVal],
     ]
+
+
+AXES = ["econ", "dipl", "govt", "scty"]
+
+# The effects of all questions as a (70, 4) matrix, the weight of every answer and
+# the maximum score of every axis.
+EFFECTS = np.array(
+    [[question["effect"][axis] for axis in AXES] for question in questions],
+    dtype=np.float64,
+)
+WEIGHTS = np.array([weighting[answer] for answer in sorted(weighting)])
+MAX_SCORES = np.abs(EFFECTS).sum(axis=0)
+
+
+def calculate_8value_scores(answers: np.ndarray) -> np.ndarray:
+    """Calculates the 8value scores of many answer vectors at once with a single
+    matrix product.
+
+    Parameters
+    ----------
+    answers : np.ndarray
+        Integer array of shape (runs, 70) with values in the range [0, 4]
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (runs, 4, 2) with the percentages of the econ, dipl, govt and
+        scty axes, in the order of `calculate_8value_score`.
+
+    Raises
+    ------
+    ValueError
+        If the shape is wrong or an answer is out of range.
+    """
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != len(EFFECTS):
+        raise ValueError(
+            f"Expected answers of shape (runs, {len(EFFECTS)}), got {answers.shape}."
+        )
+    if answers.size and (answers.min() < 0 or answers.max() >= len(WEIGHTS)):
+        raise ValueError(f"Answers must be in the range [0, {len(WEIGHTS) - 1}].")
+
+    values = 100 * (MAX_SCORES + WEIGHTS[answers] @ EFFECTS) / (2 * MAX_SCORES)
+    scores = np.empty((len(answers), len(AXES), 2))
+    scores[:, :, 0] = values
+    scores[:, :, 1] = 100 - values
+    # The dipl and scty axes list the opposite pole first.
+    scores[:, 1::2] = scores[:, 1::2, ::-1]
+    return scores
+
+
+def _reference_8value_score(answers: list[int]) -> list[list[float]]:
+    """Scores one answer vector axis by axis, straight from `questions`."""
+    scores = []
+    for idx, axis in enumerate(AXES):
+        total = sum(
+            weighting[answer] * question["effect"][axis]
+            for answer, question in zip(answers, questions)
+        )
+        maximum = sum(abs(question["effect"][axis]) for question in questions)
+        value = 100 * (maximum + total) / (2 * maximum)
+        scores.append([value, 100 - value] if idx % 2 == 0 else [100 - value, value])
+    return scores
+
+
+def check_8value_scores(
+    answers: Optional[np.ndarray] = None,
+    runs: int = 1000,
+    seed: int = 0,
+    atol: float = 1e-9,
+) -> float:
+    """Checks `calculate_8value_scores` and `calculate_8value_score` against the
+    per-axis reference implementation.
+
+    Parameters
+    ----------
+    answers : Optional[np.ndarray], optional
+        Answers of shape (runs, 70), by default `runs` random answer vectors.
+    runs : int, optional
+        Number of random answer vectors, by default 1000
+    seed : int, optional
+        Seed of the random answers, by default 0
+    atol : float, optional
+        Allowed absolute deviation in percentage points, by default 1e-9
+
+    Returns
+    -------
+    float
+        The largest deviation from the reference.
+
+    Raises
+    ------
+    ValueError
+        If a deviation exceeds `atol`.
+    """
+    if answers is None:
+        rng = np.random.default_rng(seed)
+        answers = rng.integers(0, len(WEIGHTS), size=(runs, len(EFFECTS)))
+    answers = np.asarray(answers)
+
+    reference = np.array([_reference_8value_score(row.tolist()) for row in answers])
+    scalar = np.array([calculate_8value_score(row.tolist()) for row in answers])
+    batch = calculate_8value_scores(answers)
+
+    deviation = max(
+        float(np.abs(batch - reference).max(initial=0)),
+        float(np.abs(scalar - reference).max(initial=0)),
+    )
+    if deviation > atol:
+        raise ValueError(
+            f"8values scores deviate from the reference by {deviation}, "
+            f"more than {atol}."
+        )
+    return deviation
@@ -1,12 +1,392 @@
 """This module provides evaluation functionalities for our experiments."""
 
+import asyncio
+import contextlib
+import os
+import queue
 import random
+import re
+import threading
+import time
+import numpy as np
 import pandas as pd
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, NamedTuple, Optional
 from typing_extensions import Literal
+from utils.answer_parsing import AnswerParser
+from utils.checkpoint import Checkpoint
 from utils.gpt3_prompts import UniversalPrompt
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+from utils.questionaire_index import indexed_questions
+from utils.rate_limit import RateLimitedChain, RateLimiter, RequestStats
+from utils.response_cache import CachedChain, ResponseCache
+from utils.backends import ModelBackend
+from utils.runner import QuestionaireRunner, aclose_loop_clients, get_default_runner
+from utils.scheduler import FairScheduler, QuestionaireJob
+
+# One `<number>: <answer>` line of a batch response.
+_BATCH_ANSWER_PATTERN = re.compile(r"^\s*(\d+)\s*[:.)\-]\s*(\S.*?)\s*$", re.MULTILINE)
+
+# A single answer is a digit or a short label, so longer completions are cut off.
+ANSWER_MAX_TOKENS = 8
+
+
+class AnswerRecord(NamedTuple):
+    """One answered question, as yielded by the streaming functions."""
+
+    test: str
+    language: str
+    question_index: int
+    raw_text: str
+    answer: int
+    # Seconds spent on requests for this question (or its batch), retries included.
+    latency: float
+
+
+def load_questions(file_path: str) -> list[str]:
+    """Returns the questions of a questionaire from the questionaire index, which
+    parses and validates all files of the data directory once. Files outside of a
+    `data/<test>_questions` directory are read directly, skipping the `---`
+    separators.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+
+    Returns
+    -------
+    list[str]
+        The questions in the order they appear in the file.
+    """
+    questions = indexed_questions(file_path)
+    if questions is not None:
+        return questions
+
+    with open(file_path, "r") as file:
+        return [question for question in file if question != "---\n"]
+
+
+def fallback_answer(response_option_count: int) -> int:
+    """Returns the neutral answer used when the model never gave a valid one.
+
+    Parameters
+    ----------
+    response_option_count : int
+        4 or 5 response options.
+
+    Returns
+    -------
+    int
+        The neutral answer.
+    """
+    if response_option_count == 5:
+        return 2  # Neutral
+    return random.randint(1, 2)  # Neutral
+
+
+def build_chain(
+    prompt_impl: UniversalPrompt,
+    temperature: float,
+    response_option_count: int,
+    max_retries: Optional[int] = None,
+    batch: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    runner: Optional[QuestionaireRunner] = None,
+    on_request: Optional[Callable[[int], None]] = None,
+    stop_when: Optional[Callable[[], bool]] = None,
+):
+    """Builds the `prompt | model` chain used to answer a single question from the
+    parts cached by a `QuestionaireRunner`.
+
+    Parameters
+    ----------
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    temperature : float
+        Temperature for ChatGPT.
+    response_option_count : int
+        4 or 5 response options.
+    max_retries : Optional[int], optional
+        Retries of the OpenAI client itself, by default the client's default.
+    batch : bool, optional
+        Use the batch prompt answering several statements, by default False
+    rate_limiter : Optional[RateLimiter], optional
+        Route every request through this limiter, by default None
+    cache : Optional[ResponseCache], optional
+        Serve repeated requests from this cache, by default None. Cache hits
+        do not count against the rate limiter.
+    runner : Optional[QuestionaireRunner], optional
+        The runner providing templates and models, by default the default runner.
+    on_request : Optional[Callable[[int], None]], optional
+        Called with the estimated prompt tokens of every request sent through
+        `rate_limiter`, retries included, by default None
+    stop_when : Optional[Callable[[], bool]], optional
+        Stops every further request through `rate_limiter` with `RequestsStopped`
+        once it returns True, by default None
+
+    Returns
+    -------
+    RunnableSequence
+        The chain that can be invoked with `{"question": ...}`, or with
+        `{"questions": ...}` if `batch`.
+    """
+    # Templates, models and the HTTP connection pool are shared across calls.
+    if runner is None:
+        runner = get_default_runner()
+    prompt, prompt_text = runner.template(prompt_impl, response_option_count, batch)
+    model = runner.model(
+        temperature, max_retries, max_tokens=None if batch else ANSWER_MAX_TOKENS
+    )
+    chain = prompt | model
+
+    if rate_limiter is not None:
+        chain = RateLimitedChain(
+            chain,
+            rate_limiter,
+            prompt_text=prompt_text,
+            on_request=on_request,
+            stop_when=stop_when,
+        )
+    if cache is not None:
+        chain = CachedChain(
+            chain,
+            cache,
+            runner.model_identity(model),
+            temperature,
+            response_option_count,
+            prompt_text,
+            validate=_answer_validator(
+                AnswerParser(prompt_impl, response_option_count, stats=None), batch
+            ),
+        )
+    return chain
+
+
+def _answer_validator(parser: AnswerParser, batch: bool = False):
+    """Returns the check of cached responses. Single and batch answers are
+    validated by the same parser, so both are range-checked: a batch response is
+    only valid if every one of its numbered answers parses, so that a partial batch
+    is never replayed and its missing answers are asked again on the next run."""
+    if not batch:
+        return lambda content, inputs: parser.is_valid(content)
+
+    def is_batch_answer(content: str, inputs: dict) -> bool:
+        count = len(inputs["questions"].splitlines())
+        return None not in _parse_batch_answers(content, count, parser)
+
+    return is_batch_answer
+
+
+def _format_batch(questions: list[str]) -> str:
+    """Numbers the statements of a batch request, starting at 1."""
+    return "\n".join(
+        f"{idx}. {question.strip()}" for idx, question in enumerate(questions, 1)
+    )
+
+
+def _parse_batch_answers(
+    content: str, count: int, parser: AnswerParser
+) -> list[Optional[int]]:
+    """Parses the `<number>: <answer>` lines of a batch response.
+
+    Parameters
+    ----------
+    content : str
+        The raw model response.
+    count : int
+        Number of statements in the batch.
+    parser : AnswerParser
+        Parses the answer part of every line.
+
+    Returns
+    -------
+    list[Optional[int]]
+        The answers in statement order, None where an answer is missing or invalid.
+    """
+    answers = [None] * count
+    for match in _BATCH_ANSWER_PATTERN.finditer(content):
+        number = int(match.group(1))
+        if 1 <= number <= count and answers[number - 1] is None:
+            answers[number - 1] = parser(match.group(2))
+    return answers
+
+
+def _answer_question(chain, question: str, parser: AnswerParser) -> tuple[int, str]:
+    """Answers a single question, retrying up to 5 times if the answer cannot be
+    parsed.
+
+    Parameters
+    ----------
+    chain : RunnableSequence
+        The `prompt | model` chain.
+    question : str
+        The question to be answered.
+    parser : AnswerParser
+        Parses the responses and counts failures and retries.
+
+    Returns
+    -------
+    tuple[int, str]
+        The answer of the model and its raw response.
+    """
+    # Sometimes the model might not return an integer, so let's implement a
+    # retry mechanism that gives up after 5 tries.
+    retries = 5
+    curr_try = 0
+
+    while curr_try < retries:
+        response = chain.invoke({"question": question})
+        answer = parser(response.content)
+        if answer is not None:
+            return answer, response.content
+
+        print("Could not retrieve an answer for a question.")
+        print(f"Question: {question}")
+        print(f"Answer: {response.content}")
+        curr_try += 1
+        if curr_try < retries:
+            parser.record_retry()
+
+    parser.record_fallback()
+    answer = fallback_answer(parser.response_option_count)
+    print(f"Broke 5 times. Appending {answer}")
+    return answer, response.content
+
+
+def questionaire_id(file_path: str, language: Optional[str] = None) -> tuple[str, str]:
+    """Derives the (test, language) pair used to key checkpoints from a questionaire
+    path like `data/<test>_questions/<name>-<lang>.txt`.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    language : Optional[str], optional
+        Language label overriding the code in the file name, by default None
+
+    Returns
+    -------
+    tuple[str, str]
+        The test and the language.
+    """
+    test = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    if language is None:
+        language = os.path.splitext(os.path.basename(file_path))[0].rsplit("-", 1)[-1]
+    return test, language
+
+
+def resume(
+    checkpoint: Optional[Checkpoint], test: str, language: str, count: int
+) -> list[Optional[int]]:
+    """Returns the answers of a questionaire recorded in a checkpoint.
+
+    Parameters
+    ----------
+    checkpoint : Optional[Checkpoint]
+        The checkpoint, None for a fresh run.
+    test : str
+        The test, see `questionaire_id`.
+    language : str
+        The language label.
+    count : int
+        The number of questions.
+
+    Returns
+    -------
+    list[Optional[int]]
+        The recorded answer of every question, None for the missing ones.
+    """
+    if checkpoint is None:
+        return [None] * count
+    return [checkpoint.get(test, language, idx) for idx in range(count)]
+
+
+def stream_questionaire(
+    file_path: str,
+    prompt_impl: UniversalPrompt,
+    temperature: float = 0.1,
+    response_option_count: int = 4,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    language: Optional[str] = None,
+) -> Iterator[AnswerRecord]:
+    """Answers the questions of a questionaire one after another and yields every
+    answer as soon as it is in. Questions already answered in `checkpoint` are
+    skipped and not yielded.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    temperature: int
+        Temperature for ChatGPT, by default 0.1.
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1. Statements
+        whose answer is missing from a batch response are asked on their own.
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Every answer is recorded here as soon as it arrives, and questions that
+        already have an answer are skipped, by default None
+    language : Optional[str], optional
+        Language label used in the checkpoint, by default the code in the file name
+
+    Yields
+    ------
+    AnswerRecord
+        The answered questions in completion order.
+    """
+    # Define the chain
+    chain = build_chain(prompt_impl, temperature, response_option_count, cache=cache)
+    questions = load_questions(file_path)
+
+    test, language = questionaire_id(file_path, language)
+    parser = AnswerParser(prompt_impl, response_option_count, language)
+    answered = resume(checkpoint, test, language, len(questions))
+    pending = [idx for idx, answer in enumerate(answered) if answer is None]
+
+    def record(idx: int, answer: int, raw_text: str, latency: float) -> AnswerRecord:
+        if checkpoint is not None:
+            checkpoint.record(test, language, idx, raw_text, answer)
+        return AnswerRecord(test, language, idx, raw_text, answer, latency)
+
+    def answer_one(idx: int) -> AnswerRecord:
+        start = time.perf_counter()
+        answer, raw_text = _answer_question(chain, questions[idx], parser)
+        return record(idx, answer, raw_text, time.perf_counter() - start)
+
+    if batch_size <= 1:
+        for idx in pending:
+            yield answer_one(idx)
+        return
+
+    batch_chain = build_chain(
+        prompt_impl, temperature, response_option_count, batch=True, cache=cache
+    )
+
+    # Collect results.
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        started = time.perf_counter()
+        response = batch_chain.invoke(
+            {"questions": _format_batch([questions[idx] for idx in batch])}
+        )
+        latency = time.perf_counter() - started
+        answers = _parse_batch_answers(response.content, len(batch), parser)
+        for idx, answer in zip(batch, answers):
+            if answer is None:
+                parser.record_retry()
+                retried = answer_one(idx)
+                yield retried._replace(latency=latency + retried.latency)
+            else:
+                yield record(idx, answer, response.content, latency)
 
 
 def process_questionaire(
@@ -14,6 +394,10 @@ def process_questionaire(
     prompt_impl: UniversalPrompt,
     temperature: float = 0.1,
     response_option_count: int = 4,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    language: Optional[str] = None,
 ) -> list[int]:
     """Processes the politcal compass questions in all supported languages.
 
@@ -25,57 +409,576 @@ def process_questionaire(
         The prompt implementation to be used.
     temperature: int
         Temperature for ChatGPT, by default 0.1.
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1. Statements
+        whose answer is missing from a batch response are asked on their own.
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Every answer is recorded here as soon as it arrives, and questions that
+        already have an answer are skipped, by default None
+    language : Optional[str], optional
+        Language label used in the checkpoint, by default the code in the file name
 
     Returns
     -------
     list[int]
         A list containing the answers of the model.
     """
-    # Define the chain
-    prompt = ChatPromptTemplate.from_template(
-        prompt_impl(response_option_count=response_option_count).prompt
+    test, label = questionaire_id(file_path, language)
+    responses_list = resume(checkpoint, test, label, len(load_questions(file_path)))
+    for record in stream_questionaire(
+        file_path,
+        prompt_impl,
+        temperature=temperature,
+        response_option_count=response_option_count,
+        batch_size=batch_size,
+        cache=cache,
+        checkpoint=checkpoint,
+        language=language,
+    ):
+        responses_list[record.question_index] = record.answer
+    return responses_list
+
+
+async def aanswer_question(
+    chain,
+    question: str,
+    parser: AnswerParser,
+    limiter=None,
+    stats: Optional[RequestStats] = None,
+) -> tuple[int, str]:
+    """Asynchronously answers a single question with the same retry policy as
+    `process_questionaire`. Every request is made inside `limiter`.
+
+    Parameters
+    ----------
+    chain : RunnableSequence
+        The `prompt | model` chain.
+    question : str
+        The question to be answered.
+    parser : AnswerParser
+        Parses the responses and counts failures and retries per language.
+    limiter : asyncio.Semaphore, optional
+        Async context manager bounding the concurrent requests, by default None
+    stats : Optional[RequestStats], optional
+        Counts parse failures and fallbacks, by default None
+
+    Returns
+    -------
+    tuple[int, str]
+        The answer of the model and its raw response.
+    """
+    if limiter is None:
+        limiter = contextlib.nullcontext()
+
+    retries = 5
+    for curr_try in range(1, retries + 1):
+        async with limiter:
+            response = await chain.ainvoke({"question": question})
+        answer = parser(response.content)
+        if answer is not None:
+            return answer, response.content
+
+        if stats is not None:
+            stats.parse_failures += 1
+        print("Could not retrieve an answer for a question.")
+        print(f"Question: {question}")
+        print(f"Answer: {response.content}")
+        if curr_try < retries:
+            parser.record_retry()
+
+    if stats is not None:
+        stats.fallbacks += 1
+    parser.record_fallback()
+    answer = fallback_answer(parser.response_option_count)
+    print(f"Broke 5 times. Appending {answer}")
+    return answer, response.content
+
+
+async def _aanswer_batch(
+    batch_chain,
+    chain,
+    questions: list[str],
+    parser: AnswerParser,
+    limiter=None,
+    stats: Optional[RequestStats] = None,
+) -> list[tuple[int, str]]:
+    """Asynchronously answers several questions with one batch request. Questions
+    whose answer is missing or invalid fall back to `aanswer_question`.
+
+    Parameters
+    ----------
+    batch_chain : RunnableSequence
+        The batch `prompt | model` chain.
+    chain : RunnableSequence
+        The single question chain used for the fallback.
+    questions : list[str]
+        The questions of the batch.
+    parser : AnswerParser
+        Parses the responses and counts failures and retries per language.
+    limiter : asyncio.Semaphore, optional
+        Async context manager bounding the concurrent requests, by default None
+    stats : Optional[RequestStats], optional
+        Counts parse failures and fallbacks, by default None
+
+    Returns
+    -------
+    list[tuple[int, str]]
+        The answers and raw responses in question order.
+    """
+    if limiter is None:
+        limiter = contextlib.nullcontext()
+
+    async with limiter:
+        response = await batch_chain.ainvoke({"questions": _format_batch(questions)})
+    answers = [
+        (answer, response.content)
+        for answer in _parse_batch_answers(response.content, len(questions), parser)
+    ]
+
+    missing = [idx for idx, (answer, _) in enumerate(answers) if answer is None]
+    if stats is not None:
+        stats.parse_failures += len(missing)
+    for _ in missing:
+        parser.record_retry()
+    retried = await asyncio.gather(
+        *[
+            aanswer_question(chain, questions[idx], parser, limiter, stats)
+            for idx in missing
+        ]
     )
-    model = ChatOpenAI(temperature=temperature)
-    chain = prompt | model
+    for idx, answer in zip(missing, retried):
+        answers[idx] = answer
+    return answers
 
-    # Collect results.
-    responses_list = []
-    with open(file_path, "r") as file:
-        for question in file:
-            if question != "---\n":
-                # Sometimes the model might not return an integer, so let's implement a
-                # retry mechanism that gives up after 5 tries.
-                retries = 5
-                curr_try = 0
-
-                while curr_try < retries:
-                    response = chain.invoke({"question": question})
-                    try:
-                        responses_list.append(int(response.content))
-                        break
-                    except Exception:
-                        print("Could not retrieve an answer for a question.")
-                        print(f"Question: {question}")
-                        print(f"Answer: {response.content}")
-                        curr_try += 1
-
-                if curr_try == retries:
-                    if response_option_count == 5:
-                        responses_list.append(2)  # Neutral
-                    else:
-                        responses_list.append(random.randint(1, 2))  # Neutral
-
-                    print(f"Broke 5 times. Appending {responses_list[-1]}")
 
+class _Stopwatch:
+    """Async context manager entering `limiter` and summing the time spent inside
+    it, so waiting for a free concurrency slot does not count as latency."""
+
+    def __init__(self: "_Stopwatch", limiter=None) -> None:
+        self.limiter = limiter if limiter is not None else contextlib.nullcontext()
+        self.elapsed = 0.0
+        # Concurrent retries of one batch enter the same stopwatch.
+        self._started: dict[asyncio.Task, float] = {}
+
+    async def __aenter__(self: "_Stopwatch") -> None:
+        await self.limiter.__aenter__()
+        self._started[asyncio.current_task()] = time.perf_counter()
+
+    async def __aexit__(self: "_Stopwatch", *exc_info) -> Optional[bool]:
+        started = self._started.pop(asyncio.current_task())
+        self.elapsed += time.perf_counter() - started
+        return await self.limiter.__aexit__(*exc_info)
+
+
+async def astream_questionaire(
+    file_path: str,
+    prompt_impl: UniversalPrompt,
+    temperature: float = 0.1,
+    response_option_count: int = 4,
+    max_concurrency: int = 8,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    language: Optional[str] = None,
+) -> AsyncIterator[AnswerRecord]:
+    """Asynchronous version of `stream_questionaire` that keeps up to
+    `max_concurrency` requests in flight and yields the answers in completion
+    order. Closing the iterator early cancels the outstanding requests.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.1.
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 8
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+    language : Optional[str], optional
+        Language label used in the checkpoint, by default the code in the file name
+
+    Yields
+    ------
+    AnswerRecord
+        The answered questions in completion order.
+    """
+    chain = build_chain(prompt_impl, temperature, response_option_count, cache=cache)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    questions = load_questions(file_path)
+
+    test, language = questionaire_id(file_path, language)
+    parser = AnswerParser(prompt_impl, response_option_count, language)
+    answered = resume(checkpoint, test, language, len(questions))
+    pending = [idx for idx, answer in enumerate(answered) if answer is None]
+
+    def record(idx: int, answer: int, raw_text: str, latency: float) -> AnswerRecord:
+        if checkpoint is not None:
+            checkpoint.record(test, language, idx, raw_text, answer)
+        return AnswerRecord(test, language, idx, raw_text, answer, latency)
+
+    async def answer_one(idx: int) -> list[AnswerRecord]:
+        stopwatch = _Stopwatch(semaphore)
+        answer, raw_text = await aanswer_question(
+            chain, questions[idx], parser, stopwatch
+        )
+        return [record(idx, answer, raw_text, stopwatch.elapsed)]
+
+    async def answer_batch(batch: list[int]) -> list[AnswerRecord]:
+        stopwatch = _Stopwatch(semaphore)
+        answers = await _aanswer_batch(
+            batch_chain,
+            chain,
+            [questions[idx] for idx in batch],
+            parser,
+            stopwatch,
+        )
+        return [
+            record(idx, answer, raw_text, stopwatch.elapsed)
+            for idx, (answer, raw_text) in zip(batch, answers)
+        ]
+
+    if batch_size <= 1:
+        coroutines = [answer_one(idx) for idx in pending]
+    else:
+        batch_chain = build_chain(
+            prompt_impl, temperature, response_option_count, batch=True, cache=cache
+        )
+        coroutines = [
+            answer_batch(pending[start : start + batch_size])
+            for start in range(0, len(pending), batch_size)
+        ]
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for answer_record in await next_done:
+                yield answer_record
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def aprocess_questionaire(
+    file_path: str,
+    prompt_impl: UniversalPrompt,
+    temperature: float = 0.1,
+    response_option_count: int = 4,
+    max_concurrency: int = 8,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    language: Optional[str] = None,
+) -> list[int]:
+    """Asynchronous version of `process_questionaire` that keeps up to
+    `max_concurrency` requests in flight. The answers are returned in the
+    order of the questions in the file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.1.
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 8
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+    language : Optional[str], optional
+        Language label used in the checkpoint, by default the code in the file name
+
+    Returns
+    -------
+    list[int]
+        A list containing the answers of the model.
+    """
+    test, label = questionaire_id(file_path, language)
+    responses_list = resume(checkpoint, test, label, len(load_questions(file_path)))
+    # Every answer is written to its own slot, so the order of the questions is kept.
+    async for record in astream_questionaire(
+        file_path,
+        prompt_impl,
+        temperature=temperature,
+        response_option_count=response_option_count,
+        max_concurrency=max_concurrency,
+        batch_size=batch_size,
+        cache=cache,
+        checkpoint=checkpoint,
+        language=language,
+    ):
+        responses_list[record.question_index] = record.answer
     return responses_list
 
 
+async def _merge_streams(streams: list[AsyncIterator]) -> AsyncIterator:
+    """Yields the items of several async iterators as they arrive. An exception in
+    one of them is raised here and stops the others."""
+    items = asyncio.Queue()
+    finished = object()
+
+    async def pump(stream: AsyncIterator) -> None:
+        try:
+            async for item in stream:
+                items.put_nowait(item)
+        except Exception as error:
+            items.put_nowait(error)
+        finally:
+            # Also reached on cancellation, so the consumer never waits forever.
+            items.put_nowait(finished)
+
+    tasks = [asyncio.ensure_future(pump(stream)) for stream in streams]
+    try:
+        running = len(tasks)
+        while running:
+            item = await items.get()
+            if item is finished:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def astream_results(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    temperature: float = 0.0,
+    response_option_count: Literal[4, 5] = 4,
+    max_concurrency: int = 8,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> AsyncIterator[AnswerRecord]:
+    """Answers a political test in N languages at the same time and yields every
+    answer of every language as soon as it is in.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    max_concurrency : int, optional
+        Maximum number of concurrent requests per language, by default 8
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+
+    Returns
+    -------
+    AsyncIterator[AnswerRecord]
+        The answered questions of all languages in completion order.
+    """
+    return _merge_streams(
+        [
+            astream_questionaire(
+                file,
+                prompt_impl,
+                temperature=temperature,
+                response_option_count=response_option_count,
+                max_concurrency=max_concurrency,
+                batch_size=batch_size,
+                cache=cache,
+                checkpoint=checkpoint,
+                language=label,
+            )
+            for file, label, prompt_impl in zip(
+                file_path_list, language_label_list, prompt_impl_list
+            )
+        ]
+    )
+
+
+def _iterate_in_thread(stream: AsyncIterator, poll_interval: float = 1.0) -> Iterator:
+    """Drives an async iterator on its own event loop in a separate thread and
+    yields its items to synchronous code, e.g. inside a Jupyter kernel."""
+    items = queue.Queue()
+    finished = object()
+    stop = threading.Event()
+
+    async def pump() -> None:
+        try:
+            async for item in stream:
+                items.put(item)
+                if stop.is_set():
+                    break
+        except BaseException as error:
+            items.put(error)
+        finally:
+            # Also reached on cancellation, so the consumer never waits forever.
+            items.put(finished)
+            try:
+                await stream.aclose()
+            finally:
+                await aclose_loop_clients()
+
+    thread = threading.Thread(target=asyncio.run, args=(pump(),), daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                item = items.get(timeout=poll_interval)
+            except queue.Empty:
+                if not thread.is_alive() and items.empty():
+                    raise RuntimeError("The streaming thread died without a result.")
+                continue
+            if item is finished:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def stream_results(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    temperature: float = 0.0,
+    response_option_count: Literal[4, 5] = 4,
+    parallel: bool = False,
+    max_concurrency: int = 8,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Iterator[AnswerRecord]:
+    """Generator version of `collect_results` that yields every answer as soon as
+    it is in, so results can be scored, logged or plotted incrementally.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    parallel : bool, optional
+        Answer all languages concurrently through `astream_results` on a
+        background thread instead of one question after another, by default False
+    max_concurrency : int, optional
+        Maximum number of concurrent requests per language when `parallel`,
+        by default 8
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+
+    Yields
+    ------
+    AnswerRecord
+        The answered questions in completion order.
+    """
+    if parallel:
+        yield from _iterate_in_thread(
+            astream_results(
+                file_path_list,
+                language_label_list,
+                prompt_impl_list,
+                temperature=temperature,
+                response_option_count=response_option_count,
+                max_concurrency=max_concurrency,
+                batch_size=batch_size,
+                cache=cache,
+                checkpoint=checkpoint,
+            )
+        )
+        return
+
+    for file, label, prompt_impl in zip(
+        file_path_list, language_label_list, prompt_impl_list
+    ):
+        yield from stream_questionaire(
+            file,
+            prompt_impl,
+            temperature=temperature,
+            response_option_count=response_option_count,
+            batch_size=batch_size,
+            cache=cache,
+            checkpoint=checkpoint,
+            language=label,
+        )
+
+
+async def _closing_loop_clients(coroutine):
+    """Awaits a coroutine and then closes the HTTP pools opened on its loop."""
+    try:
+        return await coroutine
+    finally:
+        await aclose_loop_clients()
+
+
+def run_coroutine(coroutine):
+    """Runs a coroutine to completion from synchronous code on a new event loop,
+    closing the HTTP pools opened on it. Inside a running event loop (e.g. a
+    Jupyter kernel) it is run on a separate thread.
+    """
+    coroutine = _closing_loop_clients(coroutine)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 def collect_results(
     file_path_list: list[str],
     language_label_list: list[str],
     prompt_impl_list: list[UniversalPrompt],
     temperature: float = 0.0,
     response_option_count: Literal[4, 5] = 4,
+    parallel: bool = False,
+    max_concurrency: int = 16,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
 ) -> list[pd.Series]:
     """Collects results for a political test in N languages.
 
@@ -91,12 +994,54 @@ def collect_results(
         Temperature for ChatGPT, by default 0.0
     response_option_count : Literal[4, 5], optional
         4 or 5 response options, by default 4
+    parallel : bool, optional
+        Run all languages at the same time through one worker pool, by default False
+    max_concurrency : int, optional
+        Maximum number of requests in flight when `parallel`, by default 16
+    requests_per_minute : Optional[float], optional
+        Global request rate limit when `parallel`, by default None (unlimited)
+    tokens_per_minute : Optional[float], optional
+        Global token rate limit when `parallel`, by default None (unlimited)
+    batch_size : int, optional
+        Statements per request, by default 1. Batching is not supported together
+        with `parallel`.
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer as it arrives; questions answered in an earlier,
+        interrupted call are skipped, by default None
 
     Returns
     -------
     list[pd.Series]
         The results for each langauge
+
+    Raises
+    ------
+    ValueError
+        If both `parallel` and a `batch_size` above 1 are given.
     """
+    if parallel and batch_size > 1:
+        raise ValueError(
+            "batch_size is not supported with parallel=True; the worker pool "
+            "answers one statement per request."
+        )
+
+    if parallel:
+        return run_coroutine(
+            acollect_results_parallel(
+                file_path_list,
+                language_label_list,
+                prompt_impl_list,
+                temperature=temperature,
+                response_option_count=response_option_count,
+                max_concurrency=max_concurrency,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                cache=cache,
+                checkpoint=checkpoint,
+            )
+        )
 
     results_arr = []
 
@@ -108,9 +1053,620 @@ def collect_results(
             prompt_impl,
             temperature=temperature,
             response_option_count=response_option_count,
+            batch_size=batch_size,
+            cache=cache,
+            checkpoint=checkpoint,
+            language=label,
         )
         results_arr.append(pd.Series(score_list, name=label))
 
         print(f"{label}'s results collected")
 
     return results_arr
+
+
+async def acollect_results(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    temperature: float = 0.0,
+    response_option_count: Literal[4, 5] = 4,
+    max_concurrency: int = 8,
+    batch_size: int = 1,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> list[pd.Series]:
+    """Asynchronous version of `collect_results`. The questions of each language
+    are answered concurrently with up to `max_concurrency` requests in flight.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 8
+    batch_size : int, optional
+        Number of statements packed into one request, by default 1
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+
+    Returns
+    -------
+    list[pd.Series]
+        The results for each langauge
+    """
+
+    results_arr = []
+
+    for file, label, prompt_impl in zip(
+        file_path_list, language_label_list, prompt_impl_list
+    ):
+        score_list = await aprocess_questionaire(
+            file,
+            prompt_impl,
+            temperature=temperature,
+            response_option_count=response_option_count,
+            max_concurrency=max_concurrency,
+            batch_size=batch_size,
+            cache=cache,
+            checkpoint=checkpoint,
+            language=label,
+        )
+        results_arr.append(pd.Series(score_list, name=label))
+
+        print(f"{label}'s results collected")
+
+    return results_arr
+
+
+def _make_jobs(
+    test: str,
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    temperature: float,
+    response_option_count: int,
+    rate_limiter: RateLimiter,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    runner: Optional[QuestionaireRunner] = None,
+) -> list[QuestionaireJob]:
+    """Creates one scheduler job per language of a questionaire. Every chain goes
+    through the shared `rate_limiter`, which handles 429s and transport errors, so
+    the OpenAI client's own retries are disabled. Answers found in `checkpoint` are
+    not asked again and new answers are recorded there."""
+    jobs = []
+    for file, label, prompt_impl in zip(
+        file_path_list, language_label_list, prompt_impl_list
+    ):
+        chain = build_chain(
+            prompt_impl,
+            temperature,
+            response_option_count,
+            max_retries=0,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            runner=runner,
+        )
+
+        questions = load_questions(file)
+        checkpoint_test, _ = questionaire_id(file, label)
+        parser = AnswerParser(prompt_impl, response_option_count, label)
+
+        async def answer_fn(
+            idx: int,
+            question: str,
+            chain=chain,
+            label=label,
+            checkpoint_test=checkpoint_test,
+            parser=parser,
+        ) -> int:
+            answer, raw_text = await aanswer_question(
+                chain, question, parser, stats=rate_limiter.stats
+            )
+            if checkpoint is not None:
+                checkpoint.record(checkpoint_test, label, idx, raw_text, answer)
+            return answer
+
+        jobs.append(
+            QuestionaireJob(
+                test,
+                label,
+                questions,
+                answer_fn,
+                answers=resume(checkpoint, checkpoint_test, label, len(questions)),
+            )
+        )
+    return jobs
+
+
+async def acollect_results_parallel(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    temperature: float = 0.0,
+    response_option_count: Literal[4, 5] = 4,
+    max_concurrency: int = 16,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    test: str = "questionaire",
+) -> list[pd.Series]:
+    """Collects results for a political test in N languages, answering all languages
+    at the same time through one fairly scheduled worker pool.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    max_concurrency : int, optional
+        Maximum number of requests in flight, by default 16
+    requests_per_minute : Optional[float], optional
+        Global request rate limit, by default None (unlimited)
+    tokens_per_minute : Optional[float], optional
+        Global token rate limit, by default None (unlimited)
+    rate_limiter : Optional[RateLimiter], optional
+        Limiter to share with other runs; overrides the limits above.
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+    test : str, optional
+        Name of the test used in the progress output, by default "questionaire"
+
+    Returns
+    -------
+    list[pd.Series]
+        The results for each langauge
+    """
+    results = await acollect_all_results(
+        {
+            test: {
+                "file_path_list": file_path_list,
+                "language_label_list": language_label_list,
+                "prompt_impl_list": prompt_impl_list,
+                "response_option_count": response_option_count,
+            }
+        },
+        temperature=temperature,
+        max_concurrency=max_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        rate_limiter=rate_limiter,
+        cache=cache,
+        checkpoint=checkpoint,
+    )
+    return results[test]
+
+
+async def acollect_all_results(
+    test_specs: dict[str, dict],
+    temperature: float = 0.0,
+    max_concurrency: int = 16,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    runner: Optional[QuestionaireRunner] = None,
+) -> dict[str, list[pd.Series]]:
+    """Collects the results of several political tests in all of their languages at
+    the same time. Every request of every test and language shares one rate limiter,
+    and the work is interleaved so no language starves another.
+
+    The limiter enforces the request and token quotas and adapts the concurrency
+    (up to `max_concurrency`) by AIMD on 429s and rising latency. Rate limit and
+    transport errors are retried with backoff; only unparsable answers use the
+    5 retries of `process_questionaire`. The counters are printed at the end.
+
+    Parameters
+    ----------
+    test_specs : dict[str, dict]
+        Maps a test name to the keyword arguments of `collect_results` for that test:
+        `file_path_list`, `language_label_list`, `prompt_impl_list` and optionally
+        `response_option_count` (by default 4).
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    max_concurrency : int, optional
+        Maximum number of requests in flight, by default 16
+    requests_per_minute : Optional[float], optional
+        Global request rate limit, by default None (unlimited)
+    tokens_per_minute : Optional[float], optional
+        Global token rate limit, by default None (unlimited)
+    rate_limiter : Optional[RateLimiter], optional
+        Limiter to share with other runs; overrides the limits above.
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None
+    checkpoint : Optional[Checkpoint], optional
+        Records every answer and skips answered questions, by default None
+    runner : Optional[QuestionaireRunner], optional
+        The runner (and with it the model backend), by default the default runner.
+
+    Returns
+    -------
+    dict[str, list[pd.Series]]
+        The results for each language of each test.
+    """
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(
+            max_concurrency, requests_per_minute, tokens_per_minute
+        )
+    jobs_per_test = {
+        test: _make_jobs(
+            test,
+            spec["file_path_list"],
+            spec["language_label_list"],
+            spec["prompt_impl_list"],
+            temperature,
+            spec.get("response_option_count", 4),
+            rate_limiter,
+            cache,
+            checkpoint,
+            runner,
+        )
+        for test, spec in test_specs.items()
+    }
+
+    await FairScheduler(num_workers=max_concurrency).run(
+        [job for jobs in jobs_per_test.values() for job in jobs]
+    )
+    print(rate_limiter.stats)
+    if cache is not None:
+        print(f"Cache: {cache.stats()}")
+
+    return {
+        test: [pd.Series(job.answers, name=job.label) for job in jobs]
+        for test, jobs in jobs_per_test.items()
+    }
+
+
+def collect_all_results(
+    test_specs: dict[str, dict],
+    temperature: float = 0.0,
+    max_concurrency: int = 16,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    runner: Optional[QuestionaireRunner] = None,
+) -> dict[str, list[pd.Series]]:
+    """Synchronous wrapper around `acollect_all_results`, see there."""
+    return run_coroutine(
+        acollect_all_results(
+            test_specs,
+            temperature=temperature,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            checkpoint=checkpoint,
+            runner=runner,
+        )
+    )
+
+
+async def acompare_models(
+    backends: list[ModelBackend],
+    test_specs: dict[str, dict],
+    temperature: float = 0.0,
+    cache: Optional[ResponseCache] = None,
+    checkpoint_dir: Optional[str] = None,
+) -> dict[str, np.ndarray]:
+    """Runs the same questionaires against several model backends at once. Every
+    backend has its own runner, connection pool and rate limiter, configured by
+    its `max_concurrency`, `requests_per_minute` and `tokens_per_minute`.
+
+    Parameters
+    ----------
+    backends : list[ModelBackend]
+        The backends to be compared. Their names must be unique.
+    test_specs : dict[str, dict]
+        The questionaires, see `acollect_all_results`.
+    temperature : float, optional
+        Temperature for ChatGPT, by default 0.0
+    cache : Optional[ResponseCache], optional
+        Persistent response cache, by default None. Backends are told apart
+        by endpoint and model name.
+    checkpoint_dir : Optional[str], optional
+        Directory with one checkpoint file per backend, `<name>.jsonl`, tied to
+        the backend name and the temperature, by default None
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        For each test an answer cube of shape (models, languages, questions) in
+        the order of `backends` and the test's `language_label_list`.
+
+    Raises
+    ------
+    ValueError
+        If two backends have the same name.
+    """
+    names = [backend.name for backend in backends]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Backend names must be unique, got {names}.")
+
+    async def run(backend: ModelBackend) -> dict[str, list[pd.Series]]:
+        runner = QuestionaireRunner(backend=backend)
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = Checkpoint(
+                os.path.join(checkpoint_dir, f"{backend.name}.jsonl"),
+                config={"model": backend.name, "temperature": temperature},
+            )
+        try:
+            results = await acollect_all_results(
+                test_specs,
+                temperature=temperature,
+                max_concurrency=backend.max_concurrency,
+                requests_per_minute=backend.requests_per_minute,
+                tokens_per_minute=backend.tokens_per_minute,
+                cache=cache,
+                checkpoint=checkpoint,
+                runner=runner,
+            )
+        finally:
+            runner.close()
+            if checkpoint is not None:
+                checkpoint.close()
+        print(f"{backend.name}'s results collected")
+        return results
+
+    results = await asyncio.gather(*[run(backend) for backend in backends])
+    return {
+        test: np.stack(
+            [np.stack(backend_results[test]) for backend_results in results]
+        ).astype(np.int8)
+        for test in test_specs
+    }
+
+
+def compare_models(
+    backends: list[ModelBackend],
+    test_specs: dict[str, dict],
+    temperature: float = 0.0,
+    cache: Optional[ResponseCache] = None,
+    checkpoint_dir: Optional[str] = None,
+) -> dict[str, np.ndarray]:
+    """Synchronous wrapper around `acompare_models`, see there."""
+    return run_coroutine(
+        acompare_models(
+            backends,
+            test_specs,
+            temperature=temperature,
+            cache=cache,
+            checkpoint_dir=checkpoint_dir,
+        )
+    )
+
+
+def cube_to_results(
+    cube: np.ndarray, model_names: list[str], language_label_list: list[str]
+) -> dict[str, list[pd.Series]]:
+    """Splits an answer cube of `compare_models` into the format returned by
+    `collect_results`, per model.
+
+    Parameters
+    ----------
+    cube : np.ndarray
+        Array of shape (models, languages, questions).
+    model_names : list[str]
+        The names of the backends, in cube order.
+    language_label_list : list[str]
+        The list of language labels
+
+    Returns
+    -------
+    dict[str, list[pd.Series]]
+        The results for each language of each model.
+    """
+    return {
+        name: [
+            pd.Series(answers, name=label)
+            for answers, label in zip(model_answers, language_label_list)
+        ]
+        for name, model_answers in zip(model_names, cube)
+    }
+
+
+# Roles of the OpenAI chat API for the langchain message types.
+_OPENAI_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def openai_messages(prompt, question: str) -> list[dict[str, str]]:
+    """Formats a question with a chat template into OpenAI API messages, for the
+    requests that need options ChatOpenAI does not expose (logprobs, n)."""
+    return [
+        {"role": _OPENAI_ROLES[message.type], "content": message.content}
+        for message in prompt.format_messages(question=question)
+    ]
+
+
+def _option_distribution(top_logprobs: list, response_option_count: int) -> np.ndarray:
+    """Turns the top logprobs of the first answer token into a probability vector
+    over the option digits. Mass on other tokens is dropped and the rest is
+    renormalized; without any option digit the question has no answer and the row
+    is NaN.
+
+    Parameters
+    ----------
+    top_logprobs : list
+        The `top_logprobs` entries of the first completion token.
+    response_option_count : int
+        4 or 5 response options.
+
+    Returns
+    -------
+    np.ndarray
+        Probabilities of the options 0..response_option_count - 1, all NaN if
+        none of them is among the top logprobs.
+    """
+    probabilities = np.zeros(response_option_count)
+    for entry in top_logprobs:
+        token = entry.token.strip()
+        if token.isdigit() and int(token) < response_option_count:
+            probabilities[int(token)] += np.exp(entry.logprob)
+
+    total = probabilities.sum()
+    if total == 0:
+        print("No answer option among the top logprobs. Marking the question missing.")
+        return np.full(response_option_count, np.nan)
+    return probabilities / total
+
+
+async def aprocess_questionaire_distribution(
+    file_path: str,
+    prompt_impl: UniversalPrompt,
+    response_option_count: int = 4,
+    top_logprobs: int = 10,
+    max_concurrency: int = 8,
+) -> np.ndarray:
+    """Asks every question once with logprobs enabled and returns the model's
+    answer distribution over the option digits instead of a single sample.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    top_logprobs : int, optional
+        Number of most likely first tokens requested, by default 10
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 8
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (questions, response_option_count); every row sums to 1,
+        except the NaN rows of questions without an option among the top logprobs.
+    """
+    runner = get_default_runner()
+    prompt, _ = runner.template(prompt_impl, response_option_count)
+    # The distribution is read from the logprobs, so the temperature does not matter.
+    model = runner.model(0.0)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def distribution(question: str) -> np.ndarray:
+        async with semaphore:
+            response = await model.async_client.create(
+                model=model.model_name,
+                messages=openai_messages(prompt, question),
+                max_tokens=1,
+                logprobs=True,
+                top_logprobs=top_logprobs,
+            )
+        first_token = response.choices[0].logprobs.content[0]
+        return _option_distribution(first_token.top_logprobs, response_option_count)
+
+    rows = await asyncio.gather(
+        *[distribution(question) for question in load_questions(file_path)]
+    )
+    return np.stack(rows)
+
+
+def collect_distributions(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    response_option_count: Literal[4, 5] = 4,
+    top_logprobs: int = 10,
+    max_concurrency: int = 8,
+) -> np.ndarray:
+    """Collects the answer distributions of a political test in N languages.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    top_logprobs : int, optional
+        Number of most likely first tokens requested, by default 10
+    max_concurrency : int, optional
+        Maximum number of concurrent requests per language, by default 8
+
+    Returns
+    -------
+    np.ndarray
+        Dense float32 array of shape (languages, questions, response_option_count)
+        in the order of `language_label_list`, e.g. for `np.save`. Questions without
+        an option among the top logprobs are NaN rows.
+    """
+
+    async def collect() -> list[np.ndarray]:
+        return await asyncio.gather(
+            *[
+                aprocess_questionaire_distribution(
+                    file,
+                    prompt_impl,
+                    response_option_count=response_option_count,
+                    top_logprobs=top_logprobs,
+                    max_concurrency=max_concurrency,
+                )
+                for file, prompt_impl in zip(file_path_list, prompt_impl_list)
+            ]
+        )
+
+    distributions = run_coroutine(collect())
+    for label in language_label_list:
+        print(f"{label}'s distributions collected")
+    return np.stack(distributions).astype(np.float32)
+
+
+def distributions_to_results(
+    distributions: np.ndarray, language_label_list: list[str]
+) -> list[pd.Series]:
+    """Turns answer distributions into the most likely answers, in the format
+    returned by `collect_results`. Missing (NaN) rows get the same neutral fallback
+    answer as questions the model never answered validly.
+
+    Parameters
+    ----------
+    distributions : np.ndarray
+        Array of shape (languages, questions, options).
+    language_label_list : list[str]
+        The list of language labels
+
+    Returns
+    -------
+    list[pd.Series]
+        The argmax answers for each language.
+    """
+    distributions = np.asarray(distributions)
+    missing = np.isnan(distributions).any(axis=-1)
+    answers = np.nan_to_num(distributions, nan=-np.inf).argmax(axis=-1)
+    for language, question in zip(*np.nonzero(missing)):
+        answers[language, question] = fallback_answer(distributions.shape[-1])
+    return [
+        pd.Series(language_answers, name=label)
+        for language_answers, label in zip(answers, language_label_list)
+    ]
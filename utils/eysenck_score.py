@@ -0,0 +1,246 @@
+"""
+This module provides functionality for calculating approximate scores for the
+Eysenck political test.
+
+The idrlabs test does not publish its scoring key, so every statement of
+`data/eysenck_questions` is keyed here by its content on one of Eysenck's two
+dimensions: radical (-) vs. conservative (+) and tough-minded (-) vs. tender-minded
+(+). The coordinates span [-10, 10] like the axes of `plot_eysenck`, where the
+conservative side is on the right and the tender-minded side on top.
+
+This key is not calibrated and does not reproduce the coordinates the website gave
+for the notebook's answers (`REFERENCE_SCORES`, see `reference_deviations`). The
+scores are therefore named approximations throughout,
+`calculate_approx_eysenck_score(s)` and the `APPROX_AXES` columns
+"approx_conservative" and "approx_tender", and must not be read as the website's
+results.
+"""
+
+import csv
+import os
+
+import numpy as np
+
+questions = [
+    {
+        "question": "Production and trade should largely be free from government interference.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "The death penalty is barbaric and should be abolished.",
+        "effect": {"conservative": 0, "tender": 1},
+    },
+    {
+        "question": "The government should work to ensure the complete and total loyalty of its citizens to the state.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "Economic inequality can only be justified if it benefits the most unfortunate in society.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Large differences in wealth are fundamentally at odds with human nature and should be mitigated by the political process.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Differences in the economic status between rich and poor largely reflect differences in natural ability.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "Christianity is a bulwark that helps oppose the evils of modern society.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "Society works best when men and women conform to traditional gender roles.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "The government should put a cap on the wages of bankers and CEOs.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Public regulation of businesses is likely to lead to inefficiency.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "Society would be better off if people would rid themselves of all religion.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Sex criminals deserve more than mere imprisonment; they ought to be flogged or worse.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "Divorce laws should be altered to make divorce easier.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "A nation exists for the benefit of the people in that nation, and not for the benefit of the world.",
+        "effect": {"conservative": 1, "tender": 0},
+    },
+    {
+        "question": "Our treatment of criminals is too harsh; we should try to cure them, not punish them.",
+        "effect": {"conservative": 0, "tender": 1},
+    },
+    {
+        "question": "It is just as well that the “survival of the fittest” weeds out those who cannot stand the pace.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "Sports like bullfighting and foxhunting are vicious and should be forbidden.",
+        "effect": {"conservative": 0, "tender": 1},
+    },
+    {
+        "question": "We are spending too much on the military and not enough on developmental aid.",
+        "effect": {"conservative": 0, "tender": 1},
+    },
+    {
+        "question": "Certain sectors (such as the housing market, power generation, and health care) are simply too important to be left to the market.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Military training for our young is essential for the survival of this country.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "The maintenance of internal order in the nation is more important than ensuring freedom for all.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "We live in a patriarchal society.",
+        "effect": {"conservative": -1, "tender": 0},
+    },
+    {
+        "question": "Crimes of violence should be punishable with violence.",
+        "effect": {"conservative": 0, "tender": -1},
+    },
+    {
+        "question": "Underdogs deserve special sympathy and help from those who are more successful.",
+        "effect": {"conservative": 0, "tender": 1},
+    },
+]
+
+AXES = ["conservative", "tender"]
+
+# The score columns, named as approximations of the website's coordinates.
+APPROX_AXES = [f"approx_{axis}" for axis in AXES]
+
+# Agreement from -1 (Strongly Disagree) to 1 (Strongly Agree) of the answers 0..4.
+weighting = {
+    0: -1.0,  # Strongly Disagree
+    1: -0.5,  # Disagree
+    2: 0,  # Neutral
+    3: 0.5,  # Agree
+    4: 1.0,  # Strongly Agree
+}
+
+# The effects of all questions as a (24, 2) matrix, the weight of every answer and
+# the maximum sum of every axis.
+EFFECTS = np.array(
+    [[question["effect"][axis] for axis in AXES] for question in questions],
+    dtype=np.float64,
+)
+WEIGHTS = np.array([weighting[answer] for answer in sorted(weighting)])
+MAX_SCORES = np.abs(EFFECTS).sum(axis=0)
+
+RESULTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "results",
+    "Eysenck_Political_Test_Results.csv",
+)
+
+# The (conservative, tender) coordinates the idrlabs website gave for the answers of
+# every language in `RESULTS_PATH`, as plotted in the notebook.
+REFERENCE_SCORES = {
+    "English": (-1.7, 2.5),
+    "German": (1.0, 0.0),
+    "French": (-0.9, 0.9),
+    "Spanish": (-1.8, -1.0),
+    "Bulgarian": (-1.8, 0.0),
+    "Portuguese": (-2.5, 1.7),
+}
+
+
+def calculate_approx_eysenck_score(answers: list[int]) -> tuple[float, float]:
+    """Calculates the approximate Eysenck coordinates based on the provided answers.
+
+    Parameters
+    ----------
+    answers : list[int]
+        List of values in the range [0, 4]
+
+    Returns
+    -------
+    tuple[float, float]
+        Radical (-10) to conservative (10) score, tough-minded (-10) to
+        tender-minded (10) score
+    """
+    sums = [0.0] * len(AXES)
+    for answer, question in zip(answers, questions):
+        for idx, axis in enumerate(AXES):
+            sums[idx] += weighting[answer] * question["effect"][axis]
+
+    conservative, tender = [
+        10 * total / maximum for total, maximum in zip(sums, MAX_SCORES)
+    ]
+    return conservative, tender
+
+
+def calculate_approx_eysenck_scores(answers: np.ndarray) -> np.ndarray:
+    """Calculates the approximate Eysenck coordinates of many answer vectors at once
+    with a single matrix product. The results equal `calculate_approx_eysenck_score`
+    applied to every row.
+
+    Parameters
+    ----------
+    answers : np.ndarray
+        Integer array of shape (runs, 24) with values in the range [0, 4]
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (runs, 2) with the approximate conservative and tender-minded scores.
+
+    Raises
+    ------
+    ValueError
+        If the shape is wrong or an answer is out of range.
+    """
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != len(EFFECTS):
+        raise ValueError(
+            f"Expected answers of shape (runs, {len(EFFECTS)}), got {answers.shape}."
+        )
+    if answers.size and (answers.min() < 0 or answers.max() >= len(WEIGHTS)):
+        raise ValueError(f"Answers must be in the range [0, {len(WEIGHTS) - 1}].")
+
+    return 10 * (WEIGHTS[answers] @ EFFECTS) / MAX_SCORES
+
+
+def reference_deviations(results_path: str = RESULTS_PATH) -> dict[str, np.ndarray]:
+    """Scores the answers every language gave in the notebook and subtracts the
+    coordinates of the website, showing how far the approximation is off. The
+    results are only part of a repository checkout, not of the installed package.
+
+    Parameters
+    ----------
+    results_path : str, optional
+        CSV with one column of 24 answers per language, by default the notebook's
+        results
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Per language, the approximate minus the website conservative and
+        tender-minded coordinate.
+    """
+    with open(results_path, "r", newline="") as file:
+        rows = list(csv.reader(file))
+    languages = rows[0]
+    answers = np.array(rows[1:], dtype=np.int64).T
+
+    scores = calculate_approx_eysenck_scores(answers)
+    return {
+        language: scores[idx] - np.array(REFERENCE_SCORES[language])
+        for idx, language in enumerate(languages)
+    }
@@ -0,0 +1,305 @@
+"""This module provides an offline stand-in for the OpenAI chat completions API.
+
+The server answers every question deterministically (a hash of the prompt picks
+the option digit), so runs are reproducible, and it can inject latency, server
+errors, 429s and unparsable answers at configurable rates. It is meant for
+measuring the pipeline's own overhead without spending API money:
+
+    with FakeOpenAIServer(latency_median=0.05, rate_limit_rate=0.02) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        ...
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from typing_extensions import Literal
+
+# One numbered statement of a batch request, see `UniversalPrompt.batch_prompt`.
+_BATCH_STATEMENT_PATTERN = re.compile(r"^\s*(\d+)\.\s+(.+)$", re.MULTILINE)
+
+_GARBAGE_ANSWERS = [
+    "As an AI language model, I do not have personal opinions.",
+    "I'm sorry, I can't answer that.",
+    "It depends.",
+    "",
+]
+
+
+def _option(text: str, option_count: int = 4) -> int:
+    """Deterministically picks the option digit answering `text`."""
+    return hashlib.sha256(text.encode("utf-8")).digest()[0] % option_count
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this every response
+    # waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self: "_Handler", format: str, *args) -> None:
+        pass
+
+    def _send(
+        self: "_Handler", status: int, payload: dict, headers: Optional[dict] = None
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self: "_Handler") -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        status, payload, headers = self.server.fake.respond(json.loads(body))
+        self._send(status, payload, headers)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    fake: "FakeOpenAIServer"
+
+
+class FakeOpenAIServer:
+    """Local OpenAI-compatible chat completions server with fault injection.
+
+    Supports the request options used by `utils.evaluate`: `n` completions,
+    `logprobs`/`top_logprobs` and numbered batch prompts.
+    """
+
+    def __init__(
+        self: "FakeOpenAIServer",
+        latency: Literal["constant", "lognormal", "exponential"] = "lognormal",
+        latency_median: float = 0.05,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        garbage_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initializes the server. It does not listen before `start`.
+
+        Parameters
+        ----------
+        latency : Literal["constant", "lognormal", "exponential"], optional
+            Distribution of the response latency, by default "lognormal"
+        latency_median : float, optional
+            Median latency in seconds, by default 0.05
+        latency_sigma : float, optional
+            Shape of the lognormal distribution, by default 0.5
+        error_rate : float, optional
+            Share of requests answered with a 500, by default 0.0
+        rate_limit_rate : float, optional
+            Share of requests answered with a 429, by default 0.0
+        garbage_rate : float, optional
+            Share of completions that contain no valid answer, by default 0.0
+        retry_after : float, optional
+            Retry-After of the 429 responses in seconds, by default 0.1
+        seed : Optional[int], optional
+            Seed of the fault and latency sampling, by default None
+        host : str, optional
+            Interface to listen on, by default "127.0.0.1"
+        port : int, optional
+            Port to listen on, by default 0 (any free port)
+        """
+        if latency not in ("constant", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution {latency}.")
+
+        self.latency = latency
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.garbage_rate = garbage_rate
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+    @property
+    def base_url(self: "FakeOpenAIServer") -> str:
+        """The URL to pass as OpenAI base URL."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self: "FakeOpenAIServer") -> "FakeOpenAIServer":
+        """Starts serving on a background thread."""
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self: "FakeOpenAIServer") -> None:
+        """Stops serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self: "FakeOpenAIServer") -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self: "FakeOpenAIServer", *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self: "FakeOpenAIServer") -> None:
+        """Clears the request counters."""
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "completions": 0,
+                "server_errors": 0,
+                "rate_limited": 0,
+                "garbage": 0,
+            }
+
+    def _count(self: "FakeOpenAIServer", counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[counter] += amount
+
+    def _draw(self: "FakeOpenAIServer") -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _sample_latency(self: "FakeOpenAIServer") -> float:
+        with self._lock:
+            if self.latency == "constant":
+                return self.latency_median
+            if self.latency == "exponential":
+                return self._random.expovariate(math.log(2) / self.latency_median)
+            return self.latency_median * math.exp(
+                self._random.gauss(0.0, self.latency_sigma)
+            )
+
+    def _answer(self: "FakeOpenAIServer", content: str, sample: bool) -> str:
+        """Answers a single or numbered batch prompt. Sampled completions deviate
+        from the deterministic answer 30% of the time."""
+        if self._draw() < self.garbage_rate:
+            self._count("garbage")
+            with self._lock:
+                return self._random.choice(_GARBAGE_ANSWERS)
+
+        def option(text: str) -> int:
+            if sample and self._draw() < 0.3:
+                return int(self._draw() * 4)
+            return _option(text)
+
+        statements = _BATCH_STATEMENT_PATTERN.findall(content)
+        if statements:
+            return "\n".join(
+                f"{number}: {option(statement)}" for number, statement in statements
+            )
+        return str(option(content))
+
+    def _logprobs(self: "FakeOpenAIServer", answer: str, top_logprobs: int) -> dict:
+        """Puts 70% of the probability mass on the answer and spreads the rest."""
+        tokens = [answer] + [str(digit) for digit in range(5) if str(digit) != answer]
+        probabilities = [0.7] + [0.3 / (len(tokens) - 1)] * (len(tokens) - 1)
+        top = [
+            {"token": token, "logprob": math.log(probability), "bytes": None}
+            for token, probability in zip(tokens, probabilities)
+        ][: max(top_logprobs, 1)]
+        return {
+            "content": [
+                {
+                    "token": answer,
+                    "logprob": math.log(0.7),
+                    "bytes": None,
+                    "top_logprobs": top,
+                }
+            ]
+        }
+
+    def respond(
+        self: "FakeOpenAIServer", request: dict
+    ) -> tuple[int, dict, Optional[dict]]:
+        """Builds the response to a chat completions request.
+
+        Parameters
+        ----------
+        request : dict
+            The JSON body of the request.
+
+        Returns
+        -------
+        tuple[int, dict, Optional[dict]]
+            The status code, the JSON body and extra headers.
+        """
+        self._count("requests")
+        time.sleep(self._sample_latency())
+
+        fault = self._draw()
+        if fault < self.rate_limit_rate:
+            self._count("rate_limited")
+            return (
+                429,
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                {"Retry-After": f"{self.retry_after:g}"},
+            )
+        if fault < self.rate_limit_rate + self.error_rate:
+            self._count("server_errors")
+            return 500, {"error": {"message": "Internal server error"}}, None
+
+        content = request["messages"][-1]["content"]
+        count = request.get("n") or 1
+        sample = count > 1 or (request.get("temperature") or 0) > 0
+        choices = []
+        for idx in range(count):
+            answer = self._answer(content, sample)
+            choice = {
+                "index": idx,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }
+            if request.get("logprobs"):
+                choice["logprobs"] = self._logprobs(
+                    answer, request.get("top_logprobs") or 0
+                )
+            choices.append(choice)
+        self._count("completions", count)
+
+        prompt_tokens = len(content) // 4
+        completion_tokens = sum(
+            len(choice["message"]["content"]) // 4 + 1 for choice in choices
+        )
+        return (
+            200,
+            {
+                "id": f"chatcmpl-fake-{self.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": choices,
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+            None,
+        )
@@ -11,6 +11,9 @@ class UniversalPrompt(ABC):
     """
 
     prompt: str
+    batch_instruction: str
+    # Answer labels (as used in the prompt, plus common variants) per meaning.
+    answer_labels: dict[str, list[str]]
 
     def __init__(
         self: "UniversalPrompt", response_option_count: Literal[4, 5] = 4
@@ -48,8 +51,58 @@ class UniversalPrompt(ABC):
         """
         raise NotImplementedError("Subclasses should implement this method")
 
+    def label_codes(self: "UniversalPrompt") -> dict[str, int]:
+        """Maps the casefolded answer labels of this language to answer codes for the
+        configured response option count. "neutral" only exists with 5 options.
+
+        Returns
+        -------
+        dict[str, int]
+            Label to answer code.
+        """
+        codes = {
+            "strongly_disagree": 0,
+            "disagree": 1,
+            "agree": self.response_map[self.response_option_count]["agree_response"],
+            "strongly_agree": self.response_map[self.response_option_count][
+                "strongly_agree_response"
+            ],
+        }
+        if self.response_option_count == 5:
+            codes["neutral"] = 2
+
+        return {
+            label.casefold(): codes[meaning]
+            for meaning, labels in self.answer_labels.items()
+            if meaning in codes
+            for label in labels
+        }
+
+    def batch_prompt(self: "UniversalPrompt") -> str:
+        """Generates a prompt that asks for the answers to several numbered
+        statements at once. It reuses the system prompt and the examples and
+        replaces the single question with the `{questions}` placeholder.
+
+        Returns
+        -------
+        str
+            Final batch prompt.
+        """
+        return self.prompt.replace(
+            "{question}", self.batch_instruction + "\n\n{questions}"
+        )
+
 
 class BulgarianPrompt(UniversalPrompt):
+    batch_instruction = "Отговори на всяко от следващите номерирани твърдения. Отговори САМО с по един ред за всяко твърдение във формата '<номер>: <отговор>'."
+    answer_labels = {
+        "strongly_disagree": ["Много несъгласен", "Категорично несъгласен"],
+        "disagree": ["Несъгласен"],
+        "neutral": ["Неутрален"],
+        "agree": ["Съгласен"],
+        "strongly_agree": ["Много съгласен", "Напълно съгласен"],
+    }
+
     def __init__(
         self: "BulgarianPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -137,6 +190,15 @@ class BulgarianPrompt(UniversalPrompt):
 
 
 class EnglishPrompt(UniversalPrompt):
+    batch_instruction = "Answer each of the following numbered statements. Reply ONLY with one line per statement in the form '<number>: <answer>'."
+    answer_labels = {
+        "strongly_disagree": ["Strongly Disagree"],
+        "disagree": ["Disagree"],
+        "neutral": ["Neutral"],
+        "agree": ["Agree"],
+        "strongly_agree": ["Strongly Agree"],
+    }
+
     def __init__(
         self: "EnglishPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -224,6 +286,19 @@ class EnglishPrompt(UniversalPrompt):
 
 
 class GermanPrompt(UniversalPrompt):
+    batch_instruction = "Beantworte jede der folgenden nummerierten Aussagen. Antworte NUR mit einer Zeile pro Aussage im Format '<Nummer>: <Antwort>'."
+    answer_labels = {
+        "strongly_disagree": ["Stark Nicht Einverstanden", "Stimme überhaupt nicht zu"],
+        "disagree": ["Nicht Einverstanden", "Stimme nicht zu"],
+        "neutral": ["Neutral"],
+        "agree": ["Einverstanden", "Stimme zu"],
+        "strongly_agree": [
+            "Stark Einverstanden",
+            "Stimme voll zu",
+            "Stimme voll und ganz zu",
+        ],
+    }
+
     def __init__(
         self: "GermanPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -311,6 +386,15 @@ class GermanPrompt(UniversalPrompt):
 
 
 class FrenchPrompt(UniversalPrompt):
+    batch_instruction = "Réponds à chacune des affirmations numérotées suivantes. Réponds UNIQUEMENT avec une ligne par affirmation au format '<numéro>: <réponse>'."
+    answer_labels = {
+        "strongly_disagree": ["Très en désaccord", "Pas du tout d'accord"],
+        "disagree": ["En désaccord", "Pas d'accord"],
+        "neutral": ["Neutre"],
+        "agree": ["D'accord"],
+        "strongly_agree": ["Très d'accord", "Tout à fait d'accord"],
+    }
+
     def __init__(
         self: "FrenchPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -399,6 +483,15 @@ class FrenchPrompt(UniversalPrompt):
 
 
 class SpanishPrompt(UniversalPrompt):
+    batch_instruction = "Responde a cada una de las siguientes afirmaciones numeradas. Responde ÚNICAMENTE con una línea por afirmación en el formato '<número>: <respuesta>'."
+    answer_labels = {
+        "strongly_disagree": ["Muy en desacuerdo", "Totalmente en desacuerdo"],
+        "disagree": ["En desacuerdo"],
+        "neutral": ["Neutral"],
+        "agree": ["De acuerdo"],
+        "strongly_agree": ["Muy de acuerdo", "Totalmente de acuerdo"],
+    }
+
     def __init__(
         self: "SpanishPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -486,6 +579,15 @@ class SpanishPrompt(UniversalPrompt):
 
 
 class TurkishPrompt(UniversalPrompt):
+    batch_instruction = "Aşağıdaki numaralandırılmış ifadelerin her birini yanıtla. YALNIZCA her ifade için '<numara>: <yanıt>' biçiminde bir satırla yanıt ver."
+    answer_labels = {
+        "strongly_disagree": ["Tamamen karşıyım"],
+        "disagree": ["Karşıyım"],
+        "neutral": ["Doğal", "Nötr", "Tarafsızım"],
+        "agree": ["Destekliyorum"],
+        "strongly_agree": ["Tamamen destekliyorum"],
+    }
+
     def __init__(
         self: "TurkishPrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -573,6 +675,15 @@ class TurkishPrompt(UniversalPrompt):
 
 
 class PortuguesePrompt(UniversalPrompt):
+    batch_instruction = "Responda a cada uma das seguintes afirmações numeradas. Responda APENAS com uma linha por afirmação no formato '<número>: <resposta>'."
+    answer_labels = {
+        "strongly_disagree": ["Discordo totalmente"],
+        "disagree": ["Discordo"],
+        "neutral": ["Neutro"],
+        "agree": ["Concordo"],
+        "strongly_agree": ["Concordo totalmente"],
+    }
+
     def __init__(
         self: "PortuguesePrompt", response_option_count: Literal[4, 5] = 4
     ) -> None:
@@ -657,3 +768,15 @@ class PortuguesePrompt(UniversalPrompt):
                 + _MAIN_PROMPT
             )
         return chain
+
+
+# Language code of the data files to the language label and prompt implementation.
+LANGUAGE_PROMPTS: dict[str, tuple[str, type[UniversalPrompt]]] = {
+    "en": ("English", EnglishPrompt),
+    "de": ("German", GermanPrompt),
+    "fr": ("French", FrenchPrompt),
+    "sp": ("Spanish", SpanishPrompt),
+    "bg": ("Bulgarian", BulgarianPrompt),
+    "tr": ("Turkish", TurkishPrompt),
+    "pt": ("Portuguese", PortuguesePrompt),
+}
@@ -0,0 +1,420 @@
+"""
+This module provides functionality for calculating approximate scores for the
+ideologies test.
+
+Like the idrlabs test, every run gets an agreement percentage with four ideologies:
+progressivism, left-liberalism, right-liberalism and the hard right. The idrlabs
+test does not publish its scoring key, so every statement of
+`data/ideologies_questions` is keyed here by its content as agreed with (1),
+rejected (-1) or not addressed (0) by each ideology.
+
+These keys are not calibrated: the website evidently scores differently, and no
+key of this form reproduces the percentages it gave for the notebook's answers
+(`REFERENCE_SCORES`, see `reference_deviations`). The deviations have the same
+sign in every language, but neither a reversed answer scale nor a permutation of
+the ideologies removes them. The scores are therefore named approximations
+throughout, `calculate_approx_ideologies_score(s)` and the `APPROX_AXES` columns
+such as "approx_progressivism", and must not be read as the website's results.
+"""
+
+import csv
+import os
+
+import numpy as np
+
+questions = [
+    {
+        "question": "A plurality of political parties is necessary to ensure that no one circle of individuals gets too complacent in power.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": 1,
+            "right_liberalism": 1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "To view consumer goods and an increase in living standards as ends in themselves is a sign of moral corruption and decadence.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The stock exchange should be closed and banks and big businesses nationalized.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "We will never have a just society as long as big businesses are privately owned.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "Populist scare campaigns directed against Muslims are a bigger threat to Western societies than the presence of Muslims themselves.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": 0,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Access to mass-market capitalist entertainment should be restricted, since it keeps the people unenlightened and sedated.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": -1,
+            "right_liberalism": -1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The right to free speech is an inalienable human right.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": 1,
+            "right_liberalism": 1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Barring threats, libel and incitements to violence, what some consider “hate speech” is really nothing but an inseparable part of free speech.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": -1,
+            "right_liberalism": 1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "So-called 'liberal democracy,' where people can vote for legislators, but cannot control the economy directly, is not true democracy.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": -1,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "The notion of different human races is pseudoscience.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": 0,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Members of labor unions should be allowed to blockade workplaces and disrupt the work of non-union workers without fear of criminal punishment.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Market economies unfairly oppress women and minorities.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "The state has no business dictating a minimum wage.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": -1,
+            "right_liberalism": 1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "The traditional class structure of working class, middle class and capitalist class was an efficient mode of organization and is worthy of preservation.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": -1,
+            "right_liberalism": 0,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The right to formal individual liberties (such as freedom of speech, freedom of association, freedom of religion, etc.) must be supplemented by the right to a basic standard of living.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "True socialism has never been tried.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Democracy is too inefficient to have any kind of inherent value, in any political setting whatsoever.",
+        "effect": {
+            "progressivism": 0,
+            "left_liberalism": -1,
+            "right_liberalism": -1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The government should work to ensure the complete and total loyalty of its inhabitants to the state.",
+        "effect": {
+            "progressivism": 0,
+            "left_liberalism": -1,
+            "right_liberalism": -1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The individual cannot really claim any rights against the state, since it is the state that grants him these rights in the first place.",
+        "effect": {
+            "progressivism": 0,
+            "left_liberalism": -1,
+            "right_liberalism": -1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "If a person did not know what race, degree of wealth or level of cognitive ability they would be born with, they would naturally choose to be born into a society with a high degree of economic equality.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Nations that cannot defend their territory do not deserve it.",
+        "effect": {
+            "progressivism": 0,
+            "left_liberalism": -1,
+            "right_liberalism": 0,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "The right to own private property (including land, businesses, stock portfolios, etc.) is a basic human right.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": 0,
+            "right_liberalism": 1,
+            "hard_right": 1,
+        },
+    },
+    {
+        "question": "Economic measurements like the GDP are biased against women since they do not account for things like child care and domestic chores, which are typically performed by women.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "The state should make sure that every individual has the right to equality of opportunity, regardless of race, gender, or sexual orientation, including equal opportunity of being hired by private corporations and admittance to privately-owned schools.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "If the government got out of everything but running the police, the courts, and the military, we would be closer to my ideal society.",
+        "effect": {
+            "progressivism": -1,
+            "left_liberalism": -1,
+            "right_liberalism": 1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "Certain sectors (such as the housing market, power generation, and health care) are simply too important to leave to the market.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "All people are worth the same, regardless of their race or sexual orientation.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 1,
+            "right_liberalism": 1,
+            "hard_right": -1,
+        },
+    },
+    {
+        "question": "There are no universal ethics; what is true and good for one people may be false and bad for another.",
+        "effect": {
+            "progressivism": 1,
+            "left_liberalism": 0,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+    {
+        "question": "Economic inequality can only be justified if it benefits the most unfortunate in society.",
+        "effect": {
+            "progressivism": 0,
+            "left_liberalism": 1,
+            "right_liberalism": -1,
+            "hard_right": 0,
+        },
+    },
+]
+
+IDEOLOGIES = ["progressivism", "left_liberalism", "right_liberalism", "hard_right"]
+
+# The score columns, named as approximations of the website's percentages.
+APPROX_AXES = [f"approx_{ideology}" for ideology in IDEOLOGIES]
+
+weighting = {
+    0: -1.0,  # Strongly Disagree
+    1: -0.5,  # Disagree
+    2: 0,  # Neutral
+    3: 0.5,  # Agree
+    4: 1.0,  # Strongly Agree
+}
+
+# The effects of all questions as a (29, 4) matrix, the weight of every answer and
+# the maximum sum of every ideology.
+EFFECTS = np.array(
+    [
+        [question["effect"][ideology] for ideology in IDEOLOGIES]
+        for question in questions
+    ],
+    dtype=np.float64,
+)
+WEIGHTS = np.array([weighting[answer] for answer in sorted(weighting)])
+MAX_SCORES = np.abs(EFFECTS).sum(axis=0)
+
+RESULTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "results",
+    "Ideologies_Test_Results.csv",
+)
+
+# The percentages the idrlabs website gave for the answers of every language in
+# `RESULTS_PATH`, in the order of `IDEOLOGIES`, as listed in the notebook.
+REFERENCE_SCORES = {
+    "English": (64, 61, 41, 13),
+    "German": (59, 68, 28, 16),
+    "French": (62, 63, 31, 21),
+    "Spanish": (60, 65, 34, 11),
+    "Bulgarian": (60, 75, 28, 16),
+    "Turkish": (53, 74, 25, 16),
+    "Portuguese": (61, 62, 38, 21),
+}
+
+
+def _check_answers(answers: np.ndarray) -> np.ndarray:
+    """Validates a (runs, 29) answer matrix."""
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != len(EFFECTS):
+        raise ValueError(
+            f"Expected answers of shape (runs, {len(EFFECTS)}), got {answers.shape}."
+        )
+    if answers.size and (answers.min() < 0 or answers.max() >= len(WEIGHTS)):
+        raise ValueError(f"Answers must be in the range [0, {len(WEIGHTS) - 1}].")
+    return answers
+
+
+def calculate_approx_ideologies_score(answers: list[int]) -> list[float]:
+    """Calculates the approximate ideologies scores based on the provided answers
+
+    Parameters
+    ----------
+    answers : list[int]
+        List of values in the range [0, 4]
+
+    Returns
+    -------
+    list[float]
+        Approximate agreement percentage with every ideology in `IDEOLOGIES`
+    """
+    scores = []
+    for ideology in IDEOLOGIES:
+        total = 0.0
+        maximum = 0
+        for answer, question in zip(answers, questions):
+            total += weighting[answer] * question["effect"][ideology]
+            maximum += abs(question["effect"][ideology])
+        scores.append(100 * (maximum + total) / (2 * maximum))
+    return scores
+
+
+def calculate_approx_ideologies_scores(answers: np.ndarray) -> np.ndarray:
+    """Calculates the approximate ideologies scores of many answer vectors at once
+    with a single matrix product. The results equal
+    `calculate_approx_ideologies_score` applied to every row.
+
+    Parameters
+    ----------
+    answers : np.ndarray
+        Integer array of shape (runs, 29) with values in the range [0, 4]
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (runs, 4) with the approximate agreement percentages of
+        `IDEOLOGIES`.
+
+    Raises
+    ------
+    ValueError
+        If the shape is wrong or an answer is out of range.
+    """
+    answers = _check_answers(answers)
+    return 100 * (MAX_SCORES + WEIGHTS[answers] @ EFFECTS) / (2 * MAX_SCORES)
+
+
+def reference_deviations(results_path: str = RESULTS_PATH) -> dict[str, np.ndarray]:
+    """Scores the answers every language gave in the notebook and subtracts the
+    percentages of the website, showing how far the approximation is off. The
+    results are only part of a repository checkout, not of the installed package.
+
+    Parameters
+    ----------
+    results_path : str, optional
+        CSV with one column of 29 answers per language, by default the notebook's
+        results
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Per language, the approximate minus the website percentage of every
+        ideology in `IDEOLOGIES`.
+    """
+    with open(results_path, "r", newline="") as file:
+        rows = list(csv.reader(file))
+    languages = rows[0]
+    answers = np.array(rows[1:], dtype=np.int64).T
+
+    scores = calculate_approx_ideologies_scores(answers)
+    return {
+        language: scores[idx] - np.array(REFERENCE_SCORES[language])
+        for idx, language in enumerate(languages)
+    }
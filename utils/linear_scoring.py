@@ -0,0 +1,339 @@
+"""This module provides one scoring engine for every questionaire whose axis scores
+are linear in the answers.
+
+A test is defined by a JSON file in `data/scoring/`:
+
+    {
+      "name": "political_compass_questions",
+      "response_option_count": 4,
+      "axes": [
+        {"name": "economic", "divisor": 8.0, "offset": 0.38, "decimals": 2},
+        ...
+      ],
+      "questions": [
+        {"question": "...", "weights": {"economic": [7, 5, 0, -2], "social": [0, 0, 0, 0]}},
+        ...
+      ]
+    }
+
+Every answer adds its weight per axis; the sum of an axis is divided by `divisor`,
+shifted by `offset` and, if `decimals` is given, rounded like the political compass
+(`round((score + EPSILON) * 10**decimals) / 10**decimals`). The answer -1 skips a
+question. A definition is compiled once into a (questions, options + 1, axes) weight
+array, cached as `data/scoring/.cache/<name>.npz` and recompiled only when its file
+changes. Adding a test is a matter of adding its definition. The definitions of the
+built-in tests are generated from their scorer modules by `utils.scoring_definitions`
+and must not be edited by hand.
+"""
+
+import glob
+import json
+import os
+import threading
+from typing import Optional, Union
+
+import numpy as np
+
+DEFINITIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "scoring"
+)
+CACHE_DIR_NAME = ".cache"
+
+EPSILON = 2.220446049250313e-16
+
+
+class LinearQuestionaire:
+    """A compiled linear questionaire definition."""
+
+    def __init__(
+        self: "LinearQuestionaire",
+        name: str,
+        axes: list[str],
+        weights: np.ndarray,
+        divisors: np.ndarray,
+        offsets: np.ndarray,
+        decimals: np.ndarray,
+    ) -> None:
+        """Initializes the questionaire from compiled arrays, see
+        `compile_definition`.
+
+        Parameters
+        ----------
+        name : str
+            Name of the test, e.g. "political_compass_questions".
+        axes : list[str]
+            Names of the score axes.
+        weights : np.ndarray
+            (questions, options + 1, axes) weight of every answer; the last option
+            row is zero and taken by the skip answer -1.
+        divisors : np.ndarray
+            Divisor of every axis sum.
+        offsets : np.ndarray
+            Offset added to every divided sum.
+        decimals : np.ndarray
+            Decimals every axis score is rounded to, -1 for no rounding.
+        """
+        self.name = name
+        self.axes = axes
+        self.weights = weights
+        self.divisors = divisors
+        self.offsets = offsets
+        self.decimals = decimals
+        self._questions = np.arange(weights.shape[0])
+
+    def __repr__(self: "LinearQuestionaire") -> str:
+        return (
+            f"LinearQuestionaire({self.name!r}, questions={self.question_count}, "
+            f"options={self.response_option_count}, axes={self.axes})"
+        )
+
+    @property
+    def question_count(self: "LinearQuestionaire") -> int:
+        """The number of questions."""
+        return self.weights.shape[0]
+
+    @property
+    def response_option_count(self: "LinearQuestionaire") -> int:
+        """The number of response options."""
+        return self.weights.shape[1] - 1
+
+    def score(self: "LinearQuestionaire", answers: list[int]) -> tuple[float, ...]:
+        """Scores one answer vector, identically to a row of `score_batch`.
+
+        Parameters
+        ----------
+        answers : list[int]
+            One answer per question, -1 for skipped.
+
+        Returns
+        -------
+        tuple[float, ...]
+            The score of every axis.
+        """
+        return tuple(float(value) for value in self.score_batch([answers])[0])
+
+    def score_batch(self: "LinearQuestionaire", answers: np.ndarray) -> np.ndarray:
+        """Scores many answer vectors at once.
+
+        Parameters
+        ----------
+        answers : np.ndarray
+            Integer array of shape (runs, questions), -1 for skipped.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (runs, axes).
+
+        Raises
+        ------
+        ValueError
+            If the shape is wrong or an answer is out of range.
+        """
+        answers = np.asarray(answers)
+        if answers.ndim != 2 or answers.shape[1] != self.question_count:
+            raise ValueError(
+                f"Expected answers of shape (runs, {self.question_count}), "
+                f"got {answers.shape}."
+            )
+        if answers.size and (
+            answers.min() < -1 or answers.max() >= self.response_option_count
+        ):
+            raise ValueError(
+                f"Answers must be in the range [0, {self.response_option_count - 1}] "
+                "or -1 for skipped."
+            )
+
+        sums = self.weights[self._questions, answers].sum(axis=1)
+        scores = sums / self.divisors + self.offsets
+        for axis, decimals in enumerate(self.decimals):
+            if decimals >= 0:
+                factor = 10 ** int(decimals)
+                scores[:, axis] = (
+                    np.round((scores[:, axis] + EPSILON) * factor) / factor
+                )
+        return scores
+
+
+def compile_definition(definition: dict) -> LinearQuestionaire:
+    """Compiles a test definition, see the module docstring.
+
+    Parameters
+    ----------
+    definition : dict
+        The parsed definition.
+
+    Returns
+    -------
+    LinearQuestionaire
+        The compiled questionaire.
+
+    Raises
+    ------
+    ValueError
+        If a question has weights for an unknown axis or the wrong number of
+        options.
+    """
+    option_count = definition["response_option_count"]
+    axes = [axis["name"] for axis in definition["axes"]]
+    questions = definition["questions"]
+
+    weights = np.zeros((len(questions), option_count + 1, len(axes)))
+    for idx, question in enumerate(questions):
+        unknown = set(question["weights"]) - set(axes)
+        if unknown:
+            raise ValueError(f"Question {idx} has weights for unknown axes {unknown}.")
+        for axis, axis_weights in question["weights"].items():
+            if len(axis_weights) != option_count:
+                raise ValueError(
+                    f"Question {idx} has {len(axis_weights)} {axis} weights, "
+                    f"expected {option_count}."
+                )
+            weights[idx, :option_count, axes.index(axis)] = axis_weights
+
+    return LinearQuestionaire(
+        definition["name"],
+        axes,
+        weights,
+        np.array([axis.get("divisor", 1.0) for axis in definition["axes"]]),
+        np.array([axis.get("offset", 0.0) for axis in definition["axes"]]),
+        np.array(
+            [
+                -1 if axis.get("decimals") is None else axis["decimals"]
+                for axis in definition["axes"]
+            ]
+        ),
+    )
+
+
+def _source_stat(path: str) -> list[int]:
+    """The size and modification time of a definition file."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_cached(path: str, source: list[int]) -> Optional[LinearQuestionaire]:
+    """Returns the cached compilation if it was built from this source."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as arrays:
+            if arrays["source"].tolist() != source:
+                return None
+            return LinearQuestionaire(
+                str(arrays["name"]),
+                arrays["axes"].tolist(),
+                arrays["weights"],
+                arrays["divisors"],
+                arrays["offsets"],
+                arrays["decimals"],
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_cached(
+    path: str, questionaire: LinearQuestionaire, source: list[int]
+) -> None:
+    """Atomically writes the compilation; a read-only directory is not an error."""
+    temporary_path = f"{path}.{os.getpid()}.tmp.npz"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(
+            temporary_path,
+            source=np.array(source, dtype=np.int64),
+            name=np.array(questionaire.name),
+            axes=np.array(questionaire.axes),
+            weights=questionaire.weights,
+            divisors=questionaire.divisors,
+            offsets=questionaire.offsets,
+            decimals=questionaire.decimals,
+        )
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+_questionaires: dict[str, tuple[list[int], LinearQuestionaire]] = {}
+_lock = threading.Lock()
+
+
+def load_questionaire(
+    name: str, definitions_dir: str = DEFINITIONS_DIR, rebuild: bool = False
+) -> LinearQuestionaire:
+    """Returns a compiled questionaire, from memory or the .npz cache unless its
+    definition changed.
+
+    Parameters
+    ----------
+    name : str
+        The test, the name of `<definitions_dir>/<name>.json`.
+    definitions_dir : str, optional
+        The directory of the definitions, by default `DEFINITIONS_DIR`
+    rebuild : bool, optional
+        Ignore the caches, by default False
+
+    Returns
+    -------
+    LinearQuestionaire
+        The compiled questionaire.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no definition of the test.
+    """
+    path = os.path.join(definitions_dir, f"{name}.json")
+    source = _source_stat(path)
+    key = os.path.abspath(path)
+    with _lock:
+        if not rebuild and key in _questionaires and _questionaires[key][0] == source:
+            return _questionaires[key][1]
+
+        cache_path = os.path.join(definitions_dir, CACHE_DIR_NAME, f"{name}.npz")
+        questionaire = None if rebuild else _read_cached(cache_path, source)
+        if questionaire is None:
+            with open(path, "r") as file:
+                questionaire = compile_definition(json.load(file))
+            _write_cached(cache_path, questionaire, source)
+
+        _questionaires[key] = (source, questionaire)
+        return questionaire
+
+
+def available_questionaires(definitions_dir: str = DEFINITIONS_DIR) -> list[str]:
+    """The names of all defined tests."""
+    return sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(definitions_dir, "*.json"))
+    )
+
+
+def score_answers(
+    name: str,
+    answers: Union[list[int], np.ndarray],
+    definitions_dir: str = DEFINITIONS_DIR,
+) -> np.ndarray:
+    """Scores one answer vector or a (runs, questions) answer matrix of a test.
+
+    Parameters
+    ----------
+    name : str
+        The test, see `available_questionaires`.
+    answers : Union[list[int], np.ndarray]
+        The answers, -1 for skipped.
+    definitions_dir : str, optional
+        The directory of the definitions, by default `DEFINITIONS_DIR`
+
+    Returns
+    -------
+    np.ndarray
+        The scores, of shape (axes,) for one answer vector and (runs, axes)
+        otherwise.
+    """
+    questionaire = load_questionaire(name, definitions_dir)
+    answers = np.asarray(answers)
+    if answers.ndim == 1:
+        return questionaire.score_batch(answers[None])[0]
+    return questionaire.score_batch(answers)
@@ -1,10 +1,12 @@
-"""This module provides functionality that enables us 
+"""This module provides functionality that enables us
 to calculate the score for the political compass test.
 
 The code was rewritten and adapted in Python. Original code can be found in:
 https://github.com/kmturley/political-compass/tree/master
 """
 
+import numpy as np
+
 E0 = 0.38
 S0 = 2.41
 
@@ -172,3 +174,56 @@ def calculate_political_compass_score(state: list[int]) -> tuple[float, float]:
     valS = round((valS + EPSILON) * 100) / 100
 
     return valE, valS
+
+
+# ECNOV and SOCV as (62, 5) arrays. The fifth column is zero, so that the skip code
+# -1 picks it when used as an index.
+ECNOV_TABLE = np.array([row + [0] for row in ECNOV], dtype=np.int64)
+SOCV_TABLE = np.array([row + [0] for row in SOCV], dtype=np.int64)
+_QUESTIONS = np.arange(len(ECNOV))
+
+
+def calculate_political_compass_scores(states: np.ndarray) -> np.ndarray:
+    """Calculates the political compass scores of many answer vectors at once. The
+    results equal `calculate_political_compass_score` applied to every row.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        Integer array of shape (runs, 62) with answers in the range [0,3] and -1 for
+        skipped questions.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (runs, 2) with the economic and social value scores.
+
+    Raises
+    ------
+    ValueError
+        If the shape is wrong or an answer is out of range.
+    """
+    states = np.asarray(states)
+    if states.ndim != 2 or states.shape[1] != len(_QUESTIONS):
+        raise ValueError(
+            f"Expected answers of shape (runs, {len(_QUESTIONS)}), got {states.shape}."
+        )
+    if states.size and (states.min() < -1 or states.max() > 3):
+        raise ValueError("Answers must be in the range [0,3] or -1 for skipped.")
+
+    sumE = ECNOV_TABLE[_QUESTIONS, states].sum(axis=1)
+    sumS = SOCV_TABLE[_QUESTIONS, states].sum(axis=1)
+    return np.stack([economic_score(sumE), social_score(sumS)], axis=1)
+
+
+def economic_score(sumE: np.ndarray) -> np.ndarray:
+    """Turns sums of ECNOV weights into economic value scores, rounded like
+    `calculate_political_compass_score`."""
+    # np.round rounds half to even like the built-in round of the scalar version.
+    return np.round((sumE / 8.0 + E0 + EPSILON) * 100) / 100
+
+
+def social_score(sumS: np.ndarray) -> np.ndarray:
+    """Turns sums of SOCV weights into social value scores, rounded like
+    `calculate_political_compass_score`."""
+    return np.round((sumS / 19.5 + S0 + EPSILON) * 100) / 100
@@ -0,0 +1,269 @@
+"""This module parses all questionaires once into a validated index.
+
+Every `data/<test>_questions/<name>-<lang>.txt` file is split at its `---` lines
+into one row per question (test, language, question, text, hash). The index is
+cached as `data/.questions_index.parquet` together with the size and modification
+time of every source, and rebuilt only when a source changes. Languages of a test
+that disagree on the number of questions are rejected before any request is made.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+INDEX_FILE_NAME = ".questions_index.parquet"
+
+# The political compass is answered with 4 response options, the idrlabs tests
+# with 5.
+DEFAULT_RESPONSE_OPTION_COUNTS = {"political_compass_questions": 4}
+_SOURCES_KEY = b"questionaire_sources"
+
+
+def _sources(data_dir: str) -> dict[str, list[int]]:
+    """Returns the size and modification time of every questionaire file, keyed by
+    its path relative to `data_dir`."""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_questions", "*.txt"))):
+        stat = os.stat(path)
+        sources[os.path.relpath(path, data_dir)] = [stat.st_size, stat.st_mtime_ns]
+    return sources
+
+
+def _parse(data_dir: str, source: str) -> list[dict]:
+    """Splits one questionaire file into its questions, in the same way
+    `utils.evaluate` always has: every line that is not a `---` separator is a
+    question, kept verbatim as it is put into the prompt."""
+    test = os.path.dirname(source)
+    language = os.path.splitext(os.path.basename(source))[0].rsplit("-", 1)[-1]
+    with open(os.path.join(data_dir, source), "r") as file:
+        questions = [question for question in file if question != "---\n"]
+
+    rows = []
+    for idx, text in enumerate(questions):
+        if not text.strip():
+            raise ValueError(f"{source}: question {idx} is empty.")
+        rows.append(
+            {
+                "test": test,
+                "language": language,
+                "question": idx,
+                "text": text,
+                "hash": hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:16],
+                "source": source,
+            }
+        )
+    return rows
+
+
+def _validate(frame: pd.DataFrame) -> None:
+    """Raises if the languages of a test disagree on the number of questions."""
+    counts = frame.groupby(["test", "language"], observed=True).size()
+    for test, test_counts in counts.groupby(level="test", observed=True):
+        if test_counts.nunique() > 1:
+            per_language = test_counts.droplevel("test").to_dict()
+            raise ValueError(
+                f"The languages of {test} disagree on the number of questions: "
+                f"{per_language}"
+            )
+
+
+class QuestionaireIndex:
+    """All questions of all tests and languages in one long DataFrame."""
+
+    def __init__(self: "QuestionaireIndex", frame: pd.DataFrame) -> None:
+        """Wraps an index frame, see `load_index`.
+
+        Parameters
+        ----------
+        frame : pd.DataFrame
+            Columns test, language, question, text, hash and source.
+        """
+        self.frame = frame
+        self._by_source = {
+            source: group["text"].tolist()
+            for source, group in frame.groupby("source", observed=True)
+        }
+
+    @property
+    def tests(self: "QuestionaireIndex") -> list[str]:
+        """The tests in the index."""
+        return sorted(self.frame["test"].unique())
+
+    def languages(self: "QuestionaireIndex", test: str) -> list[str]:
+        """The language codes a test exists in."""
+        return sorted(self.frame.loc[self.frame["test"] == test, "language"].unique())
+
+    def question_count(self: "QuestionaireIndex", test: str) -> int:
+        """The number of questions of a test, equal in every language."""
+        return int(self.frame.loc[self.frame["test"] == test, "question"].max()) + 1
+
+    def questions(self: "QuestionaireIndex", test: str, language: str) -> list[str]:
+        """The questions of a test in one language, in order.
+
+        Raises
+        ------
+        KeyError
+            If the test does not exist in the language.
+        """
+        rows = self.frame[
+            (self.frame["test"] == test) & (self.frame["language"] == language)
+        ]
+        if rows.empty:
+            raise KeyError(f"No questions for {test} in {language}.")
+        return rows.sort_values("question")["text"].tolist()
+
+    def source(self: "QuestionaireIndex", test: str, language: str) -> str:
+        """The source file of a test in one language, relative to the data
+        directory.
+
+        Raises
+        ------
+        KeyError
+            If the test does not exist in the language.
+        """
+        rows = self.frame[
+            (self.frame["test"] == test) & (self.frame["language"] == language)
+        ]
+        if rows.empty:
+            raise KeyError(f"No questions for {test} in {language}.")
+        return str(rows["source"].iloc[0])
+
+    def source_questions(self: "QuestionaireIndex", source: str) -> Optional[list[str]]:
+        """The questions parsed from a source file (relative to the data
+        directory), or None if it is not indexed."""
+        return self._by_source.get(source)
+
+
+def build_index(data_dir: str = "data") -> pd.DataFrame:
+    """Parses and validates every questionaire file under `data_dir`.
+
+    Parameters
+    ----------
+    data_dir : str, optional
+        The data directory, by default "data"
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per question with compact dtypes.
+
+    Raises
+    ------
+    ValueError
+        If a question is empty or the languages of a test disagree on the number
+        of questions.
+    """
+    rows = [row for source in _sources(data_dir) for row in _parse(data_dir, source)]
+    frame = pd.DataFrame(
+        rows, columns=["test", "language", "question", "text", "hash", "source"]
+    ).astype(
+        {
+            "test": "category",
+            "language": "category",
+            "question": "int16",
+            "source": "category",
+        }
+    )
+    _validate(frame)
+    return frame
+
+
+def _read_cached(path: str, sources: dict[str, list[int]]) -> Optional[pd.DataFrame]:
+    """Returns the cached index if it was built from exactly these sources."""
+    if not os.path.exists(path):
+        return None
+    try:
+        table = pq.read_table(path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    cached_sources = (table.schema.metadata or {}).get(_SOURCES_KEY)
+    if cached_sources is None or json.loads(cached_sources) != sources:
+        return None
+    return table.to_pandas()
+
+
+def _write_cached(
+    path: str, frame: pd.DataFrame, sources: dict[str, list[int]]
+) -> None:
+    """Atomically writes the index; a read-only data directory is not an error."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _SOURCES_KEY: json.dumps(sources)}
+    )
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, temporary_path)
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+_indexes: dict[str, tuple[dict[str, list[int]], QuestionaireIndex]] = {}
+_lock = threading.Lock()
+
+
+def load_index(data_dir: str = "data", rebuild: bool = False) -> QuestionaireIndex:
+    """Returns the questionaire index, reading it from the Parquet cache next to the
+    sources unless a source file was added, removed or modified.
+
+    Parameters
+    ----------
+    data_dir : str, optional
+        The data directory, by default "data"
+    rebuild : bool, optional
+        Ignore the cache, by default False
+
+    Returns
+    -------
+    QuestionaireIndex
+        The validated index.
+
+    Raises
+    ------
+    ValueError
+        If the languages of a test disagree on the number of questions.
+    """
+    key = os.path.abspath(data_dir)
+    sources = _sources(data_dir)
+    with _lock:
+        if not rebuild and key in _indexes and _indexes[key][0] == sources:
+            return _indexes[key][1]
+
+        path = os.path.join(data_dir, INDEX_FILE_NAME)
+        frame = None if rebuild else _read_cached(path, sources)
+        if frame is None:
+            frame = build_index(data_dir)
+            _write_cached(path, frame, sources)
+
+        index = QuestionaireIndex(frame)
+        _indexes[key] = (sources, index)
+        return index
+
+
+def indexed_questions(file_path: str) -> Optional[list[str]]:
+    """Looks a questionaire file up in the index of its data directory.
+
+    Parameters
+    ----------
+    file_path : str
+        A path like `data/<test>_questions/<name>-<lang>.txt`.
+
+    Returns
+    -------
+    Optional[list[str]]
+        The questions, or None if the file is not laid out like the data directory.
+    """
+    test_dir = os.path.dirname(os.path.abspath(file_path))
+    if not test_dir.endswith("_questions"):
+        return None
+    data_dir = os.path.dirname(test_dir)
+    source = os.path.relpath(os.path.abspath(file_path), data_dir)
+    return load_index(data_dir).source_questions(source)
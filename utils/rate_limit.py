@@ -0,0 +1,433 @@
+"""This module provides rate limiting and adaptive concurrency control for the
+concurrent questionaire runner.
+
+A `RateLimiter` combines a requests per minute and a tokens per minute token bucket
+with an AIMD (additive increase, multiplicative decrease) concurrency limit that
+backs off on 429s and rising latency. `RateLimitedChain` wraps the `prompt | model`
+chain and retries rate limit and transport errors with backoff, while `RequestStats`
+counts them separately from answers that could not be parsed.
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable, Optional
+
+# Rough characters per token ratio, used to estimate the prompt size up front.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str, completion_tokens: int = 5) -> int:
+    """Estimates the number of tokens a request will consume.
+
+    Parameters
+    ----------
+    text : str
+        The full prompt text.
+    completion_tokens : int, optional
+        Expected number of completion tokens, by default 5
+
+    Returns
+    -------
+    int
+        Estimated prompt + completion tokens.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1 + completion_tokens
+
+
+class TokenBucket:
+    """Asynchronous token bucket refilled at a constant per minute rate."""
+
+    def __init__(
+        self: "TokenBucket", rate_per_minute: float, capacity: Optional[float] = None
+    ) -> None:
+        """Initializes a full bucket.
+
+        Parameters
+        ----------
+        rate_per_minute : float
+            Refill rate in tokens per minute.
+        capacity : Optional[float], optional
+            Maximum burst size, by default one minute worth of tokens.
+
+        Raises
+        ------
+        ValueError
+            If the rate or the capacity is not positive.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive.")
+
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        if self.capacity <= 0:
+            raise ValueError("capacity must be positive.")
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self: "TokenBucket") -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self: "TokenBucket", amount: float = 1.0) -> None:
+        """Waits until `amount` tokens are available and takes them. Requests larger
+        than the capacity are clipped to it, so they cannot wait forever.
+
+        Parameters
+        ----------
+        amount : float, optional
+            Number of tokens, by default 1.0
+        """
+        amount = min(amount, self.capacity)
+        # The lock makes the waiters first come, first served.
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+
+class AIMDConcurrency:
+    """Concurrency limit adapted by additive increase, multiplicative decrease.
+
+    Every successful request adds `increase / limit`, i.e. about `increase` per
+    round of `limit` requests. A 429, a transport error or a latency above
+    `latency_tolerance` times the baseline latency multiplies the limit by
+    `decrease`, at most once per baseline latency so a burst of errors from the
+    same round only counts once.
+    """
+
+    def __init__(
+        self: "AIMDConcurrency",
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        adaptive: bool = True,
+    ) -> None:
+        """Initializes the controller.
+
+        Parameters
+        ----------
+        initial : int, optional
+            Initial concurrency limit, by default 4
+        minimum : int, optional
+            Lower bound of the limit, by default 1
+        maximum : int, optional
+            Upper bound of the limit, by default 64
+        increase : float, optional
+            Additive increase per round of requests, by default 1.0
+        decrease : float, optional
+            Multiplicative decrease factor, by default 0.5
+        latency_tolerance : float, optional
+            Latency over baseline ratio treated as congestion, by default 2.0
+        adaptive : bool, optional
+            If False the limit stays fixed at `maximum`, by default True
+        """
+        if not 1 <= minimum <= maximum:
+            raise ValueError("Expected 1 <= minimum <= maximum.")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.adaptive = adaptive
+        self.limit = float(min(max(initial, minimum), maximum) if adaptive else maximum)
+
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._baseline: Optional[float] = None
+        self._recent: Optional[float] = None
+        self._last_decrease = 0.0
+
+    async def acquire(self: "AIMDConcurrency") -> None:
+        """Waits for a free slot under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def release(self: "AIMDConcurrency") -> None:
+        """Frees a slot and wakes the waiters, which re-check the current limit."""
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _cut(self: "AIMDConcurrency") -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self._baseline or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+
+    def on_success(self: "AIMDConcurrency", latency: float) -> None:
+        """Records a successful request and adapts the limit. Call it before
+        `release`, so the release lets in the waiters an increased limit admits.
+
+        Parameters
+        ----------
+        latency : float
+            Request latency in seconds.
+        """
+        if not self.adaptive:
+            return
+
+        # The baseline follows the fastest latencies and only drifts up slowly.
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline += 0.01 * (latency - self._baseline)
+        self._recent = (
+            latency if self._recent is None else 0.7 * self._recent + 0.3 * latency
+        )
+
+        if self._recent > self.latency_tolerance * self._baseline:
+            self._cut()
+        else:
+            self.limit = min(
+                float(self.maximum), self.limit + self.increase / self.limit
+            )
+
+    def on_error(self: "AIMDConcurrency") -> None:
+        """Records a rate limit or transport error."""
+        if self.adaptive:
+            self._cut()
+
+
+class RequestStats:
+    """Counters of a concurrent run. Rate limit and transport errors are retried by
+    `RateLimitedChain`, parse failures are retried by the questionaire runner."""
+
+    def __init__(self: "RequestStats") -> None:
+        self.requests = 0
+        self.rate_limit_errors = 0
+        self.transport_errors = 0
+        self.parse_failures = 0
+        self.fallbacks = 0
+        self.total_latency = 0.0
+        self.started = time.monotonic()
+
+    def as_dict(self: "RequestStats") -> dict[str, float]:
+        """Returns the counters together with the mean latency and throughput."""
+        elapsed = time.monotonic() - self.started
+        return {
+            "requests": self.requests,
+            "rate_limit_errors": self.rate_limit_errors,
+            "transport_errors": self.transport_errors,
+            "parse_failures": self.parse_failures,
+            "fallbacks": self.fallbacks,
+            "mean_latency": (
+                self.total_latency / self.requests if self.requests else 0.0
+            ),
+            "requests_per_minute": 60.0 * self.requests / elapsed if elapsed else 0.0,
+        }
+
+    def __repr__(self: "RequestStats") -> str:
+        values = ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in self.as_dict().items()
+        )
+        return f"RequestStats({values})"
+
+
+class RateLimiter:
+    """Shared limiter combining request and token buckets with AIMD concurrency."""
+
+    def __init__(
+        self: "RateLimiter",
+        max_concurrency: int = 16,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        adaptive: bool = True,
+        initial_concurrency: int = 4,
+    ) -> None:
+        """Initializes the limiter.
+
+        Parameters
+        ----------
+        max_concurrency : int, optional
+            Upper bound of requests in flight, by default 16
+        requests_per_minute : Optional[float], optional
+            Request quota, by default None (unlimited)
+        tokens_per_minute : Optional[float], optional
+            Token quota, by default None (unlimited)
+        adaptive : bool, optional
+            Adapt the concurrency by AIMD, by default True
+        initial_concurrency : int, optional
+            Starting concurrency when adaptive, by default 4
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AIMDConcurrency(
+            initial=initial_concurrency, maximum=max_concurrency, adaptive=adaptive
+        )
+        self.stats = RequestStats()
+
+    async def acquire(self: "RateLimiter", tokens: int = 0) -> None:
+        """Waits for the quotas and a concurrency slot."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+        await self.concurrency.acquire()
+
+    async def release(self: "RateLimiter") -> None:
+        """Frees the concurrency slot."""
+        await self.concurrency.release()
+
+
+def _classify_error(exc: BaseException) -> Optional[str]:
+    """Returns "rate_limit", "transport" or None for errors that are not retryable."""
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+
+    if status_code == 429 or type(exc).__name__ == "RateLimitError":
+        return "rate_limit"
+    if isinstance(status_code, int) and status_code >= 500:
+        return "transport"
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return "transport"
+    if type(exc).__name__ in {
+        "APIConnectionError",
+        "APITimeoutError",
+        "ConnectError",
+        "ReadError",
+        "ReadTimeout",
+        "RemoteProtocolError",
+    }:
+        return "transport"
+    return None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Reads the Retry-After header of an error response, if there is one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestsStopped(Exception):
+    """Raised by `RateLimitedChain` instead of sending a request once its
+    `stop_when` says so, e.g. when a spend cap is reached."""
+
+
+class RateLimitedChain:
+    """Wraps a `prompt | model` chain so every call goes through a `RateLimiter`.
+
+    Rate limit and transport errors are retried with exponential backoff (honouring
+    Retry-After) and counted on the limiter's `RequestStats`; other errors propagate.
+    Only the asynchronous `ainvoke` is supported.
+    """
+
+    def __init__(
+        self: "RateLimitedChain",
+        chain,
+        limiter: RateLimiter,
+        prompt_text: str = "",
+        max_attempts: int = 8,
+        max_backoff: float = 60.0,
+        on_request: Optional[Callable[[int], None]] = None,
+        stop_when: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Initializes the wrapper.
+
+        Parameters
+        ----------
+        chain : RunnableSequence
+            The `prompt | model` chain.
+        limiter : RateLimiter
+            The (usually shared) limiter.
+        prompt_text : str, optional
+            The prompt template, used to estimate the tokens per request.
+        max_attempts : int, optional
+            Attempts per call before the error is raised, by default 8
+        max_backoff : float, optional
+            Upper bound of a single backoff in seconds, by default 60.0
+        on_request : Optional[Callable[[int], None]], optional
+            Called with the estimated prompt tokens of every request sent, retries
+            included, e.g. to charge its cost, by default None
+        stop_when : Optional[Callable[[], bool]], optional
+            Checked before every request, retries included; once it returns True
+            `RequestsStopped` is raised instead, by default None
+        """
+        self.chain = chain
+        self.limiter = limiter
+        self.stats = limiter.stats
+        self.prompt_text = prompt_text
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.on_request = on_request
+        self.stop_when = stop_when
+
+    def _backoff(self: "RateLimitedChain", attempt: int, exc: BaseException) -> float:
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.max_backoff, 0.5 * 2**attempt) * random.uniform(0.5, 1.5)
+
+    async def ainvoke(self: "RateLimitedChain", inputs: dict, *args, **kwargs):
+        """Invokes the wrapped chain under the limiter.
+
+        Parameters
+        ----------
+        inputs : dict
+            The chain inputs, e.g. `{"question": ...}`.
+
+        Returns
+        -------
+        BaseMessage
+            The model response.
+
+        Raises
+        ------
+        RequestsStopped
+            If `stop_when` returned True before a request.
+        """
+        text = self.prompt_text + "".join(map(str, inputs.values()))
+        tokens = estimate_tokens(text)
+
+        for attempt in range(self.max_attempts):
+            await self.limiter.acquire(tokens)
+            start = time.monotonic()
+            try:
+                # Checked after waiting for the slot, which may take a while.
+                if self.stop_when is not None and self.stop_when():
+                    raise RequestsStopped("Stopped before sending the request.")
+                if self.on_request is not None:
+                    self.on_request(estimate_tokens(text, completion_tokens=0))
+                response = await self.chain.ainvoke(inputs, *args, **kwargs)
+            except Exception as exc:
+                kind = _classify_error(exc)
+                if kind is None or attempt == self.max_attempts - 1:
+                    raise
+
+                if kind == "rate_limit":
+                    self.stats.rate_limit_errors += 1
+                else:
+                    self.stats.transport_errors += 1
+                self.limiter.concurrency.on_error()
+                backoff = self._backoff(attempt, exc)
+            else:
+                # The limit is adapted before the release wakes the waiting requests.
+                latency = time.monotonic() - start
+                self.limiter.concurrency.on_success(latency)
+                self.stats.requests += 1
+                self.stats.total_latency += latency
+                return response
+            finally:
+                # Also gives the slot back when the request is cancelled.
+                await self.limiter.release()
+            await asyncio.sleep(backoff)
@@ -0,0 +1,266 @@
+"""This module provides a persistent, content-addressed cache of model responses.
+
+Responses are stored in SQLite, keyed by a hash of the model, the temperature, the
+response option count, the prompt template and the question. The database runs in
+WAL mode so several processes (e.g. parallel notebook kernels) can share it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+
+class ResponseCache:
+    """SQLite backed response cache with size and age based eviction."""
+
+    def __init__(
+        self: "ResponseCache",
+        path: str = ".cache/responses.sqlite",
+        max_entries: Optional[int] = 100_000,
+        max_age_days: Optional[float] = None,
+        bypass: bool = False,
+    ) -> None:
+        """Opens (or creates) the cache.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the SQLite file, by default ".cache/responses.sqlite"
+        max_entries : Optional[int], optional
+            Keep at most this many entries, evicting the least recently used,
+            by default 100_000. None disables the limit.
+        max_age_days : Optional[float], optional
+            Evict entries older than this, by default None (never)
+        bypass : bool, optional
+            Neither read nor write the cache, e.g. for sampling experiments at
+            temperature > 0, by default False
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                "created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+        self.evict()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        response_option_count: int,
+        prompt: str,
+        inputs: dict,
+    ) -> str:
+        """Computes the content address of a request.
+
+        Parameters
+        ----------
+        model : str
+            The model name.
+        temperature : float
+            The sampling temperature.
+        response_option_count : int
+            4 or 5 response options.
+        prompt : str
+            The prompt template.
+        inputs : dict
+            The chain inputs, e.g. `{"question": ...}`.
+
+        Returns
+        -------
+        str
+            Hex digest identifying the request.
+        """
+        payload = json.dumps(
+            [model, float(temperature), response_option_count, prompt, inputs],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self: "ResponseCache", key: str) -> Optional[str]:
+        """Returns the cached response for `key`, or None."""
+        if self.bypass:
+            return None
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT content FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self: "ResponseCache", key: str, content: str) -> None:
+        """Stores a response. Eviction runs every 1000 writes."""
+        if self.bypass:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+        self._puts += 1
+        if self._puts % 1000 == 0:
+            self.evict()
+
+    def evict(self: "ResponseCache") -> None:
+        """Removes entries older than `max_age_days` and the least recently used
+        entries beyond `max_entries`."""
+        with self._lock, self._connection:
+            if self.max_age_days is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.max_age_days * 86400,),
+                )
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_used DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self: "ResponseCache") -> None:
+        """Removes every entry."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def __len__(self: "ResponseCache") -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+
+    def stats(self: "ResponseCache") -> dict[str, float]:
+        """Returns the hit/miss statistics of this process and the cache size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self: "ResponseCache") -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+
+class CachedChain:
+    """Wraps a chain so responses are served from and stored in a `ResponseCache`.
+
+    Only responses accepted by `validate` are stored, so an unparsable answer is
+    never replayed to the retry loop.
+    """
+
+    def __init__(
+        self: "CachedChain",
+        chain,
+        cache: ResponseCache,
+        model: str,
+        temperature: float,
+        response_option_count: int,
+        prompt: str,
+        validate: Optional[Callable[[str, dict], bool]] = None,
+    ) -> None:
+        """Initializes the wrapper.
+
+        Parameters
+        ----------
+        chain : RunnableSequence
+            The `prompt | model` chain (possibly wrapped).
+        cache : ResponseCache
+            The cache to be used.
+        model : str
+            The model name, part of the cache key.
+        temperature : float
+            The sampling temperature, part of the cache key.
+        response_option_count : int
+            4 or 5 response options, part of the cache key.
+        prompt : str
+            The prompt template, part of the cache key.
+        validate : Optional[Callable[[str, dict], bool]], optional
+            Decides whether a response to the inputs is worth storing, by default
+            everything.
+        """
+        self.chain = chain
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.response_option_count = response_option_count
+        self.prompt = prompt
+        self.validate = validate
+
+    def _key(self: "CachedChain", inputs: dict) -> str:
+        return self.cache.make_key(
+            self.model,
+            self.temperature,
+            self.response_option_count,
+            self.prompt,
+            inputs,
+        )
+
+    @staticmethod
+    def _message(content: str):
+        """Wraps a cached response like a model response. langchain is imported on
+        the first hit, so the cache itself stays cheap to import."""
+        from langchain_core.messages import AIMessage
+
+        return AIMessage(content=content)
+
+    def _store(self: "CachedChain", key: str, inputs: dict, response) -> None:
+        if self.validate is None or self.validate(response.content, inputs):
+            self.cache.put(key, response.content)
+
+    def invoke(self: "CachedChain", inputs: dict, *args, **kwargs):
+        """Invokes the chain unless the response is cached."""
+        key = self._key(inputs)
+        content = self.cache.get(key)
+        if content is not None:
+            return self._message(content)
+
+        response = self.chain.invoke(inputs, *args, **kwargs)
+        self._store(key, inputs, response)
+        return response
+
+    async def ainvoke(self: "CachedChain", inputs: dict, *args, **kwargs):
+        """Asynchronously invokes the chain unless the response is cached."""
+        key = self._key(inputs)
+        content = self.cache.get(key)
+        if content is not None:
+            return self._message(content)
+
+        response = await self.chain.ainvoke(inputs, *args, **kwargs)
+        self._store(key, inputs, response)
+        return response
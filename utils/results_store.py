@@ -0,0 +1,316 @@
+"""This module provides a columnar store for questionaire answers.
+
+Answers are kept in long format, one row per (run, question), in a Parquet dataset
+partitioned by test and language (`<path>/test=<test>/language=<lang>/*.parquet`).
+Appends add new files, so runs from several processes never rewrite each other, and
+filters on the partition columns only touch the matching directories. The wide CSVs
+of `results/` (one column per language label) can be imported.
+"""
+
+import os
+import re
+import uuid
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from utils.gpt3_prompts import LANGUAGE_PROMPTS
+
+if TYPE_CHECKING:
+    from utils.evaluate import AnswerRecord
+
+_STRING = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema(
+    [
+        ("run_id", _STRING),
+        ("model", _STRING),
+        ("test", pa.string()),
+        ("language", pa.string()),
+        ("question", pa.int16()),
+        ("answer", pa.int8()),
+        ("raw_text", pa.string()),
+        ("latency", pa.float32()),
+        ("tokens", pa.int32()),
+    ]
+)
+
+# Nullable token counts stay int32 in pandas.
+_TYPES = {pa.int32(): pd.Int32Dtype()}
+
+_PARTITIONING = ds.partitioning(
+    pa.schema([("test", pa.string()), ("language", pa.string())]), flavor="hive"
+)
+
+# Characters replaced in the names of part files.
+_UNSAFE = re.compile(r"[^\w.-]")
+
+# Language label of `collect_results` to the language code of the data files.
+_LANGUAGE_CODES = {label: code for code, (label, _) in LANGUAGE_PROMPTS.items()}
+
+# The wide CSVs of `results/` that hold answers, and their test.
+# Political_Compass_Results.csv holds the (economic, social) scores, not answers.
+CSV_RESULTS = {
+    "Eight_Values_Test_Results.csv": "8values_questions",
+    "Ideologies_Test_Results.csv": "ideologies_questions",
+    "Eysenck_Political_Test_Results.csv": "eysenck_questions",
+}
+
+
+def language_code(language: str) -> str:
+    """Maps a language label like "English" to its code "en"; codes and unknown
+    labels are kept."""
+    return _LANGUAGE_CODES.get(language, language)
+
+
+def wide_to_long(
+    results: Union[pd.DataFrame, list[pd.Series]],
+    test: str,
+    run_id: str,
+    model: str = "gpt-3.5-turbo",
+) -> pd.DataFrame:
+    """Turns results in the wide format of `collect_results` (one column or Series
+    per language label, one row per question) into rows of the store.
+
+    Parameters
+    ----------
+    results : Union[pd.DataFrame, list[pd.Series]]
+        The answers per language.
+    test : str
+        The test, e.g. "political_compass_questions".
+    run_id : str
+        Identifies the run.
+    model : str, optional
+        The model that answered, by default "gpt-3.5-turbo"
+
+    Returns
+    -------
+    pd.DataFrame
+        The answers in long format.
+    """
+    if not isinstance(results, pd.DataFrame):
+        results = pd.concat(results, axis=1)
+    long = results.rename_axis(index="question", columns="language").melt(
+        ignore_index=False, value_name="answer"
+    )
+    long = long.reset_index()
+    long["language"] = long["language"].map(language_code)
+    long["test"] = test
+    long["run_id"] = run_id
+    long["model"] = model
+    return long
+
+
+def read_wide_csv(
+    path: str,
+    test: Optional[str] = None,
+    run_id: Optional[str] = None,
+    model: str = "gpt-3.5-turbo",
+) -> pd.DataFrame:
+    """Reads one of the wide result CSVs into rows of the store.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV.
+    test : Optional[str], optional
+        The test, by default looked up by file name in `CSV_RESULTS`.
+    run_id : Optional[str], optional
+        Identifies the run, by default the file name without extension.
+    model : str, optional
+        The model that answered, by default "gpt-3.5-turbo"
+
+    Returns
+    -------
+    pd.DataFrame
+        The answers in long format.
+    """
+    name = os.path.basename(path)
+    if test is None:
+        test = CSV_RESULTS[name]
+    if run_id is None:
+        run_id = os.path.splitext(name)[0]
+    return wide_to_long(pd.read_csv(path), test, run_id, model)
+
+
+class ResultsStore:
+    """Parquet dataset of answers in long format, partitioned by test and
+    language."""
+
+    def __init__(self: "ResultsStore", path: str = "results/store") -> None:
+        """Opens (or creates on the first append) the store.
+
+        Parameters
+        ----------
+        path : str, optional
+            The dataset directory, by default "results/store"
+        """
+        self.path = path
+
+    def _table(self: "ResultsStore", frame: pd.DataFrame) -> pa.Table:
+        """Fills missing optional columns and casts to the compact schema."""
+        missing = {"run_id", "model", "test", "language", "question", "answer"} - set(
+            frame.columns
+        )
+        if missing:
+            raise ValueError(f"Missing columns {sorted(missing)}.")
+
+        frame = frame.copy()
+        for column, default in (
+            ("raw_text", None),
+            ("latency", np.nan),
+            ("tokens", None),
+        ):
+            if column not in frame.columns:
+                frame[column] = default
+        frame["tokens"] = frame["tokens"].astype("Int32")
+        arrays = []
+        for field in SCHEMA:
+            if pa.types.is_dictionary(field.type):
+                array = pa.array(frame[field.name].astype(str), pa.string())
+                arrays.append(array.dictionary_encode())
+            else:
+                arrays.append(pa.array(frame[field.name], field.type))
+        return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+    def append(
+        self: "ResultsStore", frame: pd.DataFrame, name: Optional[str] = None
+    ) -> None:
+        """Appends answers in long format.
+
+        Parameters
+        ----------
+        frame : pd.DataFrame
+            Columns run_id, model, test, language, question, answer and optionally
+            raw_text, latency and tokens.
+        name : Optional[str], optional
+            Name of the written files. Appending under a name again replaces the
+            files of every partition it writes, by default a fresh unique name.
+        """
+        # Keep the name safe for file systems, e.g. for models like "org/model".
+        name = _UNSAFE.sub("_", name) if name is not None else uuid.uuid4().hex
+        ds.write_dataset(
+            self._table(frame),
+            self.path,
+            format="parquet",
+            partitioning=_PARTITIONING,
+            basename_template=f"part-{name}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def append_results(
+        self: "ResultsStore",
+        results: Union[pd.DataFrame, list[pd.Series]],
+        test: str,
+        run_id: str,
+        model: str = "gpt-3.5-turbo",
+    ) -> None:
+        """Appends the output of `collect_results`, see `wide_to_long`."""
+        self.append(wide_to_long(results, test, run_id, model))
+
+    def append_records(
+        self: "ResultsStore",
+        records: Iterable["AnswerRecord"],
+        run_id: str,
+        model: str = "gpt-3.5-turbo",
+    ) -> None:
+        """Appends the records of the streaming API, e.g. `stream_results`."""
+        frame = pd.DataFrame([record._asdict() for record in records])
+        if frame.empty:
+            return
+        frame = frame.rename(columns={"question_index": "question"})
+        frame["language"] = frame["language"].map(language_code)
+        frame["run_id"] = run_id
+        frame["model"] = model
+        self.append(frame)
+
+    def import_csvs(
+        self: "ResultsStore",
+        results_dir: str = "results",
+        model: str = "gpt-3.5-turbo",
+    ) -> int:
+        """Imports the wide CSVs of `results_dir` listed in `CSV_RESULTS`. The run
+        id of a file is its name without extension and its part files are named
+        after the run and the model, so importing again replaces the earlier import
+        instead of duplicating it.
+
+        Returns
+        -------
+        int
+            The number of imported answers.
+        """
+        count = 0
+        for name in CSV_RESULTS:
+            path = os.path.join(results_dir, name)
+            if os.path.exists(path):
+                frame = read_wide_csv(path, model=model)
+                self.append(frame, name=f"import-{frame['run_id'].iat[0]}-{model}")
+                count += len(frame)
+        return count
+
+    def dataset(self: "ResultsStore") -> ds.Dataset:
+        """The underlying Arrow dataset, for custom scans."""
+        return ds.dataset(
+            self.path, schema=SCHEMA, format="parquet", partitioning=_PARTITIONING
+        )
+
+    def load(
+        self: "ResultsStore",
+        columns: Optional[list[str]] = None,
+        filter: Optional[pc.Expression] = None,
+        **equals: Union[str, int, list],
+    ) -> pd.DataFrame:
+        """Loads answers, reading only the matching partitions and row groups.
+
+        Parameters
+        ----------
+        columns : Optional[list[str]], optional
+            Columns to read, by default all.
+        filter : Optional[pc.Expression], optional
+            An Arrow filter expression, e.g. `pc.field("answer") >= 2`.
+        **equals : Union[str, int, list]
+            Column equals value (or is in list) filters, combined with `filter`,
+            e.g. `test="political_compass_questions", language=["en", "de"]`.
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching rows with compact dtypes.
+        """
+        if not os.path.isdir(self.path):
+            return SCHEMA.empty_table().to_pandas(types_mapper=_TYPES.get)
+
+        for column, value in equals.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            expression = pc.field(column).isin(list(values))
+            filter = expression if filter is None else filter & expression
+        table = self.dataset().to_table(columns=columns, filter=filter)
+        return table.to_pandas(types_mapper=_TYPES.get)
+
+    def to_wide(
+        self: "ResultsStore",
+        test: str,
+        run_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Loads one run of a test in the wide format of the result CSVs: one row per
+        question and one column per language code.
+
+        Raises
+        ------
+        ValueError
+            If the selection holds more than one answer per question and language.
+        """
+        equals = {"test": test}
+        if run_id is not None:
+            equals["run_id"] = run_id
+        if model is not None:
+            equals["model"] = model
+        long = self.load(columns=["language", "question", "answer"], **equals)
+        if long.duplicated(["language", "question"]).any():
+            raise ValueError("Several runs match; select one by run_id or model.")
+        return long.pivot(index="question", columns="language", values="answer")
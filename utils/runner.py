@@ -0,0 +1,343 @@
+"""This module provides a long-lived questionaire runner that reuses compiled prompt
+templates, chat models and one keep-alive HTTP connection pool across all languages,
+tests and calls of `utils.evaluate`.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+import numpy as np
+
+from utils.backends import ModelBackend
+from utils.gpt3_prompts import UniversalPrompt
+
+if TYPE_CHECKING:
+    from langchain.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+
+class ConnectionStats:
+    """Counts requests and newly opened connections of the shared pool through
+    httpcore's trace extension, and records the latency of every request up to
+    its response headers."""
+
+    def __init__(self: "ConnectionStats") -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.latencies: list[float] = []
+        self._started = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _count(self: "ConnectionStats", event_name: str) -> None:
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def trace(self: "ConnectionStats", event_name: str, info: dict) -> None:
+        self._count(event_name)
+
+    async def atrace(self: "ConnectionStats", event_name: str, info: dict) -> None:
+        self._count(event_name)
+
+    def on_request(self: "ConnectionStats", request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+            self._started[request] = time.perf_counter()
+        request.extensions["trace"] = self.trace
+
+    async def aon_request(self: "ConnectionStats", request: httpx.Request) -> None:
+        self.on_request(request)
+        request.extensions["trace"] = self.atrace
+
+    def on_response(self: "ConnectionStats", response: httpx.Response) -> None:
+        with self._lock:
+            started = self._started.pop(response.request, None)
+            if started is not None:
+                self.latencies.append(time.perf_counter() - started)
+
+    async def aon_response(self: "ConnectionStats", response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def latency_percentiles(
+        self: "ConnectionStats", percentiles: tuple[float, ...] = (50, 99)
+    ) -> dict[str, float]:
+        """Returns percentiles of the request latencies in seconds, e.g.
+        `{"p50": ..., "p99": ...}`."""
+        with self._lock:
+            latencies = list(self.latencies)
+        if not latencies:
+            return {f"p{percentile:g}": float("nan") for percentile in percentiles}
+        values = np.percentile(latencies, percentiles)
+        return {
+            f"p{percentile:g}": float(value)
+            for percentile, value in zip(percentiles, values)
+        }
+
+    def as_dict(self: "ConnectionStats") -> dict[str, float]:
+        """Returns the counters and the share of requests served on a reused
+        connection."""
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reuse_rate": reused / self.requests if self.requests else 0.0,
+        }
+
+
+class QuestionaireRunner:
+    """Builds `prompt | model` chains from shared, cached parts.
+
+    Compiled templates are cached per (prompt class, response option count, batch),
+    chat models per (temperature, max retries, max tokens) and all of them talk to
+    the backend through one keep-alive connection pool. Asynchronous HTTP clients are
+    bound to an event loop, so one asynchronous pool is kept per running loop.
+    """
+
+    def __init__(
+        self: "QuestionaireRunner",
+        model_name: Optional[str] = None,
+        max_connections: int = 64,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+        backend: Optional[ModelBackend] = None,
+    ) -> None:
+        """Initializes the runner. Nothing is opened before the first chain is built.
+
+        Parameters
+        ----------
+        model_name : Optional[str], optional
+            The chat model of the default OpenAI backend, by default the langchain
+            default. Ignored if `backend` is given.
+        max_connections : int, optional
+            Size of the connection pool, by default 64
+        keepalive_expiry : float, optional
+            Seconds an idle connection is kept open, by default 60.0
+        timeout : float, optional
+            Request timeout in seconds, by default 60.0
+        backend : Optional[ModelBackend], optional
+            The endpoint to talk to, by default OpenAI with `model_name`.
+        """
+        if backend is None:
+            backend = ModelBackend(model_name or "openai", model_name=model_name)
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.stats = ConnectionStats()
+
+        self._lock = threading.Lock()
+        self._templates: dict[tuple, tuple["ChatPromptTemplate", str]] = {}
+        self._models: dict[tuple, "ChatOpenAI"] = {}
+        self._loop_models = weakref.WeakKeyDictionary()
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_clients = weakref.WeakKeyDictionary()
+        self._unbound_async_http_client: Optional[httpx.AsyncClient] = None
+        self._closing: set[asyncio.Task] = set()
+        _runners.add(self)
+
+    def _sync_http_client(self: "QuestionaireRunner") -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={
+                    "request": [self.stats.on_request],
+                    "response": [self.stats.on_response],
+                },
+            )
+        return self._http_client
+
+    def _async_http_client(
+        self: "QuestionaireRunner", loop: Optional[asyncio.AbstractEventLoop]
+    ) -> httpx.AsyncClient:
+        if loop is None:
+            # Only used to satisfy ChatOpenAI outside of an event loop, so one client
+            # is shared by all such models and closed in `close`.
+            if self._unbound_async_http_client is None:
+                self._unbound_async_http_client = httpx.AsyncClient(
+                    limits=self.limits, timeout=self.timeout
+                )
+            return self._unbound_async_http_client
+        if loop not in self._async_http_clients:
+            self._async_http_clients[loop] = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={
+                    "request": [self.stats.aon_request],
+                    "response": [self.stats.aon_response],
+                },
+            )
+        return self._async_http_clients[loop]
+
+    def template(
+        self: "QuestionaireRunner",
+        prompt_impl: UniversalPrompt,
+        response_option_count: int,
+        batch: bool = False,
+    ) -> tuple["ChatPromptTemplate", str]:
+        """Returns the compiled template and its text, building them once.
+
+        Parameters
+        ----------
+        prompt_impl : UniversalPrompt
+            The prompt implementation to be used.
+        response_option_count : int
+            4 or 5 response options.
+        batch : bool, optional
+            Use the batch prompt, by default False
+
+        Returns
+        -------
+        tuple[ChatPromptTemplate, str]
+            The template and the prompt text.
+        """
+        from langchain.prompts import ChatPromptTemplate
+
+        key = (prompt_impl, response_option_count, batch)
+        with self._lock:
+            if key not in self._templates:
+                prompt_obj = prompt_impl(response_option_count=response_option_count)
+                prompt_text = prompt_obj.batch_prompt() if batch else prompt_obj.prompt
+                self._templates[key] = (
+                    ChatPromptTemplate.from_template(prompt_text),
+                    prompt_text,
+                )
+            return self._templates[key]
+
+    def model(
+        self: "QuestionaireRunner",
+        temperature: float,
+        max_retries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> "ChatOpenAI":
+        """Returns the chat model for the temperature, sharing the connection pool.
+
+        Parameters
+        ----------
+        temperature : float
+            Temperature for ChatGPT.
+        max_retries : Optional[int], optional
+            Retries of the OpenAI client itself, by default the client's default.
+        max_tokens : Optional[int], optional
+            Upper bound of the completion length, by default unbounded.
+
+        Returns
+        -------
+        ChatOpenAI
+            The chat model.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        key = (temperature, max_retries, max_tokens)
+        with self._lock:
+            if loop is None:
+                models = self._models
+            else:
+                models = self._loop_models.setdefault(loop, {})
+
+            if key not in models:
+                models[key] = self.backend.create_model(
+                    temperature,
+                    max_retries,
+                    max_tokens,
+                    http_client=self._sync_http_client(),
+                    async_http_client=self._async_http_client(loop),
+                    timeout=self.timeout,
+                )
+            return models[key]
+
+    def model_identity(self: "QuestionaireRunner", model: "ChatOpenAI") -> str:
+        """Identifies a model of this runner in response cache keys."""
+        return self.backend.identity(model.model_name)
+
+    def connection_stats(self: "QuestionaireRunner") -> dict[str, float]:
+        """Returns the connection reuse statistics of the shared pool."""
+        return self.stats.as_dict()
+
+    async def aclose_loop(self: "QuestionaireRunner") -> None:
+        """Closes the asynchronous pool of the running event loop and forgets the
+        models built on it. Must be awaited before the loop finishes, see
+        `aclose_loop_clients`."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_http_clients.pop(loop, None)
+            self._loop_models.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self: "QuestionaireRunner") -> None:
+        """Closes the synchronous pool, the asynchronous client of the models built
+        outside an event loop and the pool of the running loop, and forgets the
+        cached models. The pools of loops created by `utils.evaluate` are closed
+        when their loop finishes."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            if self._unbound_async_http_client is not None:
+                self._aclose(self._unbound_async_http_client)
+                self._unbound_async_http_client = None
+            if running_loop is not None and running_loop in self._async_http_clients:
+                self._aclose(self._async_http_clients.pop(running_loop))
+            self._models.clear()
+            self._loop_models.clear()
+
+    def _aclose(self: "QuestionaireRunner", client: httpx.AsyncClient) -> None:
+        """Closes an asynchronous client from synchronous code."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(client.aclose())
+            return
+        # Keep a reference until the close is done.
+        task = loop.create_task(client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+_default_runner: Optional[QuestionaireRunner] = None
+# Every live runner, so the pools of a finishing loop can be closed.
+_runners: "weakref.WeakSet[QuestionaireRunner]" = weakref.WeakSet()
+
+
+async def aclose_loop_clients() -> None:
+    """Closes the asynchronous pools every runner opened on the running event loop.
+    Awaited at the end of every loop created by `utils.evaluate`, whose clients
+    would otherwise stay open after their loop is gone."""
+    for runner in list(_runners):
+        await runner.aclose_loop()
+
+
+def get_default_runner() -> QuestionaireRunner:
+    """Returns the runner shared by all functions of `utils.evaluate`."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = QuestionaireRunner()
+    return _default_runner
+
+
+def set_default_runner(runner: QuestionaireRunner) -> None:
+    """Replaces the runner shared by all functions of `utils.evaluate`, e.g. to use
+    another model or a bigger connection pool."""
+    global _default_runner
+    _default_runner = runner
@@ -0,0 +1,306 @@
+"""This module provides a repeated-sampling engine for temperature > 0 studies.
+
+Instead of calling `collect_results` in an outer loop, every question is sampled
+with several completions per request (the `n` parameter of the chat API) until the
+most frequent answer is statistically settled or the run budget is spent.
+
+Questions stop after different numbers of draws, so the answer matrix is ragged:
+only the real draws are kept and the rest is -1, the skip code of the scorers.
+`answer_frequencies` and the "questions" method of `bootstrap_scores` therefore
+weight every question by the draws it actually got.
+"""
+
+import asyncio
+import math
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+from typing_extensions import Literal
+
+from utils.answer_parsing import AnswerParser
+from utils.evaluate import (
+    ANSWER_MAX_TOKENS,
+    fallback_answer,
+    load_questions,
+    openai_messages,
+    questionaire_id,
+    run_coroutine,
+)
+from utils.gpt3_prompts import UniversalPrompt
+from utils.runner import get_default_runner
+
+
+def mode_p_value(counts: Counter) -> float:
+    """One-sided sign test of the most frequent answer against the runner-up.
+
+    Under the null hypothesis both are equally likely, so among the draws that
+    gave one of the two, the mode count is Binomial(a + b, 0.5).
+
+    Parameters
+    ----------
+    counts : Counter
+        Answer counts of a question.
+
+    Returns
+    -------
+    float
+        P(X >= a) for X ~ Binomial(a + b, 0.5).
+    """
+    ranked = counts.most_common(2) + [(None, 0)]
+    mode_count, runner_up_count = ranked[0][1], ranked[1][1]
+    trials = mode_count + runner_up_count
+    if trials == 0:
+        return 1.0
+    return sum(math.comb(trials, k) for k in range(mode_count, trials + 1)) / 2**trials
+
+
+def look_alpha(alpha: float, looks: int) -> float:
+    """The level of every single look of the sequential stopping test.
+
+    The sign test is repeated after every request, and testing each look at
+    `alpha` would stop on a false mode far more often than `alpha`. Splitting
+    `alpha` evenly over the looks (Bonferroni) bounds the chance that any look
+    stops on a tie by `alpha`. The mode and the runner-up are picked from the same
+    draws, so the bound is approximate for more than two competing answers.
+
+    Parameters
+    ----------
+    alpha : float
+        Significance level over the whole sequence of looks.
+    looks : int
+        The maximum number of looks.
+
+    Returns
+    -------
+    float
+        The level of a single look.
+    """
+    return alpha / max(looks, 1)
+
+
+class SamplingResult:
+    """Answers of one questionaire in one language from repeated sampling."""
+
+    def __init__(
+        self: "SamplingResult",
+        answers: np.ndarray,
+        samples: np.ndarray,
+        settled: np.ndarray,
+        requests: int,
+        fallbacks: Optional[np.ndarray] = None,
+    ) -> None:
+        """Initializes the result.
+
+        Parameters
+        ----------
+        answers : np.ndarray
+            (runs, questions) answer matrix. The first `samples[q]` rows of question
+            q hold its draws; the rest is -1, because the question settled early
+            or the budget ran out.
+        samples : np.ndarray
+            Number of answers per question, i.e. the entries that are not -1.
+        settled : np.ndarray
+            Whether the mode of a question was settled before the budget ran out.
+        requests : int
+            Number of API requests made.
+        fallbacks : Optional[np.ndarray], optional
+            Whether a question got no parsable draw and holds the neutral fallback
+            answer as its only entry, by default none did.
+        """
+        self.answers = answers
+        self.samples = samples
+        self.settled = settled
+        self.requests = requests
+        self.fallbacks = (
+            fallbacks if fallbacks is not None else np.zeros(len(samples), dtype=bool)
+        )
+
+    @property
+    def mask(self: "SamplingResult") -> np.ndarray:
+        """Boolean (runs, questions) matrix of the real entries of `answers`."""
+        return self.answers >= 0
+
+    def modes(self: "SamplingResult") -> np.ndarray:
+        """The most frequent answer of every question."""
+        return np.array(
+            [
+                Counter(column[column >= 0].tolist()).most_common(1)[0][0]
+                for column in self.answers.T
+            ]
+        )
+
+    def __repr__(self: "SamplingResult") -> str:
+        return (
+            f"SamplingResult(runs={self.answers.shape[0]}, "
+            f"questions={self.answers.shape[1]}, draws={int(self.samples.sum())}, "
+            f"settled={int(self.settled.sum())}, "
+            f"fallbacks={int(self.fallbacks.sum())}, requests={self.requests})"
+        )
+
+
+async def asample_questionaire(
+    file_path: str,
+    prompt_impl: UniversalPrompt,
+    runs: int = 30,
+    temperature: float = 1.0,
+    response_option_count: int = 4,
+    n_per_request: int = 5,
+    min_samples: int = 5,
+    alpha: float = 0.05,
+    max_concurrency: int = 8,
+    language: Optional[str] = None,
+) -> SamplingResult:
+    """Samples every question of a questionaire up to `runs` times, stopping early
+    once the mode beats the runner-up with a sign test, see `look_alpha`.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path to the questionaire.
+    prompt_impl : UniversalPrompt
+        The prompt implementation to be used.
+    runs : int, optional
+        Maximum number of draws per question, by default 30
+    temperature : float, optional
+        Temperature for ChatGPT, by default 1.0
+    response_option_count : int, optional
+        4 or 5 response options, by default 4
+    n_per_request : int, optional
+        Completions drawn per request, by default 5
+    min_samples : int, optional
+        Draws per question before stopping is considered, by default 5
+    alpha : float, optional
+        Significance level of the stopping test over all looks, by default 0.05
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 8
+    language : Optional[str], optional
+        Language label for the parse statistics, by default the file's code
+
+    Returns
+    -------
+    SamplingResult
+        The ragged (runs, questions) answer matrix and the sampling statistics.
+    """
+    runner = get_default_runner()
+    prompt, _ = runner.template(prompt_impl, response_option_count)
+    model = runner.model(temperature)
+    _, language = questionaire_id(file_path, language)
+    parser = AnswerParser(prompt_impl, response_option_count, language)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    questions = load_questions(file_path)
+    # Unparsable completions are dropped, so allow some extra requests.
+    max_requests = 2 * math.ceil(runs / n_per_request)
+    # Every request is a look of the sequential test.
+    level = look_alpha(alpha, max_requests)
+
+    async def sample(question: str) -> tuple[list[int], bool, int]:
+        draws: list[int] = []
+        requests = 0
+        while len(draws) < runs and requests < max_requests:
+            async with semaphore:
+                response = await model.async_client.create(
+                    model=model.model_name,
+                    messages=openai_messages(prompt, question),
+                    temperature=temperature,
+                    max_tokens=ANSWER_MAX_TOKENS,
+                    n=min(n_per_request, runs - len(draws)),
+                )
+            requests += 1
+            for choice in response.choices:
+                answer = parser(choice.message.content or "")
+                if answer is not None:
+                    draws.append(answer)
+
+            if len(draws) >= min_samples and mode_p_value(Counter(draws)) <= level:
+                return draws, True, requests
+        return draws, False, requests
+
+    sampled = await asyncio.gather(*[sample(question) for question in questions])
+
+    answers = np.full((runs, len(questions)), -1, dtype=np.int8)
+    fallbacks = np.zeros(len(questions), dtype=bool)
+    for idx, (draws, _, _) in enumerate(sampled):
+        if not draws:
+            draws = [fallback_answer(response_option_count)]
+            fallbacks[idx] = True
+            print(f"No parsable answer for question {idx}. Using {draws[0]}.")
+        answers[: len(draws), idx] = draws
+
+    return SamplingResult(
+        answers,
+        samples=(answers >= 0).sum(axis=0),
+        settled=np.array([settled for _, settled, _ in sampled]),
+        requests=sum(requests for _, _, requests in sampled),
+        fallbacks=fallbacks,
+    )
+
+
+def sample_results(
+    file_path_list: list[str],
+    language_label_list: list[str],
+    prompt_impl_list: list[UniversalPrompt],
+    runs: int = 30,
+    temperature: float = 1.0,
+    response_option_count: Literal[4, 5] = 4,
+    n_per_request: int = 5,
+    min_samples: int = 5,
+    alpha: float = 0.05,
+    max_concurrency: int = 8,
+) -> dict[str, SamplingResult]:
+    """Runs `asample_questionaire` for a political test in N languages at once.
+
+    Parameters
+    ----------
+    file_path_list : list[str]
+        File paths to the political test data.
+    language_label_list : list[str]
+        The list of language labels
+    prompt_impl_list : list[UniversalPrompt]
+        List of prompts that match the language.
+    runs : int, optional
+        Maximum number of draws per question, by default 30
+    temperature : float, optional
+        Temperature for ChatGPT, by default 1.0
+    response_option_count : Literal[4, 5], optional
+        4 or 5 response options, by default 4
+    n_per_request : int, optional
+        Completions drawn per request, by default 5
+    min_samples : int, optional
+        Draws per question before stopping is considered, by default 5
+    alpha : float, optional
+        Significance level of the stopping test over all looks, by default 0.05
+    max_concurrency : int, optional
+        Maximum number of concurrent requests per language, by default 8
+
+    Returns
+    -------
+    dict[str, SamplingResult]
+        The sampling result of each language.
+    """
+
+    async def collect() -> list[SamplingResult]:
+        return await asyncio.gather(
+            *[
+                asample_questionaire(
+                    file,
+                    prompt_impl,
+                    runs=runs,
+                    temperature=temperature,
+                    response_option_count=response_option_count,
+                    n_per_request=n_per_request,
+                    min_samples=min_samples,
+                    alpha=alpha,
+                    max_concurrency=max_concurrency,
+                    language=label,
+                )
+                for file, label, prompt_impl in zip(
+                    file_path_list, language_label_list, prompt_impl_list
+                )
+            ]
+        )
+
+    results = dict(zip(language_label_list, run_coroutine(collect())))
+    for label, result in results.items():
+        print(f"{label}: {result}")
+    return results
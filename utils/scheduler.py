@@ -0,0 +1,127 @@
+"""This module provides a shared worker pool that answers the questions of several
+questionaires and languages at the same time."""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+
+class QuestionaireJob:
+    """All questions of one questionaire in one language."""
+
+    def __init__(
+        self: "QuestionaireJob",
+        test: str,
+        label: str,
+        questions: list[str],
+        answer_fn: Callable[[int, str], Awaitable[Optional[int]]],
+        answers: Optional[list[Optional[int]]] = None,
+        priority: int = 0,
+    ) -> None:
+        """Initializes the job.
+
+        Parameters
+        ----------
+        test : str
+            Name of the questionaire, used for progress output.
+        label : str
+            The language label.
+        questions : list[str]
+            The questions to be answered.
+        answer_fn : Callable[[int, str], Awaitable[Optional[int]]]
+            Coroutine function answering a single question, given its index and
+            text. None leaves the question unanswered.
+        answers : Optional[list[Optional[int]]], optional
+            Answers known up front (e.g. from a checkpoint); only the questions
+            without an answer are scheduled, by default None
+        priority : int, optional
+            Jobs with a higher priority are scheduled first, by default 0
+        """
+        self.test = test
+        self.label = label
+        self.questions = questions
+        self.answer_fn = answer_fn
+        self.answers: list[Optional[int]] = (
+            list(answers) if answers is not None else [None] * len(questions)
+        )
+        self.done = sum(answer is not None for answer in self.answers)
+        self.priority = priority
+
+
+class FairScheduler:
+    """Runs many questionaire jobs through one pool of workers.
+
+    The work is interleaved round-robin over the jobs (question 0 of every job,
+    then question 1 of every job, ...), so every language advances at the same
+    pace and no language starves another. Jobs of a higher priority go first.
+    """
+
+    def __init__(
+        self: "FairScheduler",
+        num_workers: int = 16,
+        progress_every: int = 10,
+        stop_when: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Initializes the scheduler.
+
+        Parameters
+        ----------
+        num_workers : int, optional
+            Number of workers pulling from the shared work queue, by default 16
+        progress_every : int, optional
+            Print the progress of a job every N answers, by default 10
+        stop_when : Optional[Callable[[], bool]], optional
+            Checked before every question; once it returns True no further
+            questions are started (e.g. when a spend cap is reached), by default None
+        """
+        self.num_workers = num_workers
+        self.progress_every = progress_every
+        self.stop_when = stop_when
+
+    def _interleave(
+        self: "FairScheduler", jobs: list[QuestionaireJob]
+    ) -> deque[tuple[QuestionaireJob, int]]:
+        """Builds the round-robin work order over the jobs of every priority."""
+        order = deque()
+        for priority in sorted({job.priority for job in jobs}, reverse=True):
+            same_priority = [job for job in jobs if job.priority == priority]
+            longest = max(len(job.questions) for job in same_priority)
+            for idx in range(longest):
+                for job in same_priority:
+                    if idx < len(job.questions) and job.answers[idx] is None:
+                        order.append((job, idx))
+        return order
+
+    def _report(self: "FairScheduler", job: QuestionaireJob) -> None:
+        """Prints the progress of a job."""
+        total = len(job.questions)
+        if job.done == total:
+            print(f"[{job.test}] {job.label}'s results collected")
+        elif job.done % self.progress_every == 0:
+            print(f"[{job.test}] {job.label}: {job.done}/{total}")
+
+    async def run(self: "FairScheduler", jobs: list[QuestionaireJob]) -> None:
+        """Answers all questions of all jobs, or until `stop_when` says so. The
+        answers are stored on the jobs in question order.
+
+        Parameters
+        ----------
+        jobs : list[QuestionaireJob]
+            The jobs to be run.
+        """
+        work = self._interleave(jobs)
+
+        async def worker() -> None:
+            while work:
+                if self.stop_when is not None and self.stop_when():
+                    return
+                job, idx = work.popleft()
+                answer = await job.answer_fn(idx, job.questions[idx])
+                if answer is None:
+                    # Not answered, e.g. stopped by a spend cap; left for a resume.
+                    continue
+                job.answers[idx] = answer
+                job.done += 1
+                self._report(job)
+
+        await asyncio.gather(*[worker() for _ in range(self.num_workers)])
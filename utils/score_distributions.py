@@ -0,0 +1,291 @@
+"""This module computes the exact distribution of the test scores from answer
+probabilities.
+
+Every axis score is a function of a sum of per-question contributions: the ECNOV or
+SOCV weight of the chosen answer for the political compass, the weighted effect for
+8values, Eysenck and ideologies. The contributions are integers (in half points for
+all but the compass), so the distribution of the sum is the convolution of the
+per-question distributions and is computed exactly by dynamic programming over the
+integer support. The probabilities come from logprobs (`collect_distributions`) or from
+repeated sampling (`answer_frequencies`).
+"""
+
+from types import ModuleType
+from typing import Callable
+
+import numpy as np
+
+from utils import eight_values_score, eysenck_score, ideologies_score
+from utils.political_compass_score import (
+    ECNOV_TABLE,
+    SOCV_TABLE,
+    economic_score,
+    social_score,
+)
+
+# 8values, Eysenck and ideologies contributions are multiples of half a point.
+_HALF_POINT = 0.5
+
+
+def _percentage_axis(
+    scorer: ModuleType, axis: int, first_pole_is_negative: bool = False
+) -> tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]:
+    """The integer contributions of one axis of a percentage scorer (8values or
+    ideologies) and the map of their sums to the percentage of the first pole, as in
+    its batch scorer."""
+    contributions = np.outer(scorer.EFFECTS[:, axis], scorer.WEIGHTS) / _HALF_POINT
+    maximum = scorer.MAX_SCORES[axis]
+
+    def score(sums: np.ndarray) -> np.ndarray:
+        values = 100 * (maximum + sums * _HALF_POINT) / (2 * maximum)
+        return 100 - values if first_pole_is_negative else values
+
+    return np.rint(contributions).astype(np.int64), score
+
+
+def _eysenck_axis(
+    axis: int,
+) -> tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]:
+    """The contributions of one Eysenck axis in half points and the map of their
+    sums to the coordinate, as in `calculate_approx_eysenck_scores`."""
+    contributions = (
+        np.outer(eysenck_score.EFFECTS[:, axis], eysenck_score.WEIGHTS) / _HALF_POINT
+    )
+    maximum = eysenck_score.MAX_SCORES[axis]
+
+    def score(sums: np.ndarray) -> np.ndarray:
+        return 10 * (sums * _HALF_POINT) / maximum
+
+    return np.rint(contributions).astype(np.int64), score
+
+
+# Per test: axis name, (questions, options) integer contributions and the map of
+# the contribution sums to scores. The axes match `utils.bootstrap.SCORERS`.
+AXES: dict[str, list[tuple[str, np.ndarray, Callable[[np.ndarray], np.ndarray]]]] = {
+    "political_compass_questions": [
+        ("economic", ECNOV_TABLE[:, :4], economic_score),
+        ("social", SOCV_TABLE[:, :4], social_score),
+    ],
+    "8values_questions": [
+        (name, *_percentage_axis(eight_values_score, axis, axis % 2 == 1))
+        for axis, name in enumerate(["equality", "nation", "liberty", "tradition"])
+    ],
+    "eysenck_questions": [
+        (name, *_eysenck_axis(axis))
+        for axis, name in enumerate(eysenck_score.APPROX_AXES)
+    ],
+    "ideologies_questions": [
+        (name, *_percentage_axis(ideologies_score, axis))
+        for axis, name in enumerate(ideologies_score.APPROX_AXES)
+    ],
+}
+
+
+class ScoreDistribution:
+    """The exact score distributions of one language, one histogram per axis."""
+
+    def __init__(
+        self: "ScoreDistribution",
+        axes: list[str],
+        values: list[np.ndarray],
+        probabilities: list[np.ndarray],
+    ) -> None:
+        """Initializes the distribution.
+
+        Parameters
+        ----------
+        axes : list[str]
+            Names of the score axes.
+        values : list[np.ndarray]
+            The ascending possible scores of every axis.
+        probabilities : list[np.ndarray]
+            The probability of every score.
+        """
+        self.axes = axes
+        self.values = values
+        self.probabilities = probabilities
+
+    def __repr__(self: "ScoreDistribution") -> str:
+        medians = ", ".join(
+            f"{axis}={median:.2f}"
+            for axis, median in zip(self.axes, self.quantiles([0.5])[:, 0])
+        )
+        return f"ScoreDistribution(median {medians})"
+
+    def histogram(
+        self: "ScoreDistribution", axis: str
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The possible scores of an axis and their probabilities."""
+        idx = self.axes.index(axis)
+        return self.values[idx], self.probabilities[idx]
+
+    def means(self: "ScoreDistribution") -> np.ndarray:
+        """The expected score of every axis."""
+        return np.array(
+            [
+                values @ probabilities
+                for values, probabilities in zip(self.values, self.probabilities)
+            ]
+        )
+
+    def quantiles(self: "ScoreDistribution", levels: list[float]) -> np.ndarray:
+        """The smallest scores whose cumulative probability reaches each level, as an
+        (axes, levels) array."""
+        quantiles = []
+        for values, probabilities in zip(self.values, self.probabilities):
+            cdf = np.cumsum(probabilities)
+            idx = np.searchsorted(cdf, np.asarray(levels) * cdf[-1])
+            quantiles.append(values[np.minimum(idx, len(values) - 1)])
+        return np.array(quantiles)
+
+    def intervals(self: "ScoreDistribution", level: float = 0.95) -> np.ndarray:
+        """Equal-tailed intervals as an (axes, 2) array of lower and upper bounds."""
+        tail = (1 - level) / 2
+        return self.quantiles([tail, 1 - tail])
+
+
+def sum_distributions(
+    contributions: np.ndarray, probabilities: np.ndarray
+) -> tuple[int, np.ndarray]:
+    """Convolves the per-question contribution distributions of several languages.
+
+    Parameters
+    ----------
+    contributions : np.ndarray
+        (questions, options) integer contribution of every answer.
+    probabilities : np.ndarray
+        (languages, questions, options) answer probabilities.
+
+    Returns
+    -------
+    tuple[int, np.ndarray]
+        The smallest possible sum and the (languages, sums) probabilities of all
+        sums from it onwards.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    pmf = np.ones((probabilities.shape[0], 1))
+    offset = 0
+    for question_contributions, question_probabilities in zip(
+        contributions, probabilities.transpose(1, 0, 2)
+    ):
+        low = int(question_contributions.min())
+        width = int(question_contributions.max()) - low
+        convolved = np.zeros((pmf.shape[0], pmf.shape[1] + width))
+        for contribution, option_probabilities in zip(
+            question_contributions, question_probabilities.T
+        ):
+            shift = int(contribution) - low
+            convolved[:, shift : shift + pmf.shape[1]] += (
+                option_probabilities[:, None] * pmf
+            )
+        pmf = convolved
+        offset += low
+    return offset, pmf
+
+
+def _fill_missing(distributions: np.ndarray) -> np.ndarray:
+    """Replaces missing (NaN) rows by the distribution of the neutral fallback
+    answer of `utils.evaluate`: the middle of 5 options, or options 1 and 2 with
+    equal probability of 4."""
+    missing = np.isnan(distributions).any(axis=-1)
+    if not missing.any():
+        return distributions
+
+    fallback = np.zeros(distributions.shape[-1])
+    if distributions.shape[-1] == 5:
+        fallback[2] = 1.0
+    else:
+        fallback[1:3] = 0.5
+    distributions = distributions.astype(np.float64, copy=True)
+    distributions[missing] = fallback
+    return distributions
+
+
+def score_distributions(
+    distributions: np.ndarray, test: str, language_label_list: list[str]
+) -> dict[str, ScoreDistribution]:
+    """Computes the exact score distribution of every language.
+
+    Parameters
+    ----------
+    distributions : np.ndarray
+        Array of shape (languages, questions, options) of answer probabilities, as
+        returned by `collect_distributions` or `answer_frequencies`. Missing (NaN)
+        rows count as the neutral fallback answer.
+    test : str
+        The test, a key of `AXES`.
+    language_label_list : list[str]
+        The list of language labels
+
+    Returns
+    -------
+    dict[str, ScoreDistribution]
+        The score distributions per language.
+
+    Raises
+    ------
+    ValueError
+        If the test is unknown or the distributions do not fit it.
+    """
+    if test not in AXES:
+        raise ValueError(
+            f"No score distributions for {test}; choose from {list(AXES)}."
+        )
+    distributions = np.asarray(distributions)
+    expected_shape = AXES[test][0][1].shape
+    if distributions.ndim != 3 or distributions.shape[1:] != expected_shape:
+        raise ValueError(
+            f"Expected distributions of shape (languages, {expected_shape[0]}, "
+            f"{expected_shape[1]}), got {distributions.shape}."
+        )
+    distributions = _fill_missing(distributions)
+
+    values = [[] for _ in language_label_list]
+    probabilities = [[] for _ in language_label_list]
+    for _, contributions, score in AXES[test]:
+        offset, pmf = sum_distributions(contributions, distributions)
+        scores = score(np.arange(offset, offset + pmf.shape[1]))
+        # Merge sums that round to the same score and drop impossible ones.
+        unique_scores, inverse = np.unique(scores, return_inverse=True)
+        for idx, language_pmf in enumerate(pmf):
+            merged = np.bincount(inverse, weights=language_pmf)
+            possible = merged > 0
+            values[idx].append(unique_scores[possible])
+            probabilities[idx].append(merged[possible])
+
+    names = [name for name, _, _ in AXES[test]]
+    return {
+        label: ScoreDistribution(names, language_values, language_probabilities)
+        for label, language_values, language_probabilities in zip(
+            language_label_list, values, probabilities
+        )
+    }
+
+
+def answer_frequencies(answers: np.ndarray, response_option_count: int) -> np.ndarray:
+    """Estimates answer probabilities from repeated runs. Every question is
+    weighted by the answers it actually got, so the ragged matrices of early
+    stopping are estimated from their real draws only.
+
+    Parameters
+    ----------
+    answers : np.ndarray
+        (runs, questions) answer matrix, e.g. `SamplingResult.answers`; answers
+        outside 0..response_option_count - 1 (like the skip code -1) are ignored.
+    response_option_count : int
+        4 or 5 response options.
+
+    Returns
+    -------
+    np.ndarray
+        (questions, response_option_count) relative answer frequencies; questions
+        without a valid answer are missing (NaN) rows.
+    """
+    answers = np.atleast_2d(answers)
+    counts = np.stack(
+        [(answers == option).sum(axis=0) for option in range(response_option_count)],
+        axis=1,
+    ).astype(np.float64)
+    totals = counts.sum(axis=1, keepdims=True)
+    missing = np.full_like(counts, np.nan)
+    return np.divide(counts, totals, out=missing, where=totals > 0)
@@ -0,0 +1,293 @@
+"""This module generates the definitions of the built-in tests in `data/scoring/`
+from the weight tables of their scorer modules, so that the tables stay the single
+source of every key.
+
+`build_definition` turns the tables into the definition format of
+`utils.linear_scoring`, `write_definitions` writes them and `check_definitions`
+fails if a written definition no longer matches its tables. After changing a key,
+regenerate the definitions with
+
+    python -m utils.scoring_definitions
+
+and check them with `--check`.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from utils import (
+    eight_values_score,
+    eysenck_score,
+    ideologies_score,
+    political_compass_score,
+)
+from utils.linear_scoring import DEFINITIONS_DIR
+
+POLITICAL_COMPASS_QUESTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "political_compass_questions",
+    "political_compass_questions-en.txt",
+)
+
+# The 8values axes by the name of their first pole, which the definition scores.
+EIGHT_VALUES_AXES = ["equality", "nation", "liberty", "tradition"]
+
+
+def _number(value: float) -> float:
+    """Writes whole weights as integers, like the hand-written definitions."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _weights(effects: np.ndarray, weights: np.ndarray, axes: list[str]) -> dict:
+    """The per-answer weights of one question on every axis it affects."""
+    return {
+        axis: [_number(effect * weight) for weight in weights]
+        for axis, effect in zip(axes, effects)
+        if effect != 0
+    }
+
+
+def _political_compass_definition() -> dict:
+    """The compass with the ECNOV and SOCV weights and its rounding."""
+    with open(POLITICAL_COMPASS_QUESTIONS_PATH, "r") as file:
+        texts = [line.strip() for line in file if line != "---\n"]
+
+    questions = []
+    for text, economic, social in zip(
+        texts, political_compass_score.ECNOV, political_compass_score.SOCV
+    ):
+        weights = {}
+        for axis, row in (("economic", economic), ("social", social)):
+            if any(row):
+                weights[axis] = [_number(weight) for weight in row]
+        questions.append({"question": text, "weights": weights})
+
+    return {
+        "name": "political_compass_questions",
+        "source": "https://github.com/kmturley/political-compass/tree/master",
+        "response_option_count": 4,
+        "axes": [
+            {
+                "name": "economic",
+                "divisor": 8.0,
+                "offset": political_compass_score.E0,
+                "decimals": 2,
+            },
+            {
+                "name": "social",
+                "divisor": 19.5,
+                "offset": political_compass_score.S0,
+                "decimals": 2,
+            },
+        ],
+        "questions": questions,
+    }
+
+
+def _eight_values_definition() -> dict:
+    """8values as the percentage of the first pole of every axis. The dipl and scty
+    axes list the opposite pole first, so their weights are negated."""
+    signs = np.array([1, -1, 1, -1])
+    effects = eight_values_score.EFFECTS * signs
+    return {
+        "name": "8values_questions",
+        "source": "https://github.com/8values/8values.github.io/tree/master",
+        "description": "Percentage of the first pole of every axis.",
+        "response_option_count": 5,
+        "axes": [
+            {"name": name, "divisor": _number(maximum / 50), "offset": 50.0}
+            for name, maximum in zip(EIGHT_VALUES_AXES, eight_values_score.MAX_SCORES)
+        ],
+        "questions": [
+            {
+                "question": question["question"],
+                "weights": _weights(row, eight_values_score.WEIGHTS, EIGHT_VALUES_AXES),
+            }
+            for question, row in zip(eight_values_score.questions, effects)
+        ],
+    }
+
+
+def _eysenck_definition() -> dict:
+    """The approximate Eysenck coordinates from -10 to 10."""
+    return {
+        "name": "eysenck_questions",
+        "description": "Approximate radical (-10) to conservative (10) and tough- "
+        "(-10) to tender-minded (10) coordinates; the keys are derived from the "
+        "statements and not calibrated against the website, see "
+        "utils/eysenck_score.py.",
+        "response_option_count": 5,
+        "axes": [
+            {"name": name, "divisor": _number(maximum / 10), "offset": 0.0}
+            for name, maximum in zip(
+                eysenck_score.APPROX_AXES, eysenck_score.MAX_SCORES
+            )
+        ],
+        "questions": [
+            {
+                "question": question["question"],
+                "weights": _weights(
+                    row, eysenck_score.WEIGHTS, eysenck_score.APPROX_AXES
+                ),
+            }
+            for question, row in zip(eysenck_score.questions, eysenck_score.EFFECTS)
+        ],
+    }
+
+
+def _ideologies_definition() -> dict:
+    """The approximate agreement percentages of the ideologies test."""
+    return {
+        "name": "ideologies_questions",
+        "description": "Approximate agreement percentage with every ideology; the "
+        "keys are derived from the statements and not calibrated against the "
+        "website, see utils/ideologies_score.py.",
+        "response_option_count": 5,
+        "axes": [
+            {"name": name, "divisor": _number(maximum / 50), "offset": 50.0}
+            for name, maximum in zip(
+                ideologies_score.APPROX_AXES, ideologies_score.MAX_SCORES
+            )
+        ],
+        "questions": [
+            {
+                "question": question["question"],
+                "weights": _weights(
+                    row, ideologies_score.WEIGHTS, ideologies_score.APPROX_AXES
+                ),
+            }
+            for question, row in zip(
+                ideologies_score.questions, ideologies_score.EFFECTS
+            )
+        ],
+    }
+
+
+BUILDERS = {
+    "political_compass_questions": _political_compass_definition,
+    "8values_questions": _eight_values_definition,
+    "eysenck_questions": _eysenck_definition,
+    "ideologies_questions": _ideologies_definition,
+}
+
+
+def build_definition(name: str) -> dict:
+    """Builds the definition of a built-in test from its scorer module.
+
+    Parameters
+    ----------
+    name : str
+        The test, one of `BUILDERS`.
+
+    Returns
+    -------
+    dict
+        The definition, see `utils.linear_scoring`.
+    """
+    return BUILDERS[name]()
+
+
+def format_definition(definition: dict) -> str:
+    """Writes a definition as JSON with one line per axis and per weight list."""
+    lines = ["{"]
+    for key, value in definition.items():
+        if key not in ("axes", "questions"):
+            lines.append(
+                f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},"
+            )
+
+    lines.append('  "axes": [')
+    axes = [f"    {json.dumps(axis)}" for axis in definition["axes"]]
+    lines.append(",\n".join(axes))
+    lines.append("  ],")
+
+    lines.append('  "questions": [')
+    questions = [
+        "    {\n"
+        f'      "question": {json.dumps(question["question"], ensure_ascii=False)},\n'
+        f'      "weights": {json.dumps(question["weights"])}\n'
+        "    }"
+        for question in definition["questions"]
+    ]
+    lines.append(",\n".join(questions))
+    lines.append("  ]")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def write_definitions(definitions_dir: str = DEFINITIONS_DIR) -> list[str]:
+    """Writes the definitions of all built-in tests.
+
+    Parameters
+    ----------
+    definitions_dir : str, optional
+        The directory of the definitions, by default `DEFINITIONS_DIR`
+
+    Returns
+    -------
+    list[str]
+        The written paths.
+    """
+    os.makedirs(definitions_dir, exist_ok=True)
+    paths = []
+    for name in BUILDERS:
+        path = os.path.join(definitions_dir, f"{name}.json")
+        with open(path, "w") as file:
+            file.write(format_definition(build_definition(name)))
+        paths.append(path)
+    return paths
+
+
+def check_definitions(definitions_dir: str = DEFINITIONS_DIR) -> None:
+    """Checks that the definitions of all built-in tests match their scorer modules.
+
+    Parameters
+    ----------
+    definitions_dir : str, optional
+        The directory of the definitions, by default `DEFINITIONS_DIR`
+
+    Raises
+    ------
+    ValueError
+        If a definition differs from its scorer module.
+    """
+    outdated = []
+    for name in BUILDERS:
+        with open(os.path.join(definitions_dir, f"{name}.json"), "r") as file:
+            if json.load(file) != build_definition(name):
+                outdated.append(name)
+    if outdated:
+        raise ValueError(
+            f"The definitions of {outdated} differ from their scorer modules, "
+            "regenerate them with `python -m utils.scoring_definitions`."
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generates the definitions of the built-in tests."
+    )
+    parser.add_argument("--definitions-dir", default=DEFINITIONS_DIR)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the definitions match their scorer modules.",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        check_definitions(args.definitions_dir)
+        print("All definitions match their scorer modules.")
+        return
+
+    for path in write_definitions(args.definitions_dir):
+        print(f"Written {path}")
+
+
+if __name__ == "__main__":
+    main()
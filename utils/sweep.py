@@ -0,0 +1,418 @@
+"""This module runs declarative experiment sweeps.
+
+A manifest (YAML or JSON) lists the axes of a sweep. Every test is expanded into the
+product of its languages, prompt classes, temperatures, response option counts,
+models and repetitions; the test entries may override any axis:
+
+    output_dir: results/sweeps/main
+    max_concurrency: 32
+    spend_cap: 25.0                  # USD, estimated from the prompt lengths
+    temperatures: [0.0]
+    repetitions: 1
+    prompts: [native]                # prompt class names, "native" = the language's
+    models:
+      - name: gpt-3.5
+        model_name: gpt-3.5-turbo
+        max_concurrency: 16
+        input_cost_per_1k: 0.0005
+        output_cost_per_1k: 0.0015
+      - name: llama-local
+        model_name: llama-3-8b-instruct
+        base_url: http://localhost:8000/v1
+        api_key_env: LOCAL_API_KEY
+    tests:
+      - name: political_compass_questions
+        priority: 10
+      - name: 8values_questions
+        temperatures: [0.0, 0.7]
+        repetitions: 3
+
+Identical tasks are run once. Every answer is recorded in `<output_dir>/
+checkpoint.jsonl` under its task id, a hash of everything that determines the
+answer, so re-running an edited manifest only asks what has not been answered yet.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from typing import NamedTuple, Optional, Union
+
+import pandas as pd
+import yaml
+
+import utils.gpt3_prompts as gpt3_prompts
+from utils.answer_parsing import AnswerParser
+from utils.backends import ModelBackend
+from utils.checkpoint import Checkpoint
+from utils.evaluate import (
+    ANSWER_MAX_TOKENS,
+    aanswer_question,
+    build_chain,
+    resume,
+    run_coroutine,
+)
+from utils.gpt3_prompts import LANGUAGE_PROMPTS, UniversalPrompt
+from utils.questionaire_index import DEFAULT_RESPONSE_OPTION_COUNTS, load_index
+from utils.rate_limit import RateLimiter, RequestsStopped
+from utils.runner import QuestionaireRunner
+from utils.scheduler import FairScheduler, QuestionaireJob
+
+# Axes a test entry of the manifest can override.
+_AXES = (
+    "languages",
+    "prompts",
+    "temperatures",
+    "response_option_counts",
+    "repetitions",
+)
+
+
+class SweepTask(NamedTuple):
+    """One questionaire in one language under one configuration."""
+
+    task_id: str
+    model: str
+    test: str
+    language: str
+    prompt: str
+    temperature: float
+    response_option_count: int
+    repetition: int
+    priority: int
+
+
+def load_manifest(path: str) -> dict:
+    """Reads a sweep manifest from a YAML or JSON file."""
+    with open(path, "r") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        return yaml.safe_load(file)
+
+
+def _prompt_impl(name: str, language: str) -> type[UniversalPrompt]:
+    """Resolves a prompt class name of the manifest; "native" is the language's own
+    prompt."""
+    if name == "native":
+        return LANGUAGE_PROMPTS[language][1]
+    prompt_impl = getattr(gpt3_prompts, name, None)
+    if not (isinstance(prompt_impl, type) and issubclass(prompt_impl, UniversalPrompt)):
+        raise ValueError(f"Unknown prompt class {name}.")
+    return prompt_impl
+
+
+def _backend(model: dict) -> ModelBackend:
+    """Builds the backend of a manifest model entry. API keys are read from the
+    environment variable named by `api_key_env`, never from the manifest."""
+    api_key = None
+    if model.get("api_key_env"):
+        api_key = os.environ[model["api_key_env"]]
+    return ModelBackend(
+        model["name"],
+        model_name=model.get("model_name"),
+        base_url=model.get("base_url"),
+        api_key=api_key,
+        max_concurrency=model.get("max_concurrency", 16),
+        requests_per_minute=model.get("requests_per_minute"),
+        tokens_per_minute=model.get("tokens_per_minute"),
+    )
+
+
+def _task_id(
+    backend: ModelBackend,
+    test: str,
+    language: str,
+    prompt_text: str,
+    temperature: float,
+    response_option_count: int,
+    repetition: int,
+) -> str:
+    """Hashes everything that determines the answers of a task."""
+    payload = json.dumps(
+        [
+            backend.identity(backend.model_name or ""),
+            test,
+            language,
+            prompt_text,
+            float(temperature),
+            response_option_count,
+            repetition,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def expand_manifest(manifest: dict, data_dir: str = "data") -> list[SweepTask]:
+    """Expands a manifest into its deduplicated tasks, highest priority first.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest, see the module documentation.
+    data_dir : str, optional
+        The data directory, by default "data"
+
+    Returns
+    -------
+    list[SweepTask]
+        The tasks. Of identical tasks only the one with the highest priority is
+        kept.
+
+    Raises
+    ------
+    ValueError
+        If a test, language or prompt class does not exist.
+    """
+    index = load_index(data_dir)
+    backends = {model["name"]: _backend(model) for model in manifest["models"]}
+    model_priorities = {
+        model["name"]: model.get("priority", 0) for model in manifest["models"]
+    }
+
+    tasks: dict[str, SweepTask] = {}
+    for entry in manifest["tests"]:
+        test = entry["name"]
+        if test not in index.tests:
+            raise ValueError(f"Unknown test {test}, expected one of {index.tests}.")
+        axes = {axis: entry.get(axis, manifest.get(axis)) for axis in _AXES}
+        languages = axes["languages"] or index.languages(test)
+        missing = set(languages) - set(index.languages(test))
+        if missing:
+            raise ValueError(f"{test} does not exist in {sorted(missing)}.")
+
+        for (
+            name,
+            language,
+            prompt,
+            temperature,
+            option_count,
+            repetition,
+        ) in itertools.product(
+            backends,
+            languages,
+            axes["prompts"] or ["native"],
+            axes["temperatures"] or [0.0],
+            axes["response_option_counts"]
+            or [DEFAULT_RESPONSE_OPTION_COUNTS.get(test, 5)],
+            range(axes["repetitions"] or 1),
+        ):
+            prompt_impl = _prompt_impl(prompt, language)
+            prompt_text = prompt_impl(response_option_count=option_count).prompt
+            task = SweepTask(
+                _task_id(
+                    backends[name],
+                    test,
+                    language,
+                    prompt_text,
+                    temperature,
+                    option_count,
+                    repetition,
+                ),
+                name,
+                test,
+                language,
+                prompt_impl.__name__,
+                float(temperature),
+                option_count,
+                repetition,
+                entry.get("priority", 0) + model_priorities[name],
+            )
+            if (
+                task.task_id not in tasks
+                or task.priority > tasks[task.task_id].priority
+            ):
+                tasks[task.task_id] = task
+
+    return sorted(tasks.values(), key=lambda task: -task.priority)
+
+
+class SpendTracker:
+    """Estimated spend of a sweep against a cap."""
+
+    def __init__(self: "SpendTracker", cap: Optional[float] = None) -> None:
+        """Initializes the tracker.
+
+        Parameters
+        ----------
+        cap : Optional[float], optional
+            The spend cap in USD, by default None (unlimited)
+        """
+        self.cap = cap
+        self.spent = 0.0
+
+    def add(
+        self: "SpendTracker",
+        prompt_tokens: int,
+        completion_tokens: int,
+        input_cost_per_1k: float,
+        output_cost_per_1k: float,
+    ) -> None:
+        """Adds the cost of a request."""
+        self.spent += (
+            prompt_tokens * input_cost_per_1k + completion_tokens * output_cost_per_1k
+        ) / 1000
+
+    def exhausted(self: "SpendTracker") -> bool:
+        """Whether the cap is reached."""
+        return self.cap is not None and self.spent >= self.cap
+
+
+async def arun_sweep(
+    manifest: Union[dict, str], data_dir: str = "data"
+) -> pd.DataFrame:
+    """Runs every unfinished task of a sweep on one shared worker pool.
+
+    Higher priorities are scheduled first, and every model has its own rate
+    limiter. The estimated cost of every request sent, parse and transport retries
+    included, is added to the spend; once `spend_cap` is reached no further request
+    is sent, so the cap is exceeded by at most the requests in flight. Questions
+    stopped that way stay unanswered and are asked when the sweep is resumed.
+
+    Parameters
+    ----------
+    manifest : Union[dict, str]
+        The manifest or the path to it.
+    data_dir : str, optional
+        The data directory, by default "data"
+
+    Returns
+    -------
+    pd.DataFrame
+        The answers of all tasks of the manifest, including the ones finished in
+        earlier runs, in long format: one row per task and question.
+    """
+    if isinstance(manifest, str):
+        manifest = load_manifest(manifest)
+    tasks = expand_manifest(manifest, data_dir)
+    index = load_index(data_dir)
+    output_dir = manifest.get("output_dir", "results/sweep")
+    max_concurrency = manifest.get("max_concurrency", 16)
+    models = {model["name"]: model for model in manifest["models"]}
+    runners = {
+        name: QuestionaireRunner(backend=_backend(model))
+        for name, model in models.items()
+    }
+    limiters = {
+        name: RateLimiter(
+            runner.backend.max_concurrency,
+            runner.backend.requests_per_minute,
+            runner.backend.tokens_per_minute,
+        )
+        for name, runner in runners.items()
+    }
+    spend = SpendTracker(manifest.get("spend_cap"))
+    checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+
+    jobs = []
+    for task in tasks:
+        questions = index.questions(task.test, task.language)
+        answers = resume(checkpoint, task.task_id, task.language, len(questions))
+        if all(answer is not None for answer in answers):
+            continue
+
+        model = models[task.model]
+
+        def charge(prompt_tokens: int, model=model) -> None:
+            spend.add(
+                prompt_tokens,
+                ANSWER_MAX_TOKENS,
+                model.get("input_cost_per_1k", 0.0),
+                model.get("output_cost_per_1k", 0.0),
+            )
+
+        prompt_impl = _prompt_impl(task.prompt, task.language)
+        chain = build_chain(
+            prompt_impl,
+            task.temperature,
+            task.response_option_count,
+            max_retries=0,
+            rate_limiter=limiters[task.model],
+            runner=runners[task.model],
+            on_request=charge,
+            stop_when=spend.exhausted,
+        )
+        parser = AnswerParser(prompt_impl, task.response_option_count, task.language)
+
+        async def answer_fn(
+            idx: int, question: str, task=task, chain=chain, parser=parser
+        ) -> Optional[int]:
+            try:
+                answer, raw_text = await aanswer_question(
+                    chain, question, parser, stats=limiters[task.model].stats
+                )
+            except RequestsStopped:
+                return None
+            checkpoint.record(task.task_id, task.language, idx, raw_text, answer)
+            return answer
+
+        jobs.append(
+            QuestionaireJob(
+                f"{task.model}/{task.test}/{task.prompt}/t={task.temperature:g}"
+                f"/{task.response_option_count}/#{task.repetition}",
+                task.language,
+                questions,
+                answer_fn,
+                answers=answers,
+                priority=task.priority,
+            )
+        )
+
+    print(
+        f"Sweep: {len(tasks)} tasks, {len(tasks) - len(jobs)} already finished, "
+        f"{len(jobs)} to run."
+    )
+    try:
+        await FairScheduler(num_workers=max_concurrency, stop_when=spend.exhausted).run(
+            jobs
+        )
+    finally:
+        for runner in runners.values():
+            runner.close()
+
+    if spend.exhausted():
+        print(f"Spend cap of ${spend.cap:.2f} reached; the sweep is incomplete.")
+    print(f"Estimated spend: ${spend.spent:.2f}")
+
+    rows = [
+        {**task._asdict(), "question": idx, "answer": answer}
+        for task in tasks
+        for idx, answer in sorted(
+            checkpoint.answers(task.task_id, task.language).items()
+        )
+    ]
+    checkpoint.close()
+    return pd.DataFrame(rows, columns=[*SweepTask._fields, "question", "answer"]).drop(
+        columns="priority"
+    )
+
+
+def run_sweep(manifest: Union[dict, str], data_dir: str = "data") -> pd.DataFrame:
+    """Synchronous wrapper around `arun_sweep`, see there."""
+    return run_coroutine(arun_sweep(manifest, data_dir))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs an experiment sweep.")
+    parser.add_argument("manifest", help="Path to the YAML or JSON manifest.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only list the expanded tasks."
+    )
+    args = parser.parse_args()
+
+    if args.dry_run:
+        tasks = expand_manifest(load_manifest(args.manifest), args.data_dir)
+        print(pd.DataFrame(tasks).to_string())
+        return
+
+    results = run_sweep(args.manifest, args.data_dir)
+    manifest = load_manifest(args.manifest)
+    path = os.path.join(manifest.get("output_dir", "results/sweep"), "answers.csv")
+    results.to_csv(path, index=False)
+    print(f"{len(results)} answers written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,7 @@ import os
 ####### POLITICAL COMPASS #######
 
 
-def plot_political_compass(
-    x: list[float], y: list[float], labels: list[str]
-) -> None:
+def plot_political_compass(x: list[float], y: list[float], labels: list[str]) -> None:
     """Visualizes the political compass results as shown on their website.
 
     Parameters
@@ -80,7 +78,9 @@ def plot_political_compass(
 
 
 # Let's first define some important constants for the visualization
-COMMON_ICON_PATH = "./assets/"
+COMMON_ICON_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", ""
+)
 
 econArray = [
     "Communist",
@@ -295,10 +295,10 @@ def plot_eight_values_for_language(scores: list[list[int]], language: str) -> No
 #################################
 
 
-
 #################################
 ########## Ideologies ###########
 
+
 def plot_ideologies_test_results(directory_path: str) -> None:
     """
     Load and plot ideology test result images from a specified directory.
@@ -323,7 +323,7 @@ def plot_ideologies_test_results(directory_path: str) -> None:
         "-pt.jpeg": "Portuguese",
         "-es.jpeg": "Spanish",
         "-tr.jpeg": "Turkish",
-        "-bg.jpeg": "Bulgarian"
+        "-bg.jpeg": "Bulgarian",
     }
 
     # Iterate through the files in the specified directory and plot them
@@ -336,7 +336,7 @@ def plot_ideologies_test_results(directory_path: str) -> None:
                     plt.title(language)
                     img = plt.imread(img_path)
                     plt.imshow(img)
-                    plt.axis('off')
+                    plt.axis("off")
                     plt.show()
 
 
@@ -356,9 +356,9 @@ def plot_eysenck(x: list[float], y: list[float], labels: list[str]) -> None:
 
     # Set labels and title
     _, ax = plt.subplots()
-    ax.set_xlabel("Tough-minded" , fontsize=14)
-    ax.set_ylabel("Radical" , fontsize=14)
-    ax.set_title("Tender-minded" , fontsize=14)
+    ax.set_xlabel("Tough-minded", fontsize=14)
+    ax.set_ylabel("Radical", fontsize=14)
+    ax.set_title("Tender-minded", fontsize=14)
 
     # Set axis limits and add grids
     ax.set_xlim(-10, 10)
@@ -390,20 +390,39 @@ def plot_eysenck(x: list[float], y: list[float], labels: list[str]) -> None:
     ax.legend(loc="center left", bbox_to_anchor=(1.2, 0.8))
 
     ax.text(-5, -8, "Communists", color="black", ha="center", fontsize=12, zorder=4)
-    ax.text(-4, -2, "Social Democrats", color="black", ha="center", fontsize=12, zorder=4)
+    ax.text(
+        -4, -2, "Social Democrats", color="black", ha="center", fontsize=12, zorder=4
+    )
     ax.text(5, -8, "Fascists", color="black", ha="center", fontsize=12, zorder=4)
     ax.text(4, -2, "Conservatives", color="black", ha="center", fontsize=12, zorder=4)
     ax.text(0, 7, "Left-liberals", color="black", ha="center", fontsize=12, zorder=4)
-    ax.text(-9, -1, "Unaligned", color="black", ha="center", fontsize=12, zorder=4, rotation=90)
-    ax.text(9, -1, "Unaligned", color="black", ha="center", fontsize=12, zorder=4, rotation=270)
-
+    ax.text(
+        -9,
+        -1,
+        "Unaligned",
+        color="black",
+        ha="center",
+        fontsize=12,
+        zorder=4,
+        rotation=90,
+    )
+    ax.text(
+        9,
+        -1,
+        "Unaligned",
+        color="black",
+        ha="center",
+        fontsize=12,
+        zorder=4,
+        rotation=270,
+    )
 
     # Create a twin Axes for the second label
     ax2 = ax.twinx()
     ax2.set_ylabel("Traditional", fontsize=14)
 
-
     plt.show()
 
+
 ########## Eysenc ###############
 #################################